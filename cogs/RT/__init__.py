@@ -2,24 +2,24 @@
 
 from __future__ import annotations
 
-from traceback import TracebackException, print_exc
+from traceback import TracebackException
 from collections import defaultdict
 from inspect import cleandoc
 from itertools import chain
 from random import choice
-from os import listdir
 from time import time
-import speedtest
 
 from discord.ext import commands, tasks
 import discord
 
 from jishaku.functools import executor_function
 
-from util import RT
+from util import RT, lazy_import
 
 from data import PERMISSION_TEXTS
 
+
+speedtest = lazy_import("speedtest")
 ERROR_CHANNEL = 962977145716625439
 
 INFO_DESC = {
@@ -181,7 +181,7 @@ class BotGeneral(commands.Cog):
         # Backendとの通信状況を調べる。
         embed.add_field(
             name="Backend Connection Latency",
-            value="%.1fms" % self.bot.cogs["RTLife"].data["backendLatency"][-1]
+            value="%.1fms" % self.bot.cogs["RTLife"].series.latest.get("backendLatency", 0.0)
         )
         await ctx.reply(embed=embed)
 
@@ -450,12 +450,4 @@ class BotGeneral(commands.Cog):
 
 async def setup(bot):
     await bot.add_cog(BotGeneral(bot))
-    for name in listdir("cogs/RT"):
-        if not name.startswith(("_", ".")):
-            try:
-                await bot.load_extension(
-                    f"cogs.RT.{name[:-3] if name.endswith('.py') else name}")
-            except Exception:
-                print_exc()
-            else:
-                bot.print("[Extension]", "Loaded", name)  # ロードログの出力
+    await bot.loader.load_package("cogs.RT")
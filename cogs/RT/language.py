@@ -1,6 +1,8 @@
 # Free RT - Language
 
-from typing import Literal, Union, List, Tuple
+from typing import Literal, Union, List, Tuple, Dict, Optional
+
+from time import perf_counter
 
 from discord.ext import commands
 from discord import app_commands
@@ -9,7 +11,75 @@ import discord
 from util import RT
 
 from aiofiles import open as async_open
+from functools import lru_cache
+from ast import literal_eval
 from json import loads
+from sys import intern
+
+
+DEPENDS = ("util.ext.on_send",)
+"先に読み込まれている必要があるエクステンションです。"
+
+
+@lru_cache(maxsize=1024)
+def _parse_dict(text: str) -> Optional[dict]:
+    # `{'ja': '...', 'en': '...'}`のような文字列を辞書にする。evalは使わない。
+    try:
+        result = literal_eval(text)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+    return result if isinstance(result, dict) else None
+
+
+class Catalog:
+    """`data/replies.json`を言語ごとの辞書にしたものです。
+    辞書の形をした文字列の翻訳結果は`(文字列, 言語コード)`ごとに保存されます。"""
+
+    def __init__(self, replies: Dict[str, Dict[str, str]], maxsize: int = 4096):
+        self.tables: Dict[str, Dict[str, str]] = {}
+        for text, values in replies.items():
+            for lang, value in values.items():
+                self.tables.setdefault(lang, {})[intern(text)] = \
+                    intern(value) if isinstance(value, str) else value
+        self._translate_dict = lru_cache(maxsize=maxsize)(self._translate_dict)
+
+    def _translate_dict(self, text: str, lang: str) -> str:
+        if (parsed := _parse_dict(text)) is None:
+            return text
+        return parsed.get(lang, parsed.get("ja", text))
+
+    def translate(self, text: str, lang: str) -> str:
+        "文字列を指定された言語のものにします。"
+        if text[0] != "{":
+            return self.tables[lang].get(text, text) if lang in self.tables else text
+        if text[-1] == "}":
+            return self._translate_dict(text, lang)
+        return text
+
+    def is_plain(self, text, lang: str) -> bool:
+        "交換する必要がない文字列かどうかを返します。"
+        return text is None or text is discord.utils.MISSING or (
+            isinstance(text, str) and not text.startswith("{")
+            and text not in self.tables.get(lang, ())
+        )
+
+
+class UncachedCatalog(Catalog):
+    """ベンチマーク用の、`Catalog`を作る前と同じ方法で交換をするものです。
+    `data/replies.json`をそのまま引き、辞書の形をした文字列は毎回パースし、日本語でも必ず交換を行います。"""
+
+    def __init__(self, replies: Dict[str, Dict[str, str]]):
+        self.replies = replies
+
+    def translate(self, text: str, lang: str) -> str:
+        if text[0] != "{":
+            return self.replies.get(text, {}).get(lang, text)
+        if text[-1] == "}" and isinstance(parsed := literal_eval(text), dict):
+            return parsed.get(lang, parsed.get("ja", text))
+        return text
+
+    def is_plain(self, text, lang: str) -> bool:
+        return False
 
 
 class Language(commands.Cog):
@@ -30,27 +100,26 @@ class Language(commands.Cog):
     もし翻訳済みに交換してほしくないテキストの場合は引数で`replace_language=False`とやればよいです。"""
 
     LANGUAGES = ("ja", "en")
+    EVENTS = ("on_send", "on_webhook_send", "on_webhook_message_edit", "on_edit")
+    KWARGS = ("content", "embed", "embeds", "target", "replace_language")
 
     def __init__(self, bot: RT):
         self.bot = bot
         self.cache = {}
         self.guild_cache = {}
 
-        self.bot.cogs["OnSend"].add_event(self._new_send, "on_send")
-        self.bot.cogs["OnSend"].add_event(self._new_send, "on_webhook_send")
-        self.bot.cogs["OnSend"].add_event(self._new_send, "on_webhook_message_edit")
-        self.bot.cogs["OnSend"].add_event(self._new_send, "on_edit")
+        for name in self.EVENTS:
+            self.bot.cogs["OnSend"].add_event(self._new_send, name, kwargs=self.KWARGS)
 
         self.pool = self.bot.mysql.pool
 
         with open("data/replies.json", encoding="utf-8") as f:
             self.replies = loads(f.read())
+        self.catalog = Catalog(self.replies)
 
     def cog_unload(self):
-        for key in list(self.bot.cogs["OnSend"].events.keys()):
-            for value in self.bot.cogs["OnSend"].events[key]:
-                if value.__name__ == "_new_send":
-                    self.bot.cogs["OnSend"].events[key].remove(value)
+        for name in self.EVENTS:
+            self.bot.cogs["OnSend"].remove_event(self._new_send, name)
 
     def _get_ug(self, guild_id: int, user_id: int) -> str:
         lang = self.cache.get(guild_id)
@@ -58,7 +127,7 @@ class Language(commands.Cog):
             return self.get(user_id)
         return lang
 
-    async def _new_send(self, channel, *args, **kwargs):
+    def _new_send(self, channel, *args, **kwargs):
         # 元のsendにつけたしをする関数。util.ext.on_sendを使う。
         # このsendが返信に使われたのなら返信先のメッセージの送信者(実行者)の言語設定を読み込む。
         lang = "ja"
@@ -87,6 +156,11 @@ class Language(commands.Cog):
         if not kwargs.pop("replace_language", True):
             # もし言語データ交換するなと引数から指定されたならデフォルトのjaにする。
             lang = "ja"
+        if (lang == "ja" and "embed" not in kwargs and "embeds" not in kwargs
+                and self.catalog.is_plain(kwargs.get("content"), lang)
+                and (not args or self.catalog.is_plain(args[0], lang))):
+            # 日本語で交換するものがない場合は何もしない。
+            return args, kwargs
         # contentなどの文字列が言語データにないか検索をする。
         if kwargs.get("content", False):
             kwargs["content"] = self.get_text(kwargs["content"], lang)
@@ -102,6 +176,35 @@ class Language(commands.Cog):
 
         return args, kwargs
 
+    BENCHMARK_TARGETS = (-1, -2)
+    "`benchmark_send`で英語と日本語の送信先にするIDです。"
+
+    def benchmark_send(self, count: int = 10000) -> Dict[str, Dict[str, float]]:
+        """`_new_send`の一回あたりの時間(マイクロ秒)を、`Catalog`を使う今の方法と前の方法(`UncachedCatalog`)で計ります。
+        日本語で交換しない場合、英語で`data/replies.json`にある文字列の場合、英語で辞書の形をした文字列の場合を計ります。"""
+        en, ja = self.BENCHMARK_TARGETS
+        translated = next(iter(self.catalog.tables.get("en", {})), "Ok")
+        cases = {
+            "ja_plain": (ja, "こんにちは。"), "en_translated": (en, translated),
+            "en_dict": (en, "{'ja': 'こんにちは。', 'en': 'Hello.'}")
+        }
+        catalogs = {"before": UncachedCatalog(self.replies), "after": self.catalog}
+        results = {}
+        self.cache[en] = "en"
+        try:
+            for name, (target, content) in cases.items():
+                results[name] = {}
+                for label, catalog in catalogs.items():
+                    self.catalog = catalog
+                    started = perf_counter()
+                    for _ in range(count):
+                        self._new_send(None, content=content, target=target)
+                    results[name][label] = (perf_counter() - started) / count * 1e6
+        finally:
+            self.catalog = catalogs["after"]
+            del self.cache[en]
+        return results
+
     def _extract_question(self, text: str, parse_character: str = "$") -> Tuple[List[str], List[str]]:
         # 渡された文字列の中にある`$xxx$`のxxxのやところを
         now, now_target, results, other = "", False, [], ""
@@ -122,45 +225,34 @@ class Language(commands.Cog):
         return results, other
 
     def _get_reply(self, text: Union[str, dict], lang: Literal["ja", "en"]) -> str:
-        result = ""
-        if text:
-            if isinstance(text, str) and text[0] != "{":
-                # 指定された文字を指定された言語で交換します。
-                # 言語データから文字列を取得する。
-                result = self.replies.get(text, {}).get(lang, text)
-            else:
-                if isinstance(text, str) and text[0] == "{" and text[-1] == "}":
-                    try:
-                        result = eval(text)
-                    except ValueError:
-                        result = str(text)
-                    else:
-                        result = result.get(lang, result.get("ja", text))
-                elif isinstance(text, dict):
-                    result = text.get(lang, text["ja"])
-                else:
-                    result = str(text)
-
-        return result
+        if not text:
+            return ""
+        if isinstance(text, str):
+            # 指定された文字を指定された言語で交換します。
+            return self.catalog.translate(text, lang)
+        if isinstance(text, dict):
+            return text.get(lang, text["ja"])
+        return str(text)
 
     def _replace_embed(self, embed: discord.Embed, lang: Literal["ja", "en"]) -> discord.Embed:
         # Embedを指定された言語コードで交換します。
         # タイトルとディスクリプションを交換する。
+        # 変わらないものは設定し直さない。
         for n in ("title", "description"):
-            if getattr(embed, n) is not None:
-                setattr(embed, n, self._get_reply(getattr(embed, n), lang))
+            if (before := getattr(embed, n)) is not None:
+                if (after := self._get_reply(before, lang)) != before:
+                    setattr(embed, n, after)
         # Embedにあるフィールドの文字列を交換する。
-        for index in range(len(embed.fields)):
-            embed.set_field_at(
-                index, name=self._get_reply(embed.fields[index].name, lang),
-                value=self._get_reply(embed.fields[index].value, lang),
-                inline=embed.fields[index].inline
-            )
+        for index, field in enumerate(embed.fields):
+            name = self._get_reply(field.name, lang)
+            value = self._get_reply(field.value, lang)
+            if name != field.name or value != field.value:
+                embed.set_field_at(index, name=name, value=value, inline=field.inline)
         # Embedのフッターを交換する。
         if embed.footer:
             if embed.footer.text is not None:
-                embed.set_footer(text=self._get_reply(embed.footer.text, lang),
-                                 icon_url=embed.footer.icon_url)
+                if (text := self._get_reply(embed.footer.text, lang)) != embed.footer.text:
+                    embed.set_footer(text=text, icon_url=embed.footer.icon_url)
         return embed
 
     def get_text(self, text: Union[str, discord.Embed],
@@ -188,6 +280,7 @@ class Language(commands.Cog):
         # 言語データを更新します。
         async with async_open("data/replies.json") as f:
             self.replies = loads(await f.read())
+        self.catalog = Catalog(self.replies)
 
     async def update_cache(self, cursor):
         # キャッシュを更新します。
@@ -10,6 +10,7 @@ from aiofiles import open as async_open
 from collections import defaultdict
 from ujson import loads, dumps
 from os.path import exists
+from logging import WARNING
 
 
 class RTRole(commands.Cog):
@@ -21,7 +22,7 @@ class RTRole(commands.Cog):
                 with open("data/rtrole.json", "r") as f:
                     self.data.update(loads(f.read()))
             except Exception as e:
-                print("Error on RTRole:", e)
+                self.bot.print("[RTRole]", "Failed to load:", e, level=WARNING)
         else:
             with open("data/rtrole.json", "w") as f:
                 f.write(r"{}")
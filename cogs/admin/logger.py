@@ -6,6 +6,7 @@ import discord
 from traceback import TracebackException
 
 from collections import Counter
+from logging import ERROR
 
 from util import RT
 
@@ -88,7 +89,10 @@ class SystemLog(commands.Cog):
             return
         else:
             error_message = "".join(TracebackException.from_exception(error).format())
-            print("\033[31m" + error_message + "\033[0m")
+            self.bot.print(
+                "[Logger]", "Command error:", error_message, level=ERROR,
+                guild_id=getattr(ctx.guild, "id", None), event="command_error"
+            )
             ch = self.bot.get_channel(ERROR_CHANNEL)
             embed = discord.Embed(
                 title="Free RT Error log",
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Any, Optional
+
 from os.path import exists
 from asyncio import all_tasks
 from time import time
@@ -10,96 +12,108 @@ from discord.ext import commands, tasks
 
 from jishaku.functools import executor_function
 from psutil import virtual_memory, cpu_percent
-from aiofiles import open as aioopen
-from ujson import load, dumps
+from ujson import load
 
+from util.timeseries import TimeSeries
 from util import RT
 
 
+METRICS = (
+    "botCpu", "botMemory", "backendCpu", "backendMemory", "users", "guilds",
+    "voicePlaying", "backendLatency", "discordLatency", "botPoolSize", "botTaskCount",
+    "backendPoolSize", "backendTaskCount", "botLoopLag"
+)
+"記録する値の名前です。"
+LEGACY_PATH = "data/rtlife.json"
+"以前の10分ごとの記録が入っているJSONファイルです。初めて起動した時に読み込まれます。"
+
+
 class RTLife(commands.Cog):
     def __init__(self, bot: RT):
         self.bot = bot
-        if exists("data/rtlife.json"):
-            with open("data/rtlife.json", "r") as f:
-                self.data = load(f)
-        else:
-            self.data = {
-                "botCpu": [], "botMemory": [], "backendCpu": [], "backendMemory": [],
-                "users": [], "guilds": [], "voicePlaying": [], "backendLatency": [], "discordLatency": [],
-                "botPoolSize": [], "botTaskCount": [], "backendPoolSize": [], "backendTaskCount": []
-            }
+        self.series = TimeSeries("data/rtlife", METRICS)
         self.bot.rtws.set_event(self.get_status)
+
+    async def cog_load(self):
+        await self.load_series()
         self.update_status.start()
 
+    @executor_function
+    def load_series(self):
+        self.series.load()
+        if not self.series.rings["1h"].length and exists(LEGACY_PATH):
+            # 以前のJSONの記録を移す。最後のものが今で、10分ごとだったとする。
+            with open(LEGACY_PATH, "r") as f:
+                data = load(f)
+            length, now = max(map(len, data.values()), default=0), time()
+            for index in range(length):
+                self.series.add(now - (length - index) * 600, {
+                    key: values[index - length + len(values)]
+                    for key, values in data.items()
+                    if key in METRICS and index - length + len(values) >= 0
+                })
+            self.series.write()
+
     @executor_function
     def process_psutil(self) -> tuple[float, float]:
         return virtual_memory().percent, cpu_percent(interval=1)
 
     @executor_function
-    def count(
-        self, data: tuple, server_status: tuple[float, float],
-        latency: float, task_count: int
-    ):
-        for key in self.data.keys():
-            count = None
-            if key == "botMemory":
-                count = server_status[0]
-            elif key == "botCpu":
-                count = server_status[1]
-            elif key == "users":
-                count = len(self.bot.users)
-            elif key == "guilds":
-                count = len(self.bot.guilds)
-            elif key == "voicePlaying":
-                count = len(self.bot.voice_clients)
-            elif key == "backendLatency":
-                count = latency
-            elif key == "discordLatency":
-                count = round(self.bot.latency * 1000, 1)
-            elif key == "botPoolSize":
-                count = self.bot.mysql.pool.size
-            elif key == "botTaskCount":
-                count = task_count
-            elif key == "backendPoolSize":
-                count = data[0][0]
-            elif key == "backendTaskCount":
-                count = data[0][1]
-            elif key == "backendMemory":
-                count = data[1][0]
-            elif key == "backendCpu":
-                count = data[1][1]
-            if count is not None:
-                self.data[key].append(count)
-                if len(self.data[key]) >= 1008:
-                    self.data[key] = self.data[key][-1008:]
-
-    # @tasks.loop(seconds=10)
-    @tasks.loop(minutes=10)
+    def write(self):
+        self.series.write()
+
+    @tasks.loop(minutes=1)
     async def update_status(self):
         try:
             data = await self.bot.rtws.request("get_backend_status", None)
         except Exception:
             data = ((0, 0), (4, 30))
         # バックエンドとのレイテンシを調べる。
+        latency = self.series.latest.get("backendLatency", 0.0)
         if self.bot.backend:
             count = time()
             async with self.bot.session.get(
                 f"{self.bot.get_url()}/api/ping"
             ) as r:
                 if await r.text() == "pong":
-                    count = round((time() - count) * 1000, 1)
-                elif self.data["backendLatency"]:
-                    count = self.data["backendLatency"][-1]
-                else:
-                    count = 0.0
-        else:
-            count = self.data["backendLatency"][-1] if self.data["backendLatency"] else 0.0
-        await self.count(data, await self.process_psutil(), count, len(all_tasks()))
-        async with aioopen("data/rtlife.json", "w") as f:
-            await f.write(dumps(self.data))
-
-    def get_status(self, _):
-        return self.data
+                    latency = round((time() - count) * 1000, 1)
+        memory, cpu = await self.process_psutil()
+        values = {
+            "botMemory": memory, "botCpu": cpu,
+            "users": len(self.bot.users), "guilds": len(self.bot.guilds),
+            "voicePlaying": len(self.bot.voice_clients), "backendLatency": latency,
+            "discordLatency": round(self.bot.latency * 1000, 1),
+            "botPoolSize": self.bot.mysql.pool.size, "botTaskCount": len(all_tasks()),
+            "backendPoolSize": data[0][0], "backendTaskCount": data[0][1],
+            "backendMemory": data[1][0], "backendCpu": data[1][1]
+        }
+        # 監視のエクステンションが読み込めていない場合は記録しない。(`nan`になる。)
+        if (watchdog := self.bot.cogs.get("LoopWatchdog")) is not None:
+            values["botLoopLag"] = round(watchdog.pop_max_lag() * 1000, 1)
+        self.series.add(time(), values)
+        await self.write()
+
+    def get_status(self, query: Optional[dict[str, Any]]):
+        """記録を返します。`query`で期間を指定した場合はその期間だけを返します。
+
+        Parameters
+        ----------
+        query : dict, optional
+            `tier`(`1m`か`1h`か`1d`、デフォルトは`1h`)、`since`と`until`(UNIX時間)、`metrics`(値の名前のリスト)です。
+            指定しない場合は一時間ごとの一週間分を返します。"""
+        query = query if isinstance(query, dict) else {}
+        status = {
+            **self.series.window(
+                query.get("tier", "1h"), query.get("since", time() - 604800),
+                query.get("until"), query.get("metrics")
+            ),
+            "botQueries": self.bot.mysql.stats.summary(),
+            "botPoolQueue": self.bot.mysql.governor.metrics(),
+            "botHandlers": self.bot.handler_stats.summary(50)
+        }
+        if (watchdog := self.bot.cogs.get("LoopWatchdog")) is not None:
+            status["botLoopStalls"] = watchdog.metrics()
+        return status
 
     def cog_unload(self):
         self.update_status.cancel()
@@ -1,6 +1,8 @@
 # Free RT - Auto Public
 
 from discord.ext import commands
+
+from util import message_listener
 from discord import ChannelType
 
 
@@ -34,14 +36,12 @@ class AutoPublic(commands.Cog):
                 lang, *CHP_HELP[lang]
             )
 
-    @commands.Cog.listener()
+    @message_listener(topic="rf>autopublic")
     async def on_message(self, message):
-        if not hasattr(message.channel, "topic"):
-            return
-        if not type(message.channel) == ChannelType.news or not message.channel.topic:
+        if not type(message.channel) == ChannelType.news:
             return
 
-        for line in message.channel.topic.splitlines():
+        for line in self.bot.cogs["TopicIndex"].lines(message.channel.id, "rf>autopublic"):
             if line.startswith("rf>autopublic"):
                 await message.publish()
                 if len(line.split()) >= 1:
@@ -3,7 +3,7 @@
 from discord.ext import commands
 import discord
 
-from util import RT
+from util import RT, message_listener
 
 from inspect import cleandoc
 from re import findall
@@ -92,15 +92,8 @@ class ChannelPluginGeneral(commands.Cog):
                     HELPS[command_name][lang][1]
                 )
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, webhook=False, topic="rf>")
     async def on_message(self, message: discord.Message):
-        if isinstance(message.channel, discord.Thread):
-            return
-        if not message.guild or message.author.discriminator == "0000":
-            return
-        if not message.channel.topic:
-            return
-
         for cmd in message.channel.topic.splitlines():
             if cmd.startswith("rf>asp"):
                 # Auto Spoiler
@@ -6,6 +6,8 @@ import discord
 from datetime import datetime
 from functools import wraps
 
+from util import message_listener
+
 
 CHP_HELP = {
     "ja": (
@@ -33,12 +35,8 @@ def log(mode: str = "normal", force: bool = False):
                 guild = first_arg.guild
 
             if guild:
-                channel = discord.utils.find(
-                    lambda ch: (
-                        "log-rt" in ch.name
-                        or (ch.topic and "rf>log" in ch.topic)
-                    ), guild.text_channels
-                )
+                # 名前に`log-rt`があるチャンネルもTopicIndexで`rf>log`として扱われる。
+                channel = self.bot.cogs["TopicIndex"].find(guild, "rf>log")
 
                 if channel or force:
                     embed = await func(self, first_arg, *args, **kwargs)
@@ -75,10 +73,10 @@ class Log(commands.Cog):
                 lang, *CHP_HELP[lang]
             )
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, content=True)
     @log()
     async def on_message(self, message):
-        if message.content and ((ever := "@everyone" in message.content) or "@here" in message.content):
+        if ((ever := "@everyone" in message.content) or "@here" in message.content):
             return discord.Embed(
                 title="全員メンション",
                 description=f"{message.author} ({message.author.id})が{'everyone' if ever else 'here'}メンションをしました。",
@@ -9,6 +9,8 @@ import reprypt
 from discord.ext import commands
 from discord import app_commands
 
+from util import message_listener
+
 
 def rname() -> str:
     chars = ""
@@ -130,9 +132,9 @@ class SixChannel(commands.Cog):
         await self.save(self.path, self.data, 4)
         await ctx.reply("設定しました。")
 
-    @commands.Cog.listener()
+    @message_listener(bot=False)
     async def on_message(self, message):
-        if message.author.bot or message.content.startswith("rf!"):
+        if message.content.startswith("rf!"):
             return
 
         for name in self.data["thread"]:
@@ -10,14 +10,13 @@ import discord
 
 from jishaku.functools import executor_function
 from aiofiles.os import remove
-from bs4 import BeautifulSoup
-from PIL import Image
-import traceback
-
-from os import listdir
 
 from util.page import EmbedPage
-from util import RT
+from util import RT, lazy_import
+
+
+BeautifulSoup = lazy_import("bs4", "BeautifulSoup")
+Image = lazy_import("PIL.Image")
 
 
 class Enjoy(commands.Cog):
@@ -268,12 +267,4 @@ class Enjoy(commands.Cog):
 
 async def setup(bot):
     await bot.add_cog(Enjoy(bot))
-    for name in listdir("cogs/entertainment"):
-        if not name.startswith(("_", ".")):
-            try:
-                await bot.load_extension(
-                    f"cogs.entertainment.{name[:-3] if name.endswith('.py') else name}")
-            except Exception:
-                traceback.print_exc()
-            else:
-                bot.print("[Extension]", "Loaded", name)  # ロードログの出力
+    await bot.loader.load_package("cogs.entertainment")
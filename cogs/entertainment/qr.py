@@ -1,9 +1,13 @@
 import os
-import cv2
 import discord
 import pyqrcode
 from discord.ext import commands
 
+from util import lazy_import
+
+
+cv2 = lazy_import("cv2")
+
 
 class qr(commands.Cog): 
 
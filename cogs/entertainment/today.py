@@ -5,10 +5,13 @@ from discord import app_commands
 import discord
 
 from util.mysql_manager import DatabaseManager
-from bs4 import BeautifulSoup
+from util import lazy_import
 from datetime import datetime, timedelta
 
 
+BeautifulSoup = lazy_import("bs4", "BeautifulSoup")
+
+
 class DataManager(DatabaseManager):
 
     DB = "Today"
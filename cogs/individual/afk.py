@@ -6,7 +6,7 @@ from discord.ext import commands, tasks
 from discord import app_commands
 import discord
 
-from util import RT
+from util import RT, message_listener
 
 from datetime import datetime, timedelta
 from collections import defaultdict
@@ -435,12 +435,8 @@ class AFK(commands.Cog, DataManager):
             )
         await ctx.reply(embed=embed)
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, bot=False, command=False)
     async def on_message(self, message: discord.Message):
-        if (message.content.startswith(tuple(self.bot.command_prefix))
-                or not message.guild or message.author.bot):
-            return
-
         if message.author.id in self.cache:
             # もしAFKを設定していた人ならAFKを解除しておく。
             await (await self.get(message.author)).delete_afk()
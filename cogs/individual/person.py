@@ -12,12 +12,13 @@ from discord.ext import commands
 from discord import app_commands
 import discord
 
-from bs4 import BeautifulSoup
-
-from util import RT, Table
+from util import RT, Table, message_listener, lazy_import
 from data.headers import YAHOO_SEARCH_HEADERS
 
 
+BeautifulSoup = lazy_import("bs4", "BeautifulSoup")
+
+
 class Yahoo(Table):
     __allocation__ = "GuildID"
     onoff: bool
@@ -458,10 +459,9 @@ class Person(commands.Cog):
     def is_yt_onoff(self, guild_id: int) -> bool:
         return self.ydata[guild_id].to_dict().get("onoff", True)
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, bot=False)
     async def on_message(self, message):
-        if not message.guild or message.author.bot or not self.is_yt_onoff(message.guild.id) \
-                or message.content in ("あとは", "とは", "あとは？"):
+        if not self.is_yt_onoff(message.guild.id) or message.content in ("あとは", "とは", "あとは？"):
             return
 
         # もし`OOOとは。`に当てはまるなら押したら検索を行うリアクションを付ける。
@@ -495,11 +495,9 @@ class Person(commands.Cog):
                         await self.yahoo_(await self.bot.get_context(message), word=word)
                 return
 
-        if not hasattr(message.channel, "topic") or not message.channel.topic:
-            return
-
+        index = self.bot.cogs["TopicIndex"]
         # 自動リアクション
-        for line in message.channel.topic.splitlines():
+        for line in index.lines(message.channel.id, "rt>ar "):
             if line.startswith("rt>ar "):
                 await self.autoreaction(
                     await self.bot.get_context(message),
@@ -510,8 +508,7 @@ class Person(commands.Cog):
             return
 
         # もしtopicにrt>searchがあるならメッセージを検索する。
-        if (message.guild and message.channel.topic
-                and "rt>search" in message.channel.topic):
+        if index.has(message.channel.id, "rt>search"):
             await self.yahoo_(await self.bot.get_context(message), word=message.content)
 
 
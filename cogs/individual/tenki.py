@@ -3,16 +3,17 @@
 from discord.ext import commands, easy, tasks
 import discord
 
-from util.mysql_manager import DatabaseManager
+from util.mysql_manager import DatabaseManager, page_rows
+from util import lazy_load
 
 from datetime import datetime, timedelta
 from asyncio import sleep
+from logging import WARNING
 from ujson import loads
 from pytz import utc
 
 
-with open("data/area_code.json", "r", encoding="utf-8") as f:
-    AREA_CODE = loads(f.read())
+AREA_CODE = lazy_load("data/area_code.json")
 
 
 class DataManager(DatabaseManager):
@@ -49,6 +50,13 @@ class DataManager(DatabaseManager):
     async def reads(self, cursor) -> list:
         return [row async for row in cursor.get_datas(self.DB, {})]
 
+    def page_by_time(self, nof_time: str):
+        "指定された時間に通知をするユーザーのデータを少しずつ取得します。"
+        return page_rows(
+            self.db.pool, self.DB, ("UserID", "Code", "NofTime"), ("UserID",),
+            "NofTime = %s", (nof_time,), 100
+        )
+
 
 i = -1
 PREFECTURES = [(data["@title"], i)
@@ -223,15 +231,16 @@ class Tenki(commands.Cog, DataManager):
             await sleep(3)
 
         now = (datetime.now(utc) + timedelta(hours=9)).strftime('%H:%M')
-        for row in await self.reads():
-            if row and row[2] == now:
+        # 接続を使い続けないように、少しずつ取得してから通知を送る。
+        async for rows in self.page_by_time(now):
+            for row in rows:
                 user = self.bot.get_user(row[0])
                 if user:
                     embed = await self.make_embed(row[1])
                     try:
                         await user.send(embed=embed)
                     except Exception as e:
-                        print("Error on tenki's notification", e)
+                        self.bot.print("[Tenki]", "Failed to notify:", e, level=WARNING)
                 else:
                     await self.delete(row[0])
 
@@ -7,7 +7,7 @@ from jishaku.functools import executor_function
 from asyncio import sleep
 import deep_translator
 
-from util import RT
+from util import RT, message_listener
 
 
 CHP_HELP = {
@@ -148,13 +148,11 @@ class Translator(commands.Cog):
         except deep_translator.exceptions.LanguageNotSupportedException:
             await ctx.reply("その言語は対応していません。")
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, topic=("rf>translate", "rf>tran", "rf>翻訳", "rf>ほんやく"))
     async def on_message(self, message: discord.Message):
-        if isinstance(message.channel, discord.Thread):
-            return
-        if ((message.author.bot and not (
+        if message.author.bot and not (
             message.author.discriminator == "0000" and " #" in message.author.name
-        )) or not message.guild or not message.channel.topic):
+        ):
             return
 
         for line in message.channel.topic.splitlines():
@@ -6,7 +6,7 @@ from discord.ext import commands
 from discord import app_commands
 import discord
 
-from util import securl, DatabaseManager
+from util import securl, DatabaseManager, message_listener
 
 from re import findall
 from urllib.parse import urlparse
@@ -188,16 +188,13 @@ class UrlChecker(commands.Cog, DataManager):
 
     EMOJI = "<:search:876360747440017439>"
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, me=False, command=False, urls=True)
     async def on_message(self, message: discord.Message):
-        if (not message.guild or message.author.id == self.bot.user.id
-                or message.guild.id not in self.cache):
+        if message.guild.id not in self.cache:
             return
 
-        if (("http://" in message.content or "https://" in message.content)
-            and "https://discord.com" not in message.content
-            and message.channel.id not in self.channel_runnings
-                and not message.content.startswith(tuple(self.bot.command_prefix))):
+        if ("https://discord.com" not in message.content
+                and message.channel.id not in self.channel_runnings):
             try:
                 await message.add_reaction(self.EMOJI)
             except discord.NotFound:
@@ -11,16 +11,21 @@ from time import time
 import discord
 from jishaku.functools import executor_function
 
-from niconico import NicoNico, objects as niconico_objects
-from youtube_dl import YoutubeDL
 from requests import get
 import urllib.parse
 import urllib.request
 
+from util import Lazy, lazy_import
+
 if __name__ == "__main__":
     from .__init__ import MusicCog
 
 
+NicoNico = lazy_import("niconico", "NicoNico")
+niconico_objects = lazy_import("niconico.objects")
+YoutubeDL = lazy_import("youtube_dl", "YoutubeDL")
+
+
 #   youtube_dl用のオプションの辞書
 # 音楽再生時に使用するオプション
 NORMAL_OPTIONS = {
@@ -83,7 +88,7 @@ def yf_getduration(id):
     return tit
 
 
-niconico = NicoNico()
+niconico = Lazy(NicoNico, "niconico.NicoNico()")
 
 
 def make_niconico_music(
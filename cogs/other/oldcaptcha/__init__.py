@@ -93,7 +93,7 @@ class DataManager(DatabaseManager):
                 "Mode": "TEXT",
                 "RoleID": "BIGINT",
                 "Extras": "TEXT"
-            }
+            }, json_columns=("Extras",)
         )
 
     async def save(
@@ -9,7 +9,7 @@ from collections import defaultdict
 from re import findall
 from time import time
 
-from util import RT
+from util import RT, message_listener
 
 
 class TokenRemover(commands.Cog):
@@ -28,11 +28,8 @@ class TokenRemover(commands.Cog):
             r"[N]([a-zA-Z0-9]{23})\.([a-zA-Z0-9]{6})\.([a-zA-Z0-9]{27})", content
         ))
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, me=False)
     async def on_message(self, message: discord.Message):
-        if not message.guild or message.author.id == self.bot.user.id:
-            return
-
         if self.check_token(message.content):
             self.cache[message.guild.id][message.author.id][0] += 1
             self.cache[message.guild.id][message.author.id][1] = \
@@ -8,6 +8,8 @@ import discord
 from emoji import EMOJI_DATA as UNICODE_EMOJI_ENGLISH
 from asyncio import create_task
 
+from util import reaction_interest
+
 
 class OldRolePanel(commands.Cog):
     def __init__(self, bot):
@@ -211,6 +213,7 @@ class OldRolePanel(commands.Cog):
             ), **kwargs
         )
 
+    @reaction_interest(bot_authored=True)
     @commands.Cog.listener()
     async def on_full_reaction_add(self, payload: discord.RawReactionActionEvent):
         if self.bot.is_ready() and hasattr(payload, "message"):
@@ -228,6 +231,7 @@ class OldRolePanel(commands.Cog):
                 else:
                     await payload.message.remove_reaction(emoji, payload.member)
 
+    @reaction_interest(bot_authored=True)
     @commands.Cog.listener()
     async def on_full_reaction_remove(self, payload: discord.RawReactionActionEvent):
         if str(payload.emoji) != "🛠":
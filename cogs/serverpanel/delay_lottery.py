@@ -3,7 +3,7 @@
 from discord.ext import commands, tasks
 import discord
 
-from util import RT
+from util import RT, reaction_interest
 from util.mysql_manager import DatabaseManager
 from time import time
 
@@ -181,7 +181,9 @@ class DelayLottery(commands.Cog, DataManager):
                     if row[0] < now:
                         if (channel := guild.get_channel(row[1])):
                             try:
-                                message = await channel.fetch_message(row[2])
+                                message = await self.bot.cogs["MessageCache"].fetch(
+                                    channel, row[2]
+                                )
                             except discord.NotFound:
                                 continue
                             if message.reactions:
@@ -197,6 +199,7 @@ class DelayLottery(commands.Cog, DataManager):
             else:
                 await self.delete_guild(guild_id)
 
+    @reaction_interest(emojis=(EMOJIS["error"],), bot_authored=True)
     @commands.Cog.listener()
     async def on_full_reaction_add(self, payload):
         if (not hasattr(payload, "message") or not payload.message.guild
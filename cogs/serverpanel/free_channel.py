@@ -5,7 +5,7 @@ from typing import Literal
 from discord.ext import commands
 import discord
 
-from util import RT
+from util import RT, message_listener
 
 from asyncio import sleep
 
@@ -239,14 +239,10 @@ but this ID does not need to be included in the channel name when removing it.""
              "en": "..."}
         )
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, content=True, topic="RTフリーチャンネル")
     async def on_message(self, message):
-        if (not message.guild or not hasattr(message.channel, "topic")
-                or not message.content or not message.channel.topic):
-            return
-
-        topic = message.channel.topic if message.channel.topic else ""
-        if ("RTフリーチャンネル" in topic and "作成者" not in topic
+        topic = message.channel.topic
+        if ("作成者" not in topic
                 and message.channel.category):
             # フリーチャンネルでのユーザーへの返信の場合は
             if not (message.author.id == self.bot.user.id
@@ -6,16 +6,13 @@ import discord
 from emoji import EMOJI_DATA as UNICODE_EMOJI_ENGLISH
 from typing import Dict
 
+from util import reaction_interest
+
 
 class NicknamePanel(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.emojis = [chr(0x1f1e6 + i) for i in range(26)]
-        for e in ("add", "remove"):
-            self.bot.add_listener(
-                self.on_full_reaction_add_remove,
-                f"on_full_reaction_{e}"
-            )
 
     def parse_description(self, description: str) -> Dict[str, str]:
         # 文字列から絵文字と文字列を分けて取り出す。
@@ -121,6 +118,9 @@ class NicknamePanel(commands.Cog):
         for emoji in emojis:
             await message.add_reaction(emoji)
 
+    @reaction_interest(bot_authored=True)
+    @commands.Cog.listener("on_full_reaction_add")
+    @commands.Cog.listener("on_full_reaction_remove")
     async def on_full_reaction_add_remove(
         self, payload: discord.RawReactionActionEvent,
     ):
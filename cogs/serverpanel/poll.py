@@ -9,7 +9,7 @@ import discord
 
 from emoji import EMOJI_DATA as UNICODE_EMOJI_ENGLISH
 
-from util import RT
+from util import RT, message_listener, reaction_interest
 
 
 class CloseButton(discord.ui.View):
@@ -59,7 +59,7 @@ class Poll(commands.Cog):
         self.bot.add_view(self.view)
         self.panel_updater.start()
 
-    @commands.Cog.listener()
+    @message_listener(content=True)
     async def on_message(self, message):
         if message.content.startswith("投票rt "):
             message.content = message.content.replace("投票rt", "rf!poll")
@@ -269,6 +269,7 @@ class Poll(commands.Cog):
             create_task(self.update_panel(self.queue[cmid]))
             del self.queue[cmid]
 
+    @reaction_interest(bot_authored=True)
     @commands.Cog.listener()
     async def on_full_reaction_add(self, payload: discord.RawReactionActionEvent):
         if self.bot.is_ready() and hasattr(payload, "message"):
@@ -289,6 +290,7 @@ class Poll(commands.Cog):
                             return
                 self.queue[cmid] = payload
 
+    @reaction_interest(bot_authored=True)
     @commands.Cog.listener()
     async def on_full_reaction_remove(self, payload: discord.RawReactionActionEvent):
         await self.on_full_reaction_add(payload)
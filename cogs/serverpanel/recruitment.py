@@ -6,6 +6,8 @@ import discord
 from asyncio import create_task
 from time import time
 
+from util import reaction_interest
+
 
 class Recruitment(commands.Cog):
 
@@ -158,6 +160,7 @@ class Recruitment(commands.Cog):
             create_task(self.update_panel(self.queue[key]))
             del self.queue[key]
 
+    @reaction_interest(emojis=(EMOJI,), bot_authored=True)
     @commands.Cog.listener()
     async def on_full_reaction_add(self, payload):
         if (hasattr(payload, "message") and "RT募集パネル" in payload.message.content
@@ -169,6 +172,7 @@ class Recruitment(commands.Cog):
 
             self.queue[f"{payload.channel_id}.{payload.message_id}"] = payload
 
+    @reaction_interest(emojis=(EMOJI,), bot_authored=True)
     @commands.Cog.listener()
     async def on_full_reaction_remove(self, payload):
         await self.on_full_reaction_add(payload)
@@ -19,6 +19,9 @@ if TYPE_CHECKING:
     from ._oldrole import OldRolePanel
 
 
+DEPENDS = ("cogs.serverpanel._oldrole",)
+"先に読み込まれている必要があるエクステンションです。"
+
 get_ja: Callable[[str], str] = \
     lambda mode: "付与" if mode is True or mode == "Add" else "剥奪"
 Mode = Literal["Add", "Remove"]
@@ -10,7 +10,7 @@ import discord
 from ujson import loads, dumps
 
 from util import RolesConverter
-from util import componesy
+from util import componesy, reaction_interest
 
 if TYPE_CHECKING:
     from aiomysql import Pool
@@ -345,10 +345,12 @@ class Ticket(commands.Cog, DataManager):
                 if (first := await self.read(payload.guild_id)):
                     await channel.send(first)
 
+    @reaction_interest(emojis=("🎫",), bot_authored=True)
     @commands.Cog.listener()
     async def on_full_reaction_add(self, payload):
         await self.on_ticket(payload)
 
+    @reaction_interest(emojis=("🎫",), bot_authored=True)
     @commands.Cog.listener()
     async def on_full_reaction_remove(self, payload):
         await self.on_ticket(payload)
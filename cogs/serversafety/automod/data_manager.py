@@ -10,6 +10,7 @@ from aiomysql import Cursor
 from time import time
 
 from util import DatabaseManager
+from util.mysql_manager import stream_rows
 
 from .cache import Cache
 
@@ -116,8 +117,8 @@ class DataManager(DatabaseManager):
 
     async def _reset_warn(self, now: float, cursor: Cursor = None) -> None:
         "一日以上アップデートされていない警告数をリセットする。"
-        await cursor.execute(f"SELECT * FROM {self.TABLES[0]};")
-        for row in await cursor.fetchall():
+        # 読み込みは別の接続で少しずつ行い、書き込みはcursorで行う。
+        async for row in stream_rows(self.pool, f"SELECT * FROM {self.TABLES[0]};"):
             if not row:
                 continue
             data = self.get_classed(
@@ -47,16 +47,15 @@ async def log(
     reason: str, subject: str, error: bool = False
 ) -> discord.Message:
     "ログを流します。"
-    for channel in cache.guild.text_channels:
-        if channel.topic and "rt>automod" in channel.topic:
-            return await channel.send(
-                f"<t:{int(time())}>", embed=discord.Embed(
-                    title="AutoMod",
-                    description=f"{cache.member.mention}を{reason}のため{subject}しました。"
-                                (f"\nですが権限がないので{subject}することができませんでした。" if error else ""),
-                    color=cache.cog.COLORS["error" if error else "warn"]
-                )
+    if channel := cache.cog.bot.cogs["TopicIndex"].find(cache.guild, "rt>automod"):
+        return await channel.send(
+            f"<t:{int(time())}>", embed=discord.Embed(
+                title="AutoMod",
+                description=f"{cache.member.mention}を{reason}のため{subject}しました。"
+                            + (f"\nですが権限がないので{subject}することができませんでした。" if error else ""),
+                color=cache.cog.COLORS["error" if error else "warn"]
             )
+        )
 
 
 def get(cache: "Cache", data: "GuildData", key: str) -> Any:
@@ -15,7 +15,7 @@ from aiomysql import Pool, Cursor
 from ujson import loads, dumps
 
 from util import DatabaseManager
-from util import RT
+from util import RT, message_listener, reaction_interest
 
 from .automod.modutils import emoji_count
 
@@ -294,10 +294,9 @@ class Blocker(commands.Cog, DataManager):
             ):
                 yield mode
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, member=True)
     async def on_message(self, message: discord.Message):
-        if (message.guild and isinstance(message.author, discord.Member)
-                and message.guild.id in self.cache):
+        if message.guild.id in self.cache:
             # ブロックをするかをチェックする。
             for mode in self.is_should_check(message.author):
                 content = ""
@@ -316,6 +315,7 @@ class Blocker(commands.Cog, DataManager):
                     )
                     break
 
+    @reaction_interest(bots=True, predicate=lambda self, payload: payload.guild_id in self.cache)
     @commands.Cog.listener()
     async def on_full_reaction_add(self, payload: discord.RawReactionActionEvent):
         if payload.guild_id is not None and payload.guild_id in self.cache:
@@ -11,7 +11,7 @@ from time import time
 from discord.ext import commands, tasks
 import discord
 
-from util import RT, Table
+from util import RT, Table, message_listener
 
 from .image import ImageCaptcha, QueueData as ImageQueue
 from .web import WebCaptcha
@@ -458,11 +458,10 @@ class Captcha(commands.Cog, DataManager):
             # もしCpatchaクラスにon_member_joinがあるならQueueDataに値を設定できるようにそれを呼び出す。
             await self.dispatch(self.get_captcha(row[0]), "on_member_join", member)
 
-    @commands.Cog.listener()
+    @message_listener(guild=True)
     async def on_message(self, message: discord.Message):
         # 合言葉認証に必要なのでon_messageを呼び出しておく。
-        if (message.guild and message.author
-                and self.queued(message.guild.id, message.author.id)):
+        if self.queued(message.guild.id, message.author.id):
             await self.dispatch(
                 self.get_captcha(
                     self.queue[message.guild.id][message.author.id][2].mode
@@ -3,6 +3,7 @@
 from typing import Optional
 
 from random import choice
+from logging import WARNING
 
 from discord.ext import commands
 from discord import app_commands
@@ -236,7 +237,10 @@ class GlobalBan(commands.Cog, DataManager):
                                 f"{member.name}をBANしました。\n理由：\n{reason}"
                             )
                     except Exception as e:
-                        print("Error on gban :", e)
+                        self.bot.print(
+                            "[Gban]", "Failed to ban:", e,
+                            level=WARNING, guild_id=guild.id
+                        )
 
         await ctx.reply("追加しました。")
 
@@ -256,7 +260,10 @@ class GlobalBan(commands.Cog, DataManager):
                                 f"{member.name}のBANを解除しました。"
                             )
                     except Exception as e:
-                        print("Error on ungban :", e)
+                        self.bot.print(
+                            "[Gban]", "Failed to unban:", e,
+                            level=WARNING, guild_id=guild.id
+                        )
 
         await ctx.reply("削除しました。")
 
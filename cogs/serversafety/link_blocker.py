@@ -6,7 +6,7 @@ from discord.ext import commands
 from discord import app_commands
 import discord
 
-from util import RT
+from util import RT, message_listener
 
 if TYPE_CHECKING:
     from aiomysql import Pool, Cursor
@@ -251,9 +251,9 @@ class LinkBlocker(commands.Cog, DataManager):
 
     SCHEMES = ("https://", "http://")
 
-    @commands.Cog.listener()
+    @message_listener(guild=True)
     async def on_message(self, message: discord.Message):
-        if (message.guild and message.guild.id in self.guilds
+        if (message.guild.id in self.guilds
                 and any(scheme in message.content for scheme in self.SCHEMES)
                 and message.channel.id not in self.ignores):
             await message.delete()
@@ -1,11 +1,22 @@
 # Free RT - Ng Nickname
 
+from unicodedata import combining, normalize
+
 from discord.ext import commands
 from discord import app_commands
 import discord
 
 from aiomysql import Pool
 
+from util.mysql_manager import bulk_delete
+
+
+def fold(word: str) -> str:
+    "MySQLの照合順序のように、大文字と小文字やアクセントの違いを無視して比べるための文字列にします。"
+    return "".join(
+        char for char in normalize("NFKD", word) if not combining(char)
+    ).casefold()
+
 
 class NGNickName(commands.Cog):
 
@@ -176,27 +187,28 @@ class NGNickName(commands.Cog):
         word : str
             Target NG Nickname.  
             You can delete multiple items at once by starting a new line."""
-        failed = []
+        words = word.splitlines()
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cursor:
-                for word in word.splitlines():
-                    await cursor.execute(
-                        f"SELECT * FROM {self.DB} WHERE GuildID = %s AND Word = %s;",
-                        (ctx.guild.id, word)
-                    )
-                    if await cursor.fetchone():
-                        await cursor.execute(
-                            f"DELETE FROM {self.DB} WHERE GuildID = %s AND Word = %s;",
-                            (ctx.guild.id, word)
-                        )
-                    else:
-                        failed.append(word)
+                await cursor.execute(
+                    f"""SELECT Word FROM {self.DB} WHERE GuildID = %s
+                    AND Word IN ({', '.join(['%s'] * len(words))});""",
+                    (ctx.guild.id, *words)
+                )
+                found = {row[0] for row in await cursor.fetchall() if row}
+                await bulk_delete(
+                    cursor, self.DB, ("GuildID", "Word"),
+                    [(ctx.guild.id, word) for word in found]
+                )
+        # `IN`はデータベースの照合順序で比べるので、見つかった言葉は入力と綴りが違うことがある。
+        found = {fold(word) for word in found}
+        failed = [word for word in words if fold(word) not in found]
         b = ', '.join(failed)
         await ctx.reply(
             {"ja": "削除しました。"
-                   (f"ですが{b}は見つかりませんでした。" if failed else ""),
+                   + (f"ですが{b}は見つかりませんでした。" if failed else ""),
              "en": "Removed."
-                   (f"But {b} are/is not found." if failed else "")}
+                   + (f"But {b} are/is not found." if failed else "")}
         )
 
 
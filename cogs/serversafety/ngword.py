@@ -6,7 +6,7 @@ from discord.ext import commands
 from discord import app_commands
 import discord
 
-from util import RT, Table
+from util import RT, Table, message_listener
 
 from ..channelplugin.log import log
 
@@ -167,14 +167,9 @@ class NgWord(commands.Cog, DataManager):
             self.remove(ctx.guild.id, word)
         await ctx.reply("Ok")
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, me=False, member=True)
     @log(force=True)
     async def on_message(self, message: discord.Message):
-        # 関係ないメッセージは無視する。
-        if (not message.guild or message.author.id == self.bot.user.id
-                or isinstance(message.author, discord.User)):
-            return
-
         if not message.author.guild_permissions.administrator:
             for word in self.get(message.guild.id):
                 if word in message.content:
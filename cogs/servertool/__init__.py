@@ -5,14 +5,13 @@ from typing import Union
 from datetime import datetime, timedelta
 from asyncio import TimeoutError, sleep
 from random import sample
-from os import listdir
-import traceback
 
 from discord.ext import commands
 from discord import app_commands
 import discord
 
 from util.page import EmbedPage
+from util import reaction_interest
 from data import PERMISSION_TEXTS
 
 
@@ -555,12 +554,13 @@ class ServerTool(commands.Cog):
         "trash": "🗑️"
     }
 
+    @reaction_interest(emojis=EMOJIS["star"] + (EMOJIS["trash"],))
     @commands.Cog.listener()
     async def on_full_reaction_add(self, payload):
         if (not payload.guild_id or not payload.member or payload.member.bot
-            or not hasattr(payload, "message")
-            or (getattr(payload.message.channel, "topic", "")
-                and "rt>star" in payload.message.channel.topic)):
+                or not hasattr(payload, "message")):
+            return
+        if self.bot.cogs["TopicIndex"].has(payload.message.channel.id, "rt>star"):
             return
 
         if (emoji := str(payload.emoji)) in self.EMOJIS["star"]:
@@ -575,9 +575,8 @@ class ServerTool(commands.Cog):
                         else:
                             count += 1
             else:
-                if (channel := discord.utils.find(
-                    lambda ch: ch.topic and "rt>star" in ch.topic,
-                    payload.message.guild.text_channels
+                if (channel := self.bot.cogs["TopicIndex"].find(
+                    payload.message.guild, "rt>star"
                 )):
                     cache = channel.topic[channel.topic.find("rt>star") + 7:]
                     try:
@@ -728,12 +727,4 @@ class ServerTool(commands.Cog):
 
 async def setup(bot):
     await bot.add_cog(ServerTool(bot))
-    for name in listdir("cogs/servertool"):
-        if not name.startswith(("_", ".")):
-            try:
-                await bot.load_extension(
-                    f"cogs.servertool.{name[:-3] if name.endswith('.py') else name}")
-            except Exception:
-                traceback.print_exc()
-            else:
-                bot.print("[Extension]", "Loaded", name)  # ロードログの出力
+    await bot.loader.load_package("cogs.servertool")
@@ -7,10 +7,12 @@ from discord import app_commands
 import discord
 
 from util.mysql_manager import DatabaseManager
+from util import message_listener
 
 from asyncio import sleep
 from ujson import loads
 from time import time
+from logging import WARNING
 
 
 class DataManager(DatabaseManager):
@@ -22,7 +24,7 @@ class DataManager(DatabaseManager):
             "bump", {
                 "GuildID": "BIGINT", "Mode": "TEXT",
                 "Data": "TEXT"
-            }
+            }, json_columns=("Data",)
         )
         await cursor.create_table(
             "bumpRanking", {
@@ -243,7 +245,7 @@ class Bump(commands.Cog, DataManager):
                     row[-1] = loads(row[-1])
                 except Exception as e:
                     if self.bot.test:
-                        print("Error on bump:", e)
+                        self.bot.print("[Bump]", "Error:", e, level=WARNING)
                 else:
                     if "notification" in row[-1]:
                         if (row[-1]["notification"] <= now
@@ -268,7 +270,10 @@ class Bump(commands.Cog, DataManager):
                                     await channel.send(**kwargs)
                                 except Exception as e:
                                     if self.bot.test:
-                                        print("Error on bump2:", e)
+                                        self.bot.print(
+                                            "[Bump]", "Failed to notify:", e,
+                                            level=WARNING, guild_id=channel.guild.id
+                                        )
 
                                 # 通知時刻をまた通知しないようにゼロにする。
                                 row[-1]["notification"] = 0
@@ -278,13 +283,13 @@ class Bump(commands.Cog, DataManager):
         # 遅れて再取得してもう一回on_messageを実行する。
         await sleep(seconds)
         try:
-            message = await message.channel.fetch_message(message.id)
+            message = await self.bot.cogs["MessageCache"].fetch(message.channel, message.id)
         except discord.NotFound:
             ...
         else:
             await self.on_message(message, True)
 
-    @commands.Cog.listener()
+    @message_listener(bot=True)
     async def on_message(self, message: discord.Message, retry: bool = False):
         if not self.bot.is_ready():
             return
@@ -4,9 +4,10 @@ from discord.ext import commands, tasks
 from discord import app_commands
 import discord
 
-from util import RT
-from util.mysql_manager import DatabaseManager
+from util import RT, message_listener
+from util.mysql_manager import DatabaseManager, page_rows
 from time import time
+from logging import WARNING
 
 
 class DataManager(DatabaseManager):
@@ -48,6 +49,16 @@ class DataManager(DatabaseManager):
         return [row async for row in cursor.get_datas(self.DB, {})
                 if row]
 
+    def page_due(self, now: float):
+        "削除する時間になったものを少しずつ取得します。"
+        return page_rows(
+            self.db.pool, self.DB, ("ChannelID", "MessageID", "DeleteTime"),
+            ("ChannelID", "MessageID"), "DeleteTime <= %s", (now,), 100
+        )
+
+    async def delete_many(self, cursor, rows: list[tuple[int, int]]) -> None:
+        await cursor.delete_many(self.DB, ("ChannelID", "MessageID"), rows)
+
     async def delete(self, cursor, channel_id: int, message_id: int) -> None:
         target = {"ChannelID": channel_id, "MessageID": message_id}
         if await cursor.exists(self.DB, target):
@@ -136,14 +147,9 @@ class DelayDelete(commands.Cog, DataManager):
         await self.write(ctx.channel.id, new.id, 60 * minutes)
         await ctx.message.delete()
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, bot=False, topic="rf>delaydelete ")
     async def on_message(self, message: discord.Message):
-        if (not message.guild or message.author.bot
-                or isinstance(message.channel, discord.Thread)
-                or not message.channel.topic):
-            return
-
-        for line in message.channel.topic.splitlines():
+        for line in self.bot.cogs["TopicIndex"].lines(message.channel.id, "rf>delaydelete "):
             if line.startswith("rf>delaydelete "):
                 try:
                     await self.write(
@@ -161,17 +167,21 @@ class DelayDelete(commands.Cog, DataManager):
     @tasks.loop(seconds=30)
     async def delete_loop(self):
         now = time()
-        for row in await self.reads():
-            if row[-1] <= now:
+        # 接続を使い続けないように、少しずつ取得してからメッセージを消す。
+        async for rows in self.page_due(now):
+            for row in rows:
                 channel = self.bot.get_channel(row[0])
                 if channel:
                     try:
-                        message = await channel.fetch_message(row[1])
+                        message = await self.bot.cogs["MessageCache"].fetch(channel, row[1])
                         await message.delete()
                     except Exception as e:
                         if self.bot.test:
-                            print("Error on Delay Delete:", e)
-                await self.delete(row[0], row[1])
+                            self.bot.print(
+                                "[DelayDelete]", "Error:", e,
+                                level=WARNING, guild_id=channel.guild.id
+                            )
+            await self.delete_many([row[:2] for row in rows])
 
 
 async def setup(bot):
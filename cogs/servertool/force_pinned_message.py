@@ -4,12 +4,13 @@ from typing import Optional, Tuple, Dict, List
 
 from collections import defaultdict
 from time import time
+from logging import WARNING
 
 from discord.ext import commands, tasks
 from discord import app_commands
 import discord
 
-from util import RT
+from util import RT, message_listener
 from util.mysql_manager import DatabaseManager as OldDatabaseManager
 from util import DatabaseManager, markdowns
 
@@ -269,9 +270,9 @@ class ForcePinnedMessage(commands.Cog, DataManager):
         else:
             await ctx.reply("インターバルは五秒から三時間までしか設定できません。")
 
-    @commands.Cog.listener()
+    @message_listener(guild=True)
     async def on_message(self, message: discord.Message):
-        if not message.guild or "- RT" in message.author.name or not self.bot.is_ready():
+        if "- RT" in message.author.name or not self.bot.is_ready():
             return
 
         if message.channel.id not in self.remove_queue:
@@ -304,7 +305,9 @@ class ForcePinnedMessage(commands.Cog, DataManager):
             new_message = None
             if fpm[1] != 0:
                 try:
-                    before_message = await message.channel.fetch_message(fpm[1])
+                    before_message = await self.bot.cogs["MessageCache"].fetch(
+                        message.channel, fpm[1]
+                    )
 
                     if before_message:
                         await before_message.delete()
@@ -349,7 +352,10 @@ class ForcePinnedMessage(commands.Cog, DataManager):
                     )
                 except Exception as e:
                     if not isinstance(e, (discord.Forbidden, discord.HTTPException)):
-                        print("(ignore) Error on ForcePinnedMessage:", e)
+                        self.bot.print(
+                            "[ForcePinnedMessage]", "(ignore) Error:", e,
+                            level=WARNING, guild_id=getattr(message.guild, "id", None)
+                        )
 
             # 送信したメッセージを次消せるように記録しておく。
             if message.guild and message.channel and member:
@@ -366,7 +372,7 @@ class ForcePinnedMessage(commands.Cog, DataManager):
         self, channel: discord.TextChannel, member: discord.Member
     ) -> Optional[Tuple[str, bool]]:
         "カスタム名とアイコンをどうするかを取得する。"
-        if hasattr(channel, "topic") and "rt>fpm " in (channel.topic or "..."):
+        if self.bot.cogs["TopicIndex"].has(channel.id, "rt>fpm "):
             custom = channel.topic[channel.topic.find("rt>fpm"):]
             end = custom.find("\n")
             custom = custom[7:] if end == -1 else custom[7:end]
@@ -121,15 +121,12 @@ class DataManager:
         now = time()
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cursor:
-                await cursor.execute(f"SELECT * FROM {TABLES[1]};")
-
-                for row in await cursor.fetchall():
-                    if now - row[3] > DEFAULT_GHOST_TIME:
-                        # もしDEFAULT_GHOST_TIME秒放置されているロールデータがあるなら削除する。
-                        await cursor.execute(
-                            f"DELETE FROM {TABLES[1]} WHERE GuildID = %s AND UserID = %s;",
-                            (row[0], row[1])
-                        )
+                # もしDEFAULT_GHOST_TIME秒放置されているロールデータがあるなら削除する。
+                # 全ての行を読み込まずにデータベース側で絞り込んで削除する。
+                await cursor.execute(
+                    f"DELETE FROM {TABLES[1]} WHERE UpdateTime < %s;",
+                    (now - DEFAULT_GHOST_TIME,)
+                )
 
 
 class RoleKeeper(commands.Cog, DataManager):
@@ -7,6 +7,8 @@ import discord
 
 from asyncio import sleep
 
+from util import message_listener
+
 from .constants import MAX_CHANNELS, HELP
 from .dataclass import DataManager
 
@@ -401,25 +403,25 @@ class ThreadManager(commands.Cog, DataManager):
                 lang, *HELP[lang]
             )
 
-    @commands.Cog.listener()
+    @message_listener(me=False, topic="rt>thread")
     async def on_message(self, message: discord.Message):
-        if (hasattr(message.channel, "topic") and message.channel.topic
-                and "rt>thread" in message.channel.topic
-                and message.author.id != self.bot.user.id):
-            if "rt>thread bot" in message.channel.topic or not message.author.bot:
-                # スレッド作成専用チャンネルにメッセージが送信されたならスレッドを作る。
-                if message.channel.slowmode_delay < 10:
-                    # もしスローモードが設定されていないなら十秒にする。
-                    await message.channel.edit(slowmode_delay=10)
-                content = message.clean_content
-
-                await message.channel.create_thread(
-                    name=(
-                        content[:content.find("\n")]
-                        if "\n" in content else content
-                    ),
-                    message=message
-                )
+        if not message.author.bot or any(
+            "rt>thread bot" in line
+            for line in self.bot.cogs["TopicIndex"].lines(message.channel.id, "rt>thread")
+        ):
+            # スレッド作成専用チャンネルにメッセージが送信されたならスレッドを作る。
+            if message.channel.slowmode_delay < 10:
+                # もしスローモードが設定されていないなら十秒にする。
+                await message.channel.edit(slowmode_delay=10)
+            content = message.clean_content
+
+            await message.channel.create_thread(
+                name=(
+                    content[:content.find("\n")]
+                    if "\n" in content else content
+                ),
+                message=message
+            )
 
 
 async def setup(bot):
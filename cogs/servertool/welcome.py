@@ -170,7 +170,7 @@ class Welcome(commands.Cog, DataManager):
     async def on_member_join_remove(self, mode: str, member: discord.Member):
         if self.bot.is_ready():
             if (row := await self.read(member.guild.id, mode)):
-                row[2] = (
+                content = (
                     row[2]
                     .replace("$ment$", member.mention)
                     .replace("$name$", member.name)
@@ -178,7 +178,7 @@ class Welcome(commands.Cog, DataManager):
                 channel = member.guild.get_channel(row[1])
                 if channel:
                     await sleep(3)
-                    await channel.send(row[2])
+                    await channel.send(content)
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
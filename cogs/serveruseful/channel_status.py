@@ -5,7 +5,7 @@ from discord import app_commands
 import discord
 
 from util import RT
-from util.mysql_manager import DatabaseManager
+from util.mysql_manager import DatabaseManager, page_rows
 
 
 class DataManager(DatabaseManager):
@@ -26,9 +26,12 @@ class DataManager(DatabaseManager):
         )
         return await cursor.cursor.fetchall()
 
-    async def load_all(self, cursor) -> list:
-        await cursor.cursor.execute("SELECT * FROM channelStatus;")
-        return await cursor.cursor.fetchall()
+    def page_all(self):
+        "全てのチャンネルステータスを少しずつ取得します。"
+        return page_rows(
+            self.db.pool, "channelStatus", ("GuildID", "ChannelID", "Text"),
+            ("GuildID", "ChannelID"), batch_size=100
+        )
 
     async def save(self, cursor, guild_id: int, channel_id: int, text: str) -> None:
         target = {"GuildID": guild_id, "ChannelID": channel_id}
@@ -147,17 +150,19 @@ class ChannelStatus(commands.Cog, DataManager):
 
     @tasks.loop(minutes=5)
     async def status_updater(self):
-        for _, channel_id, text in await self.load_all():
-            channel = self.bot.get_channel(channel_id)
-            if channel:
-                if channel.name != (
-                        text := self.replace_text(text, channel.guild)):
-                    try:
-                        await channel.edit(
-                            name=text, reason="ステータス更新のため。/To update status."
-                        )
-                    except Exception as e:
-                        self._last_exception = e
+        # 接続を使い続けないように、少しずつ取得してからチャンネルを編集する。
+        async for rows in self.page_all():
+            for _, channel_id, text in rows:
+                channel = self.bot.get_channel(channel_id)
+                if channel:
+                    if channel.name != (
+                            text := self.replace_text(text, channel.guild)):
+                        try:
+                            await channel.edit(
+                                name=text, reason="ステータス更新のため。/To update status."
+                            )
+                        except Exception as e:
+                            self._last_exception = e
 
 
 async def setup(bot):
@@ -6,7 +6,7 @@ from discord.ext import commands
 from discord import app_commands
 import discord
 
-from util import RT
+from util import RT, message_listener
 from util.mysql_manager import DatabaseManager
 
 from re import findall
@@ -134,11 +134,8 @@ class Expander(commands.Cog, DataManager):
             await self.set_ignore(ctx.channel.id, onoff)
         await ctx.reply("Ok")
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, bot=False)
     async def on_message(self, message: discord.Message):
-        if not message.guild or message.author.bot:
-            return
-
         datas = findall(self.PATTERN, message.content)
         if datas:
             if await self.read(message.guild.id, message.channel.id):
@@ -157,7 +154,9 @@ class Expander(commands.Cog, DataManager):
 
                     if channel:
                         try:
-                            fetched_message = await channel.fetch_message(int(data[2]))
+                            fetched_message = await self.bot.cogs["MessageCache"].fetch(
+                                channel, int(data[2])
+                            )
                         except discord.Forbidden:
                             await message.add_reaction(
                                 self.bot.cogs["TTS"].EMOJIS["error"]
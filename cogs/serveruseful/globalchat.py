@@ -8,8 +8,11 @@ import discord
 
 from collections import defaultdict
 from util.mysql_manager import DatabaseManager
+from util import message_listener
+from util.webhooks import cache as webhook_cache
 from functools import wraps
 from time import time
+from logging import WARNING
 
 if TYPE_CHECKING:
     from util import Backend
@@ -309,7 +312,9 @@ class GlobalChat(commands.Cog, DataManager):
             else:
                 ch = self.bot.get_channel(message.channel.id)
                 original = (
-                    await ch.fetch_message(message.reference.message_id)
+                    await self.bot.cogs["MessageCache"].fetch(
+                        ch, message.reference.message_id
+                    )
                     if ch else None
                 )
 
@@ -331,41 +336,42 @@ class GlobalChat(commands.Cog, DataManager):
                     .set_footer(text="添付されたスタンプ")
                 )
 
-        # 送る。
-        for _, channel_id, _ in rows:
-            if message.channel.id == channel_id:
-                continue
-            else:
-                channel = self.bot.get_channel(channel_id)
-                if channel:
-                    if channel.guild.id not in self.ban_cache:
-                        async for entry in channel.guild.bans():
-                            self.ban_cache[channel.guild.id].append(
-                                entry.user.id
-                            )
-                    if all(
-                        user_id != message.author.id
-                        for user_id in self.ban_cache[channel.guild.id]
-                    ):
-                        try:
-                            await channel.webhook_send(
-                                username=f"{message.author.name} {message.author.id}",
-                                avatar_url=getattr(message.author.display_avatar, "url", ""),
-                                content=message.clean_content, embeds=embeds, files=[
-                                    await attachment.to_file()
-                                    for attachment in message.attachments
-                                ]
-                            )
-                        except Exception as e:
-                            print("Error on global chat :", e)
+        # 送信先のウェブフックをまとめて取得しておく。
+        channels = [
+            channel for _, channel_id, _ in rows
+            if message.channel.id != channel_id
+            and (channel := self.bot.get_channel(channel_id))
+        ]
+        await webhook_cache.resolve_many(channels)
 
-    @commands.Cog.listener()
+        # 送る。
+        for channel in channels:
+            if channel.guild.id not in self.ban_cache:
+                async for entry in channel.guild.bans():
+                    self.ban_cache[channel.guild.id].append(
+                        entry.user.id
+                    )
+            if all(
+                user_id != message.author.id
+                for user_id in self.ban_cache[channel.guild.id]
+            ):
+                try:
+                    await channel.webhook_send(
+                        username=f"{message.author.name} {message.author.id}",
+                        avatar_url=getattr(message.author.display_avatar, "url", ""),
+                        content=message.clean_content, embeds=embeds, files=[
+                            await attachment.to_file()
+                            for attachment in message.attachments
+                        ]
+                    )
+                except Exception as e:
+                    self.bot.print(
+                        "[GlobalChat]", "Failed to send:", e,
+                        level=WARNING, guild_id=channel.guild.id
+                    )
+
+    @message_listener(guild=True, bot=False, topic="RT-GlobalChat")
     async def on_message(self, message: discord.Message):
-        if (not message.guild or isinstance(message.channel, discord.Thread)
-                or not message.channel.topic or message.author.bot
-                or "RT-GlobalChat" not in message.channel.topic):
-            return
-
         row = await self.load_globalchat_name(message.channel.id)
         if row:
             # スパムの場合は一分停止させる。
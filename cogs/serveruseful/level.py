@@ -11,7 +11,7 @@ from discord import app_commands
 import discord
 
 from util.page import EmbedPage
-from util import RT, Table
+from util import RT, Table, message_listener
 
 
 Exp, Level = NewType("Exp", int), NewType("Level", int)
@@ -446,12 +446,8 @@ class Level(commands.Cog):
                             "remove", message, data["replace_role_id"]
                         )
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, bot=False, command=False)
     async def on_message(self, message: discord.Message):
-        if (message.author.bot or not message.guild
-                or message.content.startswith(self.bot.prefixes)):
-            return
-
         if self.data.l[message.guild.id].get("data", True):
             if "data" not in self.data.l[message.guild.id]:
                 self.data.l[message.guild.id].data = {}
@@ -8,7 +8,7 @@ import discord
 
 from aiomysql import Pool, Cursor
 
-from util import DatabaseManager
+from util import DatabaseManager, message_listener
 
 
 class DataManager(DatabaseManager):
@@ -248,15 +248,9 @@ class OriginalCommand(commands.Cog, DataManager):
             await self.update_cache()
             await ctx.reply("Ok")
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, me=False, command=False)
     async def on_message(self, message: discord.Message):
-        if not message.guild:
-            return
-
-        if ((data := self.data.get(message.guild.id))
-                and message.author.id != self.bot.user.id
-                and not message.content.startswith(
-                    tuple(self.bot.command_prefix))):
+        if (data := self.data.get(message.guild.id)):
             count = 0
             for command in data:
                 if ((data[command]["reply"] and command in message.content)
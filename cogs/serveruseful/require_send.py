@@ -9,6 +9,8 @@ import discord
 from asyncio import Event
 from time import time
 
+from util import message_listener
+
 if TYPE_CHECKING:
     from aiomysql import Pool, Cursor
     from util import Backend
@@ -411,9 +413,9 @@ class RequireSend(commands.Cog, DataManager):
                     async with conn.cursor() as cursor:
                         await self.add_queue(cursor, member.guild.id, 0, member.id)
 
-    @commands.Cog.listener()
+    @message_listener(guild=True)
     async def on_message(self, message: discord.Message):
-        if message.guild and message.channel.id in self.cache.get(message.guild.id, ()):
+        if message.channel.id in self.cache.get(message.guild.id, ()):
             await self.process_check(message)
 
 
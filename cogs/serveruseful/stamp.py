@@ -8,6 +8,7 @@ import discord
 
 from util.mysql_manager import DatabaseManager
 from util.page import EmbedPage
+from util import message_listener
 
 
 class DataManager(DatabaseManager):
@@ -226,13 +227,9 @@ class Stamp(commands.Cog, DataManager):
                  "en": "The stamp has not registered yet."}
             )
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, bot=False, command=False)
     async def on_message(self, message: discord.Message):
-        if (message.guild and not message.author.bot
-                and (data := self.cache.get(message.guild.id))
-                and not message.content.startswith(
-                    tuple(self.bot.command_prefix)
-                )):
+        if (data := self.cache.get(message.guild.id)):
             for name in data:
                 if name in message.content:
                     await message.channel.send(data[name])
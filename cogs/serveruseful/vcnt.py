@@ -2,7 +2,6 @@
 
 from typing import Union, Optional, Sequence, Any
 
-from youtube_dl import YoutubeDL
 from ujson import loads
 import nacl.secret
 import subprocess
@@ -21,12 +20,12 @@ from discord.utils import get
 from discord.ui import View
 import discord
 
-from util import RTCPacket, BufferDecoder
+from util import RTCPacket, BufferDecoder, lazy_import, lazy_load
 from cogs.music.player import Player
 
 
-with open("data/area_code.json", "r", encoding="utf-8") as f:
-    AREA_CODE = loads(f.read())
+YoutubeDL = lazy_import("youtube_dl", "YoutubeDL")
+AREA_CODE = lazy_load("data/area_code.json")
 
 
 class StrToCommand:
@@ -2,6 +2,8 @@
 
 from typing import Union
 
+from logging import WARNING
+
 from discord.ext import commands, tasks
 from discord import app_commands
 import discord
@@ -206,7 +208,10 @@ class VoiceRole(commands.Cog, DataManager):
                             await member.remove_roles(role)
                     except Exception as e:
                         if self.bot.test:
-                            print("Error on VoiceRole:", e)
+                            self.bot.print(
+                                "[VoiceRole]", "Error:", e,
+                                level=WARNING, guild_id=member.guild.id
+                            )
                     finally:
                         self.queue[key][member].remove((mode, role))
                 else:
@@ -14,7 +14,7 @@ import discord
 from aiofiles.os import remove
 
 from util.slash import UnionContext
-from util import RT, Table
+from util import RT, Table, message_listener
 from util import TimeoutView
 
 from .agents import AGENTS
@@ -29,6 +29,7 @@ class RoutineData(TypedDict):
 
 class TTSUserData(Table):
     __allocation__ = "UserID"
+    __lazy__ = True
     routines: list[RoutineData]
     voice: str
 
@@ -71,6 +72,7 @@ class SelectAgentView(TimeoutView):
         ]
     )
     async def agent_select(self, select: discord.ui.Select, interaction: discord.Interaction):
+        await self.cog.user.load(interaction.user.id)
         self.cog.user[interaction.user.id].voice = select.values[0]
         await interaction.response.send_message({"ja": "設定しました。", "en": "Ok"})
 
@@ -479,11 +481,10 @@ class TTSCog(commands.Cog, name="TTS"):
         else:
             await ctx.reply({"ja": "見つかりませんでした。", "en": "Not found"})
 
-    @commands.Cog.listener()
+    @message_listener(guild=True, content=True, command=False)
     async def on_message(self, message: discord.Message):
-        if message.guild and message.content and message.guild.id in self.now \
-                and self.now[message.guild.id].check_channel(message.channel.id) \
-                and not message.content.startswith(tuple(self.bot.command_prefix)):
+        if message.guild.id in self.now \
+                and self.now[message.guild.id].check_channel(message.channel.id):
             await self.now[message.guild.id].add(message)
 
     @commands.Cog.listener()
@@ -506,6 +507,10 @@ class TTSCog(commands.Cog, name="TTS"):
         self.bot.loop.create_task(manager.disconnect(reason)) \
             .add_done_callback(lambda _: self.now.pop(manager.guild.id))
 
+    async def cog_before_invoke(self, ctx: commands.Context):
+        # 遅延読み込みなのでコマンドの実行前にユーザーのデータを読み込んでおく。
+        await self.user.load(ctx.author.id)
+
     async def cog_unload(self):
         self.auto_leave.cancel()
         for manager in list(self.now.values()):
@@ -7,7 +7,6 @@ from enum import Enum
 
 from subprocess import Popen, TimeoutExpired, PIPE
 from asyncio import get_running_loop
-from os.path import exists
 
 from re import sub, findall
 
@@ -15,14 +14,17 @@ import discord
 
 from jishaku.functools import executor_function
 
-from pyopenjtalk import g2p
-from gtts import gTTS
-
 from aiofiles import open as aioopen
 from aiohttp import ClientSession
-from bs4 import BeautifulSoup
 from ujson import load, dumps
 
+from util import Lazy, lazy_import, lazy_load
+
+
+g2p = lazy_import("pyopenjtalk", "g2p")
+gTTS = lazy_import("gtts", "gTTS")
+BeautifulSoup = lazy_import("bs4", "BeautifulSoup")
+
 
 ENG2KANA_DATA_PATH = "cogs/tts/data/eng2kana.json"
 "英語からカタカナに変換されている辞書があるJSONファイルです。"
@@ -50,26 +52,20 @@ class VoiceTypes(Enum):
     gtts = 3
 
 
-with open(ALLOWED_CHARACTERS_CSV, "r", encoding="utf8") as f:
-    ALLOWED_CHARACTERS = tuple(f.read().split())
-    "AquesTalkで使える文字のタプル"
+ALLOWED_CHARACTERS: Lazy[frozenset[str]] = lazy_load(
+    ALLOWED_CHARACTERS_CSV, lambda data: frozenset(data.split())
+)
+"AquesTalkで使える文字の集合"
 Source = Union[discord.FFmpegOpusAudio, discord.FFmpegPCMAudio]
 
-# 英語とカタカナの辞書を読み込んでおく。
-eng2kanaData: dict[str, str] = {}
-if exists(ENG2KANA_DATA_PATH):
-    with open(ENG2KANA_DATA_PATH, "r") as f:
-        eng2kanaData.update(load(f))
-else:
-    # 存在しないなら空のものを作っておく。
-    with open(ENG2KANA_DATA_PATH, "w") as f:
-        f.write(r"{}")
+# 英語とカタカナの辞書です。存在しない場合は空で始めて、単語が追加された時に作られる。
+eng2kanaData: Lazy[dict[str, str]] = lazy_load(ENG2KANA_DATA_PATH, default={})
 
 
 async def _dumps_eng2kana_data():
     # eng2kanaのデータを保存します。
     async with aioopen(ENG2KANA_DATA_PATH, "w") as f:
-        await f.write(dumps(eng2kanaData, indent=2, ensure_ascii=False))
+        await f.write(dumps(eng2kanaData.load(), indent=2, ensure_ascii=False))
 
 
 HEADERS = {'User-Agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:47.0) Gecko/20100101 Firefox/47.0'}
@@ -145,7 +141,8 @@ async def adjust_text(text: str, gtts: bool = False) -> str:
     if not gtts:
         # 読めない文字は消す。
         text = await aiog2p(text, kana=True)
-        text = "".join(char for char in text if char in ALLOWED_CHARACTERS)
+        allowed = ALLOWED_CHARACTERS.load()
+        text = "".join(char for char in text if char in allowed)
 
     # 英語をかなにする。
     return await eng2kana(text)
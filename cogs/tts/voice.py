@@ -38,6 +38,7 @@ class Voice:
     async def synthe(self) -> None:
         """音声合成を行います。Routineの場合はRoutineのSourceを作ります。
         インスタンス変数の`source`にSource入れられます。"""
+        await self.cog.user.load(self.message.author.id)
         # Routineがあるかチェックをする。
         for routine in self.cog.user[self.message.author.id].get("routines", ()):
             if any(key in self.message.content for key in routine["keys"]):
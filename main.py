@@ -3,9 +3,7 @@ LICENSE : ./LICENSE
 README  : ./readme.md
 """
 
-from os import listdir
 from sys import argv
-import traceback
 
 import discord
 
@@ -53,24 +51,19 @@ bot.Colors = Colors  # botで使う基本色が入っているclass
 
 @bot.listen()
 async def on_ready():
-    bot.print("Connected to discord")
+    bot.print("Connected to discord", limit=False)
 
     # 拡張を読み込む
     await bot.setup()
-    for name in listdir("cogs"):
-        if not name.startswith(("_", ".")):
-            try:
-                await bot.load_extension(
-                    f"cogs.{name[:-3] if name.endswith('.py') else name}")
-            except Exception:
-                traceback.print_exc()
-            else:
-                bot.print("[Extension]", "Loaded", name)  # ロードログの出力
+    # 起動に必要ないものは`full_ready`の後に読み込む。
+    deferred = await bot.loader.load_all(deferred=True)
     await bot.unload_extension("cogs._first")
-    bot.print("Completed to boot Free RT")
+    bot.print("Completed to boot Free RT", limit=False)
 
     bot.dispatch("full_ready")  # full_readyイベントを発火する
-    await bot.tree.sync()  # スラコマのツリーを同期する
+    await bot.loader.load_deferred(deferred)
+    bot.loader.print_report()  # 読み込みにかかった時間の出力
+    await bot.sync_tree()  # 変更があった場合だけスラコマのツリーを同期する
 
 
 # 実行
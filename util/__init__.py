@@ -12,7 +12,8 @@ from .converters import (
 )
 from .data_manager import DatabaseManager
 from .dpy_monkey import setup
-from .lib_data_manager import Table
+from .lib_data_manager import Table, NotLoadedError
+from .lazy import Lazy, lazy_import, lazy_load
 from .minesweeper import MineSweeper
 from . import mysql_manager as mysql
 from .olds import tasks_extend, sendKwargs
@@ -23,6 +24,8 @@ from .views import TimeoutView
 from .webhooks import get_webhook, webhook_send
 
 from .ext import view as componesy
+from .ext.message_pipeline import MessageFacts, message_listener
+from .ext.on_full_reaction import reaction_interest
 
 
 __all__ = [
@@ -44,7 +47,11 @@ __all__ = [
     "docperser",
     "setup",
     "Table",
+    "NotLoadedError",
     "markdowns",
+    "Lazy",
+    "lazy_import",
+    "lazy_load",
     "MineSweeper",
     "mysql",
     "olds",
@@ -65,5 +72,8 @@ __all__ = [
     "webhook_send",
     "websocket",
     "ext",
-    "componesy"
+    "componesy",
+    "MessageFacts",
+    "message_listener",
+    "reaction_interest"
 ]
@@ -1,18 +1,58 @@
 # Free RT Util - Bot
 
+from typing import Any, Optional
+
 from discord.ext import commands
+from discord import app_commands
+import discord
+
+from asyncio import CancelledError
+from logging import INFO
+from time import perf_counter
 
 from aiohttp import ClientSession
 from ujson import dumps
 
 from .dpy_monkey import _setup
 from . import mysql_manager as mysql
+from .migrations import migrate
 from .db import add_db_manager
+from .webhooks import cache as webhook_cache
+from .extension_loader import ExtensionLoader
+from .tree_sync import sync_tree
+from .handler_stats import HandlerStats
+from .log import setup_logging
+from .query_stats import caller_cog
+
+
+class RTCommandTree(app_commands.CommandTree):
+    "スラッシュコマンドの実行時間を`bot.handler_stats`に記録するツリーです。"
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        kind = "autocomplete" if interaction.type is discord.InteractionType.autocomplete \
+            else "app_command"
+        metric = self.client.handler_stats.get(
+            f"{kind}:{(interaction.data or {}).get('name', 'unknown')}"
+        )
+        metric.start()
+        started, failed = perf_counter(), True
+        try:
+            await super()._call(interaction)
+            failed = getattr(interaction, "command_failed", False)
+        finally:
+            metric.stop(perf_counter() - started, failed)
 
 
 class RT(commands.AutoShardedBot):
     def __init__(self, *args, **kwargs):
-        return super().__init__(*args, **kwargs)
+        kwargs.setdefault("tree_cls", RTCommandTree)
+        super().__init__(*args, **kwargs)
+        # エクステンションを並列で読み込むためのもの
+        self.loader = ExtensionLoader(self)
+        # リスナーとコマンドの実行時間の統計
+        self.handler_stats = HandlerStats()
+        # `print`で使うロガー。出力は別のスレッドで行われる。
+        self.logger, self._log_listener, self.log_limiter = setup_logging()
 
     @property
     def session(self) -> ClientSession:
@@ -33,19 +73,87 @@ class RT(commands.AutoShardedBot):
             **self.secret["mysql"],
             pool=True,
             minsize=1,
-            maxsize=500 if self.test else 1000000,
+            maxsize=20 if self.test else 100,
             autocommit=True
-        )  # maxsizeはテスト用では500、本番環境では100万になっている
+        )  # maxsizeはテスト用では20、本番環境では100になっている。これを超えた分は優先度ごとに順番待ちになる。
+        await self.mysql.wait_until_ready()
         self.pool = self.mysql.pool  # bot.mysql.pool のエイリアス
-
-    def print(self, *args, **kwargs) -> None:
-        "[RT log]と色の装飾を加えてprintをします。"
-        temp = [*args]
-        if len(args) >= 1 and args[0].startswith("[") and args[0].endswith("]"):
-            temp[0] = f"\033[93m{args[0]}\033[0m"
-        if len(args) >= 2 and args[1].startswith("[") and args[1].endswith("]"):
-            temp[1] = f"\033[95m{args[1]}\033[0m"
-        return print("\033[32m[RT log]\033[0m", *temp, **kwargs)
+        # テーブルに主キーやインデックスを追加するマイグレーションを実行する。
+        await migrate(self)
+
+    def print(
+        self, *args, level: int = INFO, cog: Optional[str] = None,
+        guild_id: Optional[int] = None, shard_id: Optional[int] = None,
+        event: Optional[str] = None, exc_info: Any = None, limit: bool = True,
+        **kwargs
+    ) -> None:
+        """[RT log]と色の装飾を加えてログを出力します。
+        最初の二つまでの`[...]`の形の引数はタグになります。出力は別のスレッドで行われるのでブロッキングしません。
+
+        Parameters
+        ----------
+        *args
+            出力するものです。
+        level : int, default logging.INFO
+            ログのレベルです。
+        cog : str, optional
+            出所のコグのモジュール名です。指定しない場合は呼び出し元から調べます。
+        guild_id : int, optional
+            関係するサーバーのIDです。
+        shard_id : int, optional
+            関係するシャードのIDです。
+        event : str, optional
+            何が起きたかを表す名前です。
+        exc_info : Any, optional
+            `logging`と同じで、`True`の場合は処理中の例外のトレースバックを含めます。
+        limit : bool, default True
+            出所ごとの件数の制限を受けるかどうかです。起動時のログなど、全て出力したいものは`False`にします。
+        **kwargs
+            `sep`以外は今までの`print`との互換性のためのもので、使われません。"""
+        tags = []
+        for arg in args[:2]:
+            if not (isinstance(arg, str) and arg.startswith("[") and arg.endswith("]")):
+                break
+            tags.append(arg[1:-1])
+        self.logger.log(
+            level, kwargs.get("sep", " ").join(map(str, args[len(tags):])),
+            exc_info=exc_info, extra={
+                "tags": tags, "cog": cog or caller_cog(), "guild_id": guild_id,
+                "shard_id": shard_id, "event": event, "limit": limit
+            }
+        )
+
+    async def _run_event(self, coro, event_name: str, *args, **kwargs) -> None:
+        # discord.pyの`Client._run_event`と同じことをしながら実行時間を記録する。
+        metric = self.handler_stats.get(
+            f"{event_name}:{getattr(coro, '__qualname__', repr(coro))}"
+        )
+        metric.start()
+        started, failed = perf_counter(), False
+        try:
+            await coro(*args, **kwargs)
+        except CancelledError:
+            pass
+        except Exception:
+            failed = True
+            try:
+                await self.on_error(event_name, *args, **kwargs)
+            except CancelledError:
+                pass
+        finally:
+            metric.stop(perf_counter() - started, failed)
+
+    async def invoke(self, ctx: commands.Context) -> None:
+        "コマンドを実行します。実行時間を記録します。"
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        metric = self.handler_stats.get(f"command:{ctx.command.qualified_name}")
+        metric.start()
+        started = perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            metric.stop(perf_counter() - started, ctx.command_failed)
 
     def get_ip(self) -> str:
         return "localhost" if self.test else "60.158.90.139"
@@ -59,25 +167,45 @@ class RT(commands.AutoShardedBot):
         self.dispatch("close", self.loop)
         await super().close()
         self.print("Bye")
+        # キューに残っているログを出力してからスレッドを止める。
+        self._log_listener.stop()
+
+    async def on_webhooks_update(self, channel) -> None:
+        "ウェブフックが作成/編集/削除された際にそのチャンネルのウェブフックのキャッシュを消す。"
+        webhook_cache.invalidate(channel.id)
 
     def get_website_url(self) -> str:
         return "http://localhost/" if self.test else "https://free-rt.com/"
 
     async def add_cog(self, cog, override: bool = True, **kwargs):
-        "add_cogの拡張。overrideがデフォルトでTrueなのと、OnCogAddに関する動作をする。"
+        "add_cogの拡張。overrideがデフォルトでTrueなのと、OnCogAddとMessagePipelineとOnFullReactionAddRemoveに関する動作をする。"
         if "OnCogAdd" in self.cogs:
             self.cogs["OnCogAdd"]._add_cog(cog, **kwargs)
-        return await super().add_cog(cog, override=override, **kwargs)
+        await super().add_cog(cog, override=override, **kwargs)
+        if "MessagePipeline" in self.cogs:
+            # on_messageのリスナーを登録する。
+            self.cogs["MessagePipeline"].add_cog(cog)
+        if "OnFullReactionAddRemove" in self.cogs:
+            # リアクションのリスナーが必要とするものを登録する。
+            self.cogs["OnFullReactionAddRemove"].add_cog(cog)
 
     async def remove_cog(self, cog_name):
-        "remove_cogの拡張。OnCogAddに関する動作をする。"
+        "remove_cogの拡張。OnCogAddとMessagePipelineとOnFullReactionAddRemoveに関する動作をする。"
         if "OnCogAdd" in self.cogs:
             self.cogs["OnCogAdd"]._remove_cog(cog_name)
+        if "MessagePipeline" in self.cogs:
+            self.cogs["MessagePipeline"].remove_cog(cog_name)
+        if "OnFullReactionAddRemove" in self.cogs:
+            self.cogs["OnFullReactionAddRemove"].remove_cog(cog_name)
         return await super().remove_cog(cog_name)
 
     async def setup(self, mode=()) -> None:
         "utilにある拡張cogをすべてもしくは指定されたものだけ読み込みます。"
         return await _setup(self, mode)
 
+    async def sync_tree(self, force: bool = False) -> list[int]:
+        "スラッシュコマンドのツリーのうち、変更があったものだけを同期します。"
+        return await sync_tree(self, force)
+
     async def add_db_manager(self, manager):
         return await add_db_manager(self, manager)
@@ -5,6 +5,9 @@ from __future__ import annotations
 from typing import Generic, TypeVar, Any, Optional
 from collections.abc import Iterator, Callable
 
+from collections import OrderedDict
+from heapq import heappush, heappop, heapify
+from itertools import count
 from time import time
 
 from discord.ext import tasks
@@ -34,29 +37,65 @@ KeyT, ValueT = TypeVar("KeyT"), TypeVar("ValueT")
 
 
 class Cacher(Generic[KeyT, ValueT]):
-    "キャッシュを管理するためのクラスです。\n注意: CacherPoolと兼用しないとデータは自然消滅しません。"
-
-    def __init__(self, lifetime: float, default: Optional[Callable[[], Any]] = None):
-        self.data: dict[KeyT, Cache[ValueT]] = {}
-        self.lifetime, self.default = lifetime, default
-
-        self.get, self.pop = self.data.get, self.data.pop
+    """キャッシュを管理するためのクラスです。
+    `maxsize`を指定した場合は、それを超えた際に最後に使われたのが古いものから削除されます。
+    注意: CacherPoolと兼用しないとデータは自然消滅しません。"""
+
+    def __init__(
+        self, lifetime: float, default: Optional[Callable[[], Any]] = None,
+        maxsize: Optional[int] = None
+    ):
+        self.data: OrderedDict[KeyT, Cache[ValueT]] = OrderedDict()
+        self.lifetime, self.default, self.maxsize = lifetime, default, maxsize
+        # 期限が早い順に取り出せるようにするためのヒープです。
+        self._deadlines: list[tuple[float, int, KeyT, Cache[ValueT]]] = []
+        self._counter = count()
+        self.hits = self.misses = self.evictions = 0
+
+        self.pop = self.data.pop
         self.keys = self.data.keys
 
+    def get(self, key: KeyT, default: Any = None) -> Optional[Cache[ValueT]]:
+        "データが格納されたCacheを取得します。"
+        if key in self.data:
+            self.hits += 1
+            if self.maxsize is not None:
+                self.data.move_to_end(key)
+            return self.data[key]
+        self.misses += 1
+        return default
+
     def set(self, key: KeyT, data: ValueT, lifetime: Optional[float] = None) -> None:
         "値を設定します。\n別のライフタイムを指定することができます。"
-        self.data[key] = Cache(data, time() + (lifetime or self.lifetime))
+        cache = self.data[key] = Cache(data, time() + (lifetime or self.lifetime))
+        heappush(self._deadlines, (cache.deadline, next(self._counter), key, cache))
+        if self.maxsize is not None:
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+        if len(self._deadlines) > (len(self.data) + 64) * 2:
+            # 上書きや削除で使われなくなったものが溜まってきたら作り直す。
+            self._deadlines = [
+                item for item in self._deadlines if self.data.get(item[2]) is item[3]
+            ]
+            heapify(self._deadlines)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        "期限が切れたものを削除します。削除した数を返します。"
+        now, removed = now or time(), 0
+        while self._deadlines and self._deadlines[0][0] < now:
+            _, _, key, cache = heappop(self._deadlines)
+            if self.data.get(key) is cache:
+                del self.data[key]
+                removed += 1
+        return removed
 
     def __contains__(self, key: KeyT) -> bool:
         return key in self.data
 
-    def _default(self, key: KeyT):
-        if self.default is not None and key not in self.data:
-            self.set(key, self.default())
-
     def __getitem__(self, key: KeyT) -> ValueT:
-        self._default(key)
-        return self.data[key].data
+        return self.get_raw(key).data
 
     def __getattr__(self, key: KeyT) -> ValueT:
         return self[key]
@@ -70,6 +109,9 @@ class Cacher(Generic[KeyT, ValueT]):
     def __setitem__(self, key: KeyT, value: ValueT) -> None:
         self.set(key, value)
 
+    def __len__(self) -> int:
+        return len(self.data)
+
     def values(self, mode_list: bool = False) -> Iterator[ValueT]:
         for value in list(self.data.values()) if mode_list else self.data.values():
             yield value.data
@@ -80,11 +122,23 @@ class Cacher(Generic[KeyT, ValueT]):
 
     def get_raw(self, key: KeyT) -> Cache[ValueT]:
         "データが格納されたCacheを取得します。"
-        self._default(key)
-        return self.data[key]
+        if self.default is not None and key not in self.data:
+            self.misses += 1
+            self.set(key, self.default())
+            return self.data[key]
+        if (cache := self.get(key)) is None:
+            raise KeyError(key)
+        return cache
+
+    def stats(self) -> dict[str, Any]:
+        "ヒット数などの統計を返します。"
+        return {
+            "size": len(self.data), "maxsize": self.maxsize, "hits": self.hits,
+            "misses": self.misses, "evictions": self.evictions
+        }
 
     def __str__(self) -> str:
-        return f"<Cacher data={type(self.data)} defaultLifetime={self.lifetime}>"
+        return f"<Cacher data={type(self.data)} defaultLifetime={self.lifetime} maxsize={self.maxsize}>"
 
     def __repr__(self) -> str:
         return str(self)
@@ -97,9 +151,12 @@ class CacherPool:
         self.cachers: list[Cacher] = []
         self._cache_remover.start()
 
-    def acquire(self, lifetime: float, default: Optional[Callable[[], Any]] = None) -> Cacher:
+    def acquire(
+        self, lifetime: float, default: Optional[Callable[[], Any]] = None,
+        maxsize: Optional[int] = None
+    ) -> Cacher:
         "Cacherを生み出します。"
-        self.cachers.append(Cacher(lifetime, default))
+        self.cachers.append(Cacher(lifetime, default, maxsize))
         return self.cachers[-1]
 
     def release(self, cacher: Cacher) -> None:
@@ -108,11 +165,10 @@ class CacherPool:
 
     @tasks.loop(seconds=5)
     async def _cache_remover(self):
+        # 期限が来たものだけを削除する。
         now = time()
         for cacher in self.cachers:
-            for key, value in list(cacher.data.items()):
-                if value.is_dead(now):
-                    del cacher[key]
+            cacher.expire(now)
 
     def __del__(self):
         if self._cache_remover.is_running():
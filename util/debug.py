@@ -8,6 +8,9 @@ from aiofiles import open as async_open, os
 from functools import wraps
 import psutil
 
+from .lazy import LOADED, importtime_many
+from .rtws_frames import HAS_MSGPACK, run_benchmark
+
 
 def require_admin(coro):
     @wraps(coro)
@@ -128,6 +131,160 @@ class Debug(commands.Cog):
         )
         return embed
 
+    @debug.command(aliases=["sql", "db"])
+    @require_admin
+    async def queries(self, ctx, limit: int = 10):
+        stats = self.bot.mysql.stats.summary(limit)
+        lines = ["<<<QUERIES>>>"]
+        for row in stats["queries"]:
+            lines.append(
+                f"{row['total']:.3f}s / {row['count']} ({row['average'] * 1000:.1f}ms avg, "
+                f"{row['max'] * 1000:.1f}ms max, {row['rows']} rows) {row['cog']}\n  {row['query']}"
+            )
+        lines.append("<<<ACQUIRE WAIT>>>")
+        for cog, row in stats["acquires"].items():
+            lines.append(
+                f"{row['total']:.3f}s / {row['count']} ({row['max'] * 1000:.1f}ms max) {cog}"
+            )
+        lines.append("<<<POOL QUEUE>>>")
+        lines.append(str(self.bot.mysql.governor.metrics()))
+        lines.append("<<<SLOW QUERIES>>>")
+        for row in stats["slow"]:
+            lines.append(f"{row['elapsed']:.3f}s {row['cog']}\n  {row['query']}")
+        async with async_open(self.OUTPUT_PATH, "w") as f:
+            await f.write("\n".join(lines))
+        await ctx.reply(file=discord.File(self.OUTPUT_PATH))
+        await os.remove(self.OUTPUT_PATH)
+
+    @debug.command(aliases=["msg"])
+    @require_admin
+    async def messages(self, ctx):
+        metrics = self.bot.cogs["MessagePipeline"].metrics()
+        lines = [
+            "<<<MESSAGE PIPELINE>>>",
+            f"{metrics['handlers']} listeners, {metrics['skipped']} skipped by filters",
+            f"classify: {metrics['classify']['count']} messages "
+            f"({metrics['classify']['average'] * 1000:.3f}ms avg, "
+            f"{metrics['classify']['max'] * 1000:.3f}ms max)",
+            "<<<LISTENERS>>>"
+        ]
+        for name, row in metrics["listeners"].items():
+            lines.append(
+                f"{row['total']:.3f}s / {row['count']} ({row['average'] * 1000:.1f}ms avg, "
+                f"{row['max'] * 1000:.1f}ms max) {name}"
+            )
+        reactions = self.bot.cogs["OnFullReactionAddRemove"].metrics()
+        cache = self.bot.cogs["MessageCache"].metrics()
+        lines.extend((
+            "<<<REACTIONS>>>",
+            f"{reactions['interests']} interests, {reactions['skipped']} skipped",
+            "<<<MESSAGE CACHE>>>",
+            f"{cache['size']} cached, {cache['requests']} fetched, {cache['saved']} saved "
+            f"({cache['hit_rate'] * 100:.1f}% hit rate, {cache['hits']} hits, "
+            f"{cache['gateway_hits']} from gateway, {cache['not_found_hits']} not found, "
+            f"{cache['coalesced']} coalesced, {cache['invalidated']} invalidated)"
+        ))
+        async with async_open(self.OUTPUT_PATH, "w") as f:
+            await f.write("\n".join(lines))
+        await ctx.reply(file=discord.File(self.OUTPUT_PATH))
+        await os.remove(self.OUTPUT_PATH)
+
+    @debug.command(aliases=["listeners", "latency"])
+    @require_admin
+    async def handlers(self, ctx, limit: int = 20, prefix: str = "", key: str = "p95"):
+        try:
+            rows = self.bot.handler_stats.summary(limit, prefix, key)
+        except ValueError as e:
+            return await ctx.reply(str(e))
+        lines = [f"<<<HANDLERS (by {key})>>>"]
+        for name, row in rows.items():
+            lines.append(
+                f"p50 {row['p50'] * 1000:.1f}ms, p95 {row['p95'] * 1000:.1f}ms, "
+                f"p99 {row['p99'] * 1000:.1f}ms, max {row['max'] * 1000:.1f}ms / "
+                f"{row['count']} ({row['errors']} errors, {row['inflight']} running, "
+                f"{row['max_inflight']} max concurrency) {name}"
+            )
+        async with async_open(self.OUTPUT_PATH, "w") as f:
+            await f.write("\n".join(lines))
+        await ctx.reply(file=discord.File(self.OUTPUT_PATH))
+        await os.remove(self.OUTPUT_PATH)
+
+    @debug.command(aliases=["lag", "blocking"])
+    @require_admin
+    async def stalls(self, ctx, limit: int = 10):
+        metrics = self.bot.cogs["LoopWatchdog"].metrics()
+        lag = metrics["lag"]
+        lines = [
+            "<<<LOOP LAG>>>",
+            f"{lag['count']} samples ({lag['average'] * 1000:.1f}ms avg, "
+            f"{lag['max'] * 1000:.1f}ms max), buckets {lag['buckets']}",
+            f"<<<STALLS (>= {metrics['threshold']}s)>>>"
+        ]
+        for stall in metrics["stalls"][-limit:][::-1]:
+            lines.append(f"{stall['lag']:.3f}s {stall['cog']} ({stall['task']})")
+            lines.extend(
+                f"  {line}" for frame in stall["stack"] for line in frame.rstrip().splitlines()
+            )
+        async with async_open(self.OUTPUT_PATH, "w") as f:
+            await f.write("\n".join(lines))
+        await ctx.reply(file=discord.File(self.OUTPUT_PATH))
+        await os.remove(self.OUTPUT_PATH)
+
+    @debug.command(aliases=["ipc", "rtwsbench"])
+    @require_admin
+    async def rtws(self, ctx, calls: int = 100, rounds: int = 5):
+        async with ctx.typing():
+            results = await run_benchmark(calls, rounds)
+        lines = [f"<<<RTWS ECHO ({calls} calls x {rounds}, msgpack: {HAS_MSGPACK})>>>"]
+        for name, row in results.items():
+            lines.append(
+                f"{row['page_ms']:.2f}ms/page, {row['calls_per_sec']:.0f} calls/s, "
+                f"{row['frames']:.0f} frames, {row['bytes'] / 1024:.1f}KiB {name}"
+            )
+        text = "\n".join(lines)
+        await ctx.reply(f"```\n{text}\n```")
+
+    @debug.command(aliases=["language"])
+    @require_admin
+    async def sendhook(self, ctx, count: int = 10000):
+        # `Language._new_send`の一回の送信あたりにかかる時間を、最適化の前と後で計る。
+        results = self.bot.cogs["Language"].benchmark_send(count)
+        lines = [f"<<<SEND HOOK ({count} sends, us/send)>>>"]
+        for name, row in results.items():
+            lines.append(
+                f"{row['before']:.2f} -> {row['after']:.2f} "
+                f"(x{row['before'] / row['after']:.1f}) {name}"
+            )
+        text = "\n".join(lines)
+        await ctx.reply(f"```\n{text}\n```")
+
+    @debug.command(aliases=["importtime"])
+    @require_admin
+    async def imports(self, ctx, limit: int = 5, *, extensions: str = ""):
+        async with ctx.typing():
+            names = extensions.split() or [
+                name for name in self.bot.extensions if name.startswith("cogs.")
+            ]
+            results = await importtime_many(names)
+        lines = ["<<<IMPORT TIME>>>"]
+        for name, costs in sorted(
+            results.items(), key=lambda item: sum(cost.self for cost in item[1]),
+            reverse=True
+        ):
+            lines.append(f"{sum(cost.self for cost in costs):.3f}s {name}")
+            for cost in sorted(costs, key=lambda cost: cost.self, reverse=True)[:limit]:
+                lines.append(
+                    f"  {cost.self * 1000:.1f}ms self, {cost.cumulative * 1000:.1f}ms "
+                    f"cumulative {cost.module}"
+                )
+        lines.append("<<<LAZY LOADED>>>")
+        for name, elapsed in sorted(LOADED.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"{elapsed * 1000:.1f}ms {name}")
+        async with async_open(self.OUTPUT_PATH, "w") as f:
+            await f.write("\n".join(lines))
+        await ctx.reply(file=discord.File(self.OUTPUT_PATH))
+        await os.remove(self.OUTPUT_PATH)
+
     @debug.command()
     @require_admin
     async def monitor(self, ctx):
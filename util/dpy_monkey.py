@@ -12,7 +12,10 @@ from .ext import componesy
 
 
 async def _setup(self, mode: tuple[str, ...] = ()) -> None:
-    for name in ("on_send", "on_full_reaction", "on_cog_add"):
+    for name in (
+        "loop_watchdog", "on_send", "message_cache", "on_full_reaction", "on_cog_add", "topic_index",
+        "message_pipeline"
+    ):
         if name in mode or mode == ():
             try:
                 await self.load_extension("util.ext." + name)
@@ -2,7 +2,11 @@ from . import view as componesy
 
 __all__ = [
     "componesy",
+    "loop_watchdog",
     "on_cog_add",
     "on_full_reaction",
-    "on_send"
+    "message_cache",
+    "on_send",
+    "topic_index",
+    "message_pipeline"
 ]
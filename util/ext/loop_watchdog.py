@@ -0,0 +1,155 @@
+"""イベントループの遅延を計測して、ループが止まった時にどこで止まっていたかを記録するためのエクステンションです。
+ループの中で一定間隔で時間を記録し、別のスレッドからそれが途切れていないかを見ます。
+途切れていた場合はメインスレッドのスタックを取得して、実行中だったコグとタスク(リスナーなど)を記録します。
+記録したものは`debug stalls`とRTLifeから見ることができます。
+`bot.load_extension("util.ext.loop_watchdog")`で有効化することができます。
+また`util.setup(bot)`でも有効化することができます。"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
+
+from asyncio import Task, current_task, sleep
+from collections import deque
+from threading import Event, Thread, get_ident
+from time import perf_counter, time
+from types import FrameType
+import traceback
+import sys
+
+from discord.ext import commands
+
+from ..query_stats import Histogram
+
+if TYPE_CHECKING:
+    from ..bot import RT
+
+
+STACK_LIMIT = 20
+"記録するスタックの深さです。"
+
+
+class Stall(NamedTuple):
+    "イベントループが止まっていた時の記録です。"
+
+    time: float
+    "止まったことに気が付いた時間です。"
+    lag: float
+    "止まっていた秒数です。"
+    cog: str
+    "実行中だったコグのモジュール名です。見つからない場合は一番内側のutil以外のモジュール名です。"
+    task: str
+    "実行中だったタスクの名前です。discord.pyのイベントの場合は`discord.py: on_message`のようになります。"
+    stack: tuple[str, ...]
+    "止まっていた場所のスタックです。"
+
+
+def frame_cog(frame: Optional[FrameType]) -> str:
+    "フレームから呼び出し元のコグを調べます。`query_stats.caller_cog`と同じ方法です。"
+    fallback = None
+    while frame is not None:
+        name = frame.f_globals.get("__name__", "")
+        if name.startswith("cogs."):
+            return name
+        if fallback is None and not name.startswith(
+            ("util.", "asyncio", "threading", "concurrent", "selectors")
+        ):
+            fallback = name
+        frame = frame.f_back
+    return fallback or "unknown"
+
+
+class LoopWatchdog(commands.Cog):
+    """イベントループの遅延を計測するためのコグです。
+
+    Parameters
+    ----------
+    interval : float, default 0.1
+        ループの中で時間を記録する間隔と、別のスレッドから確認する間隔です。
+    threshold : float, default 0.5
+        ループがこれ以上の秒数止まっていた場合にスタックを取得します。
+    maxlen : int, default 50
+        保存しておく記録の数です。"""
+
+    def __init__(
+        self, bot: RT, interval: float = 0.1, threshold: float = 0.5, maxlen: int = 50
+    ):
+        self.bot, self.interval, self.threshold = bot, interval, threshold
+        self.lag = Histogram()
+        self.stalls: deque[Stall] = deque(maxlen=maxlen)
+        # `pop_max_lag`が呼ばれてからの最大の遅延です。RTLifeで使います。
+        self.window_max = 0.0
+        # コグはイベントループのスレッドで作られる。
+        self._loop_thread = get_ident()
+        self._beat = perf_counter()
+        self._captured: Optional[Stall] = None
+        self._stop = Event()
+        self._task: Optional[Task] = None
+        self._thread: Optional[Thread] = None
+
+    async def cog_load(self):
+        self._task = self.bot.loop.create_task(
+            self._heartbeat(), name="LoopWatchdog: heartbeat"
+        )
+        self._thread = Thread(target=self._watch, name="LoopWatchdog", daemon=True)
+        self._thread.start()
+
+    async def cog_unload(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            expected = perf_counter() + self.interval
+            await sleep(self.interval)
+            self._beat = now = perf_counter()
+            lag = max(now - expected, 0.0)
+            self.lag.add(lag)
+            if lag > self.window_max:
+                self.window_max = lag
+            if (stall := self._captured) is not None:
+                # 止まっていた時間はループが動き出してからわかる。
+                self._captured = None
+                if lag < self.threshold:
+                    # 確認した直後にループが動き出した場合
+                    continue
+                self.stalls.append(stall := stall._replace(lag=lag))
+                self.bot.print(
+                    "[LoopWatchdog]", f"Event loop was blocked for {lag:.2f}s",
+                    f"in {stall.cog} ({stall.task})"
+                )
+
+    def _watch(self):
+        # 別のスレッドで動く。
+        while not self._stop.wait(self.interval):
+            if self._captured is None \
+                    and perf_counter() - self._beat > self.interval + self.threshold:
+                self._captured = self._capture()
+
+    def _capture(self) -> Stall:
+        frame = sys._current_frames().get(self._loop_thread)
+        task = current_task(self.bot.loop)
+        return Stall(
+            time(), perf_counter() - self._beat, frame_cog(frame),
+            "unknown" if task is None else task.get_name(),
+            tuple(traceback.format_list(
+                traceback.extract_stack(frame, STACK_LIMIT)
+            )) if frame is not None else ()
+        )
+
+    def pop_max_lag(self) -> float:
+        "前に呼ばれてからの最大の遅延を返します。"
+        lag, self.window_max = self.window_max, 0.0
+        return lag
+
+    def metrics(self) -> dict[str, Any]:
+        "遅延の統計と最近の記録を返します。"
+        return {
+            "lag": self.lag.to_dict(), "threshold": self.threshold,
+            "stalls": [stall._asdict() for stall in self.stalls]
+        }
+
+
+async def setup(bot):
+    await bot.add_cog(LoopWatchdog(bot))
@@ -0,0 +1,174 @@
+"""`fetch_message`の結果をBot全体で使い回すためのエクステンションです。
+(チャンネルID, メッセージID)をキーに期限付きで保存し、discord.pyが持っているメッセージのキャッシュも一緒に使います。
+同じメッセージの取得が同時に行われた場合は一つのリクエストにまとめ、見つからなかったという結果も少しの間保存します。
+メッセージが編集/削除された場合は保存しているものを消します。
+`bot.load_extension("util.ext.message_cache")`で有効化することができます。
+また`util.setup(bot)`でも有効化することができます。
+
+# Examples
+```python
+try:
+    message = await bot.cogs["MessageCache"].fetch(channel, message_id)
+except discord.NotFound:
+    ...
+```"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from asyncio import Future, shield
+
+from discord.ext import commands
+import discord
+
+from ..cacher import Cacher
+
+if TYPE_CHECKING:
+    from ..bot import RT
+
+
+Key = tuple[int, int]
+Entry = Union[discord.Message, discord.NotFound]
+
+
+class MessageCache(commands.Cog):
+    """メッセージのキャッシュです。
+
+    Parameters
+    ----------
+    lifetime : float, default 30.0
+        取得したメッセージを保存しておく秒数です。
+    not_found_lifetime : float, default 10.0
+        メッセージが見つからなかったという結果を保存しておく秒数です。
+    maxsize : int, default 2048
+        保存しておくメッセージの最大数です。超えた場合は最後に使われたのが古いものから消されます。"""
+
+    def __init__(
+        self, bot: RT, lifetime: float = 30.0, not_found_lifetime: float = 10.0,
+        maxsize: int = 2048
+    ):
+        self.bot, self.not_found_lifetime = bot, not_found_lifetime
+        self.cache: Cacher[Key, Entry] = Cacher(lifetime, maxsize=maxsize)
+        # 取得中のメッセージです。同じメッセージの取得を一つにまとめるために使います。
+        self.fetching: dict[Key, Future] = {}
+        self.requests = self.hits = self.gateway_hits = self.not_found_hits = 0
+        self.coalesced = self.invalidated = 0
+
+    def _from_gateway(self, message_id: int) -> Optional[discord.Message]:
+        # discord.pyが持っているメッセージは編集やリアクションが自動で反映されている。
+        return self.bot._connection._get_message(message_id)
+
+    def get(
+        self, channel_id: int, message_id: int, *, fresh: bool = False
+    ) -> Optional[Entry]:
+        """キャッシュにあるメッセージを返します。
+        見つからなかったという結果が保存されている場合は`discord.NotFound`を返します。
+
+        Parameters
+        ----------
+        channel_id : int
+            チャンネルのIDです。
+        message_id : int
+            メッセージのIDです。
+        fresh : bool, default False
+            リアクションなどが最新であるdiscord.pyのキャッシュにあるものだけを返します。"""
+        if (message := self._from_gateway(message_id)) is not None:
+            self.gateway_hits += 1
+            return message
+        if (cache := self.cache.get((channel_id, message_id))) is None or cache.is_dead():
+            return None
+        if isinstance(cache.data, discord.NotFound):
+            self.not_found_hits += 1
+            return cache.data
+        if fresh:
+            return None
+        self.hits += 1
+        return cache.data
+
+    async def fetch(
+        self, channel: discord.abc.Messageable, message_id: int, *, fresh: bool = False
+    ) -> discord.Message:
+        """メッセージを取得します。キャッシュにあればそれを返します。
+
+        Parameters
+        ----------
+        channel : discord.abc.Messageable
+            メッセージがあるチャンネルです。
+        message_id : int
+            メッセージのIDです。
+        fresh : bool, default False
+            `True`の場合は、取得したメッセージをdiscord.pyのキャッシュにも入れます。
+            リアクションの数などを使う場合に、その後のイベントで内容が更新されるようにするためのものです。
+
+        Raises
+        ------
+        discord.NotFound
+            メッセージが見つからなかった場合に発生します。"""
+        key = (getattr(channel, "id", 0), message_id)
+        if (entry := self.get(*key, fresh=fresh)) is not None:
+            if isinstance(entry, discord.NotFound):
+                raise entry.with_traceback(None)
+            return entry
+        if key in self.fetching:
+            self.coalesced += 1
+            # 待っているものがキャンセルされても、一緒に待っている他のものに影響しないようにする。
+            return await shield(self.fetching[key])
+
+        self.fetching[key] = future = self.bot.loop.create_future()
+        try:
+            self.requests += 1
+            message = await channel.fetch_message(message_id)
+        except Exception as e:
+            if isinstance(e, discord.NotFound):
+                self.cache.set(key, e, self.not_found_lifetime)
+            if not future.done():
+                future.set_exception(e)
+                # 待っている人がいない場合に例外が取得されなかったという警告が出ないようにする。
+                future.exception()
+            raise
+        else:
+            self.cache.set(key, message)
+            if fresh and self.bot._connection._messages is not None:
+                self.bot._connection._messages.append(message)
+            if not future.done():
+                future.set_result(message)
+            return message
+        finally:
+            del self.fetching[key]
+            # 取得自体がキャンセルされた場合は、待っているものが止まったままにならないようにする。
+            if not future.done():
+                future.cancel()
+            self.cache.expire()
+
+    def invalidate(self, channel_id: int, message_id: int) -> None:
+        "保存しているメッセージを消します。"
+        if self.cache.pop((channel_id, message_id), None) is not None:
+            self.invalidated += 1
+
+    def metrics(self) -> dict[str, Any]:
+        "ヒット率と、キャッシュによって減らせたREST APIへのリクエストの数を返します。"
+        saved = self.hits + self.gateway_hits + self.not_found_hits + self.coalesced
+        return {
+            "size": len(self.cache), "requests": self.requests, "hits": self.hits,
+            "gateway_hits": self.gateway_hits, "not_found_hits": self.not_found_hits,
+            "coalesced": self.coalesced, "invalidated": self.invalidated, "saved": saved,
+            "hit_rate": round(saved / (saved + self.requests), 4) if saved else 0.0
+        }
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        self.invalidate(payload.channel_id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        self.invalidate(payload.channel_id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        for message_id in payload.message_ids:
+            self.invalidate(payload.channel_id, message_id)
+
+
+async def setup(bot):
+    await bot.add_cog(MessageCache(bot))
@@ -0,0 +1,221 @@
+"""`on_message`を一つにまとめて、メッセージごとに一度だけ調べた情報を使って必要なリスナーだけを呼び出すためのエクステンションです。
+コグで`commands.Cog.listener()`の代わりに`message_listener`を使うと、条件に合うメッセージの時だけそのメソッドが呼ばれます。
+`bot.load_extension("util.ext.message_pipeline")`で有効化することができます。
+また`util.setup(bot)`でも有効化することができます。
+
+# Examples
+```python
+class Cog(commands.Cog):
+    @message_listener(guild=True, bot=False, command=False, topic="rf>test")
+    async def on_message(self, message):
+        ...
+```"""
+
+from __future__ import annotations
+
+from typing import (
+    TYPE_CHECKING, Any, Callable, Coroutine, Mapping, NamedTuple, Optional, Union
+)
+
+from time import perf_counter
+import re
+
+from discord.ext import commands
+import discord
+
+from ..query_stats import Histogram
+from .topic_index import DIRECTIVES, EMPTY, parse
+
+if TYPE_CHECKING:
+    from ..bot import RT
+    from .topic_index import TopicIndex
+
+
+URL_PATTERN = re.compile(r"https?://[^\s]+")
+_UNSET: Any = object()
+
+
+class MessageFacts:
+    "メッセージごとに一度だけ調べた、リスナーの条件に使う情報です。"
+
+    __slots__ = (
+        "message", "guild", "bot", "me", "webhook", "member", "command",
+        "content", "mentions", "topic", "directives", "_urls"
+    )
+
+    def __init__(
+        self, message: discord.Message, bot: RT, prefixes: tuple[str, ...],
+        index: Optional[TopicIndex] = None
+    ):
+        self.message = message
+        self.guild = message.guild is not None
+        self.bot = message.author.bot
+        self.me = bot.user is not None and message.author.id == bot.user.id
+        self.webhook = message.webhook_id is not None
+        self.member = isinstance(message.author, discord.Member)
+        self.command = message.content.startswith(prefixes)
+        self.content = bool(message.content)
+        self.mentions = bool(
+            message.mentions or message.role_mentions or message.mention_everyone
+        )
+        # スレッドにはトピックがない。
+        self.topic: str = getattr(message.channel, "topic", None) or ""
+        # トピックにある設定です。`TopicIndex`があればそこから取得します。
+        self.directives: Mapping[str, list[str]] = (
+            index.get(message.channel.id) if index is not None
+            else parse(self.topic) if self.topic else EMPTY
+        )
+        self._urls = _UNSET
+
+    @property
+    def urls(self) -> list[str]:
+        "メッセージにあるURLです。"
+        if self._urls is _UNSET:
+            self._urls = URL_PATTERN.findall(self.message.content) \
+                if "http" in self.message.content else []
+        return self._urls
+
+    def lines(self, directive: str) -> list[str]:
+        "チャンネルのトピックにある、設定が含まれている行を返します。"
+        return self.directives.get(directive, [])
+
+
+class MessageFilter(NamedTuple):
+    "`message_listener`の条件です。`None`の場合はその条件を見ません。"
+
+    guild: Optional[bool] = None
+    bot: Optional[bool] = None
+    me: Optional[bool] = None
+    webhook: Optional[bool] = None
+    member: Optional[bool] = None
+    command: Optional[bool] = None
+    content: Optional[bool] = None
+    mentions: Optional[bool] = None
+    urls: Optional[bool] = None
+    topic: tuple[str, ...] = ()
+
+    def check(self, facts: MessageFacts) -> bool:
+        "メッセージが条件に合うかを確認します。"
+        for name in ("guild", "bot", "me", "webhook", "member", "command", "content", "mentions"):
+            if (expected := getattr(self, name)) is not None and getattr(facts, name) != expected:
+                return False
+        if self.urls is not None and bool(facts.urls) != self.urls:
+            return False
+        return not self.topic or any(
+            word in facts.directives if word in DIRECTIVES else word in facts.topic
+            for word in self.topic
+        )
+
+
+def message_listener(
+    *, topic: Union[str, tuple[str, ...]] = (), **kwargs: Optional[bool]
+) -> Callable:
+    """`MessagePipeline`から呼ばれる`on_message`のリスナーにするデコレータです。
+    条件は`MessageFilter`の属性名をキーワード引数で渡します。
+    例えば`guild=True, bot=False`はサーバーでのBotではない人のメッセージだけになります。
+
+    Parameters
+    ----------
+    topic : Union[str, tuple[str, ...]], default ()
+        チャンネルのトピックにこれのどれかが含まれている場合だけにします。
+        `util.ext.topic_index.DIRECTIVES`にあるものは`TopicIndex`を使って調べます。
+    **kwargs : Optional[bool]
+        `guild`, `bot`, `me`, `webhook`, `member`, `command`, `content`, `mentions`, `urls`です。"""
+    message_filter = MessageFilter(
+        topic=(topic,) if isinstance(topic, str) else tuple(topic), **kwargs
+    )
+
+    def decorator(func):
+        func.__message_filter__ = message_filter
+        return func
+    return decorator
+
+
+class Handler(NamedTuple):
+    name: str
+    cog: str
+    filter: MessageFilter
+    callback: Callable[[discord.Message], Coroutine]
+
+
+class MessagePipeline(commands.Cog):
+    def __init__(self, bot: RT):
+        self.bot = bot
+        self.handlers: list[Handler] = []
+        self.classify = Histogram()
+        self.timings: dict[str, Histogram] = {}
+        self.skipped = 0
+
+    async def cog_load(self):
+        for cog in self.bot.cogs.values():
+            self.add_cog(cog)
+
+    def add_cog(self, cog: commands.Cog) -> None:
+        "コグにある`message_listener`のリスナーを登録します。"
+        self.remove_cog(cog.qualified_name)
+        for name in dir(type(cog)):
+            if isinstance(
+                message_filter := getattr(getattr(type(cog), name, None), "__message_filter__", None),
+                MessageFilter
+            ):
+                self.handlers.append(Handler(
+                    f"{cog.qualified_name}.{name}", cog.qualified_name,
+                    message_filter, getattr(cog, name)
+                ))
+
+    def remove_cog(self, name: str) -> None:
+        "コグのリスナーの登録を解除します。"
+        self.handlers = [handler for handler in self.handlers if handler.cog != name]
+
+    @property
+    def prefixes(self) -> tuple[str, ...]:
+        if isinstance(self.bot.command_prefix, str):
+            return (self.bot.command_prefix,)
+        return tuple(self.bot.command_prefix)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        started = perf_counter()
+        facts = MessageFacts(
+            message, self.bot, self.prefixes, self.bot.cogs.get("TopicIndex")
+        )
+        handlers = [handler for handler in self.handlers if handler.filter.check(facts)]
+        self.skipped += len(self.handlers) - len(handlers)
+        self.classify.add(perf_counter() - started)
+        for handler in handlers:
+            self.bot.loop.create_task(
+                self._run(handler, message), name=f"message_pipeline: {handler.name}"
+            )
+
+    async def _run(self, handler: Handler, message: discord.Message) -> None:
+        # `bot.handler_stats`にも普通のリスナーと同じ形式で記録する。
+        metric = self.bot.handler_stats.get(f"on_message:{handler.name}")
+        metric.start()
+        started, failed = perf_counter(), False
+        try:
+            await handler.callback(message)
+        except Exception:
+            failed = True
+            await self.bot.on_error(f"on_message ({handler.name})", message)
+        finally:
+            elapsed = perf_counter() - started
+            if handler.name not in self.timings:
+                self.timings[handler.name] = Histogram()
+            self.timings[handler.name].add(elapsed)
+            metric.stop(elapsed, failed)
+
+    def metrics(self) -> dict[str, Any]:
+        "メッセージの振り分けとリスナーごとにかかった時間の統計を返します。"
+        return {
+            "handlers": len(self.handlers), "skipped": self.skipped,
+            "classify": self.classify.to_dict(),
+            "listeners": {
+                name: histogram.to_dict() for name, histogram in sorted(
+                    self.timings.items(), key=lambda item: item[1].total, reverse=True
+                )
+            }
+        }
+
+
+async def setup(bot):
+    await bot.add_cog(MessagePipeline(bot))
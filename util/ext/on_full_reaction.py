@@ -1,10 +1,171 @@
+"""リアクションの追加/削除の際に、メッセージを取得してから`on_full_reaction_add/remove`を呼び出すためのエクステンションです。
+メッセージの取得はREST APIを使うため、`reaction_interest`で必要だと宣言されているリアクションの時だけ行います。
+取得には`MessageCache`を使うので、同じメッセージの取得が同時に行われる場合は一つにまとめられます。
+`bot.load_extension("util.ext.on_full_reaction")`で有効化することができます。
+また`util.setup(bot)`でも有効化することができます。
+
+# Examples
+```python
+class Cog(commands.Cog):
+    @reaction_interest(emojis=("🎫",), bot_authored=True)
+    @commands.Cog.listener()
+    async def on_full_reaction_add(self, payload):
+        ...
+
+    # メッセージのIDで指定する場合は`predicate`を使います。
+    @reaction_interest(predicate=lambda self, payload: payload.message_id in self.panels)
+    @commands.Cog.listener("on_full_reaction_add")
+    @commands.Cog.listener("on_full_reaction_remove")
+    async def on_full_reaction_add_remove(self, payload):
+        ...
+```"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional
+
+from asyncio import sleep
 
 from discord.ext import commands
+import discord
+
+if TYPE_CHECKING:
+    from ..bot import RT
+
+
+EVENTS = ("add", "remove")
+Predicate = Callable[[Any, discord.RawReactionActionEvent], bool]
+
+
+class ReactionInterest(NamedTuple):
+    """`on_full_reaction_add/remove`のリスナーがどのリアクションを必要としているかです。
+    `emojis`は絞り込みで、`bot_authored`と`predicate`はどちらかに合えば対象になります。
+    どちらも指定されていない場合は全てのメッセージが対象です。"""
+
+    events: tuple[str, ...]
+    "`add`か`remove`です。"
+    emojis: frozenset[str] = frozenset()
+    "対象の絵文字です。空の場合は全ての絵文字が対象です。"
+    bot_authored: bool = False
+    "Botかウェブフックが送ったかもしれないメッセージを対象にするかどうかです。"
+    bots: bool = False
+    "Botが付けたリアクションも対象にするかどうかです。"
+    guild: bool = True
+    "サーバーでのリアクションだけを対象にするかどうかです。"
+    predicate: Optional[Predicate] = None
+    "コグと`RawReactionActionEvent`を受け取って、対象かどうかを返す関数です。"
+
+
+def reaction_interest(
+    *, emojis: tuple[str, ...] = (), bot_authored: bool = False, bots: bool = False,
+    guild: bool = True, predicate: Optional[Predicate] = None
+) -> Callable:
+    """`on_full_reaction_add/remove`のリスナーが必要とするリアクションを宣言するデコレータです。
+    `commands.Cog.listener()`より上に付けてください。
+    このデコレータがないリスナーしかないイベントでは、メッセージの取得が行われません。
+
+    Parameters
+    ----------
+    emojis : tuple[str, ...], default ()
+        対象の絵文字です。
+    bot_authored : bool, default False
+        Botかウェブフックが送ったメッセージを対象にします。
+        送信者がBotではないメンバーだとわかる場合にメッセージを取得しないようにするためのものです。
+    bots : bool, default False
+        Botが付けたリアクションも対象にします。
+    guild : bool, default True
+        サーバーでのリアクションだけを対象にします。
+    predicate : Callable[[Cog, RawReactionActionEvent], bool], optional
+        対象かどうかを返す関数です。メッセージのIDで絞り込む場合などに使います。"""
+    def decorator(func):
+        names = getattr(func, "__cog_listener_names__", ())
+        events = tuple(
+            event for event in EVENTS if f"on_full_reaction_{event}" in names
+        )
+        assert events, "`commands.Cog.listener()`で`on_full_reaction_add/remove`のリスナーにしてください。"
+        func.__reaction_interest__ = ReactionInterest(
+            events, frozenset(emojis), bot_authored, bots, guild, predicate
+        )
+        return func
+    return decorator
+
+
+class Interest(NamedTuple):
+    cog: str
+    interest: ReactionInterest
+    predicate: Optional[Callable[[discord.RawReactionActionEvent], bool]]
 
 
 class OnFullReactionAddRemove(commands.Cog):
-    def __init__(self, bot, timeout: float = 0.025):
+    def __init__(self, bot: RT, timeout: float = 0.025):
         self.bot, self.timeout = bot, timeout
+        self.interests: list[Interest] = []
+        self.skipped = 0
+
+    async def cog_load(self):
+        for cog in self.bot.cogs.values():
+            self.add_cog(cog)
+
+    def add_cog(self, cog: commands.Cog) -> None:
+        "コグにある`reaction_interest`を登録します。"
+        self.remove_cog(cog.qualified_name)
+        for name in dir(type(cog)):
+            if isinstance(
+                interest := getattr(getattr(type(cog), name, None), "__reaction_interest__", None),
+                ReactionInterest
+            ):
+                self.interests.append(Interest(
+                    cog.qualified_name, interest,
+                    None if interest.predicate is None else interest.predicate.__get__(cog)
+                ))
+
+    def remove_cog(self, name: str) -> None:
+        "コグの`reaction_interest`の登録を解除します。"
+        self.interests = [interest for interest in self.interests if interest.cog != name]
+
+    def _maybe_bot_authored(
+        self, payload: discord.RawReactionActionEvent, guild: Optional[discord.Guild]
+    ) -> bool:
+        # 送信者がBotではないメンバーだとわかる場合以外は、Botが送ったかもしれないとする。
+        # ウェブフックはメンバーではないので、メンバーが見つからない場合もこちらになります。
+        if (author_id := getattr(payload, "message_author_id", None)) is None or guild is None:
+            return True
+        return (member := guild.get_member(author_id)) is None or member.bot
+
+    def is_interested(self, payload: discord.RawReactionActionEvent, event: str) -> bool:
+        "リアクションが`reaction_interest`のどれかに合うかどうかを返します。"
+        guild = self.bot.get_guild(payload.guild_id) if payload.guild_id else None
+        user = payload.member or (guild.get_member(payload.user_id) if guild else None)
+        emoji, author = str(payload.emoji), None
+        for interest, predicate in ((item.interest, item.predicate) for item in self.interests):
+            if (event not in interest.events
+                    or (interest.guild and not payload.guild_id)
+                    or (not interest.bots and user is not None and user.bot)
+                    or (interest.emojis and emoji not in interest.emojis)):
+                continue
+            if not interest.bot_authored and predicate is None:
+                return True
+            if interest.bot_authored:
+                if author is None:
+                    author = self._maybe_bot_authored(payload, guild)
+                if author:
+                    return True
+            if predicate is not None and predicate(payload):
+                return True
+        return False
+
+    async def fetch_message(self, channel: discord.abc.Messageable, message_id: int) -> discord.Message:
+        """メッセージを取得します。
+        リアクションの数などが最新である必要があるので、discord.pyのキャッシュにない場合は取得し直します。"""
+        cache = self.bot.cogs["MessageCache"]
+        if cache.get(getattr(channel, "id", 0), message_id, fresh=True) is None:
+            # 同時に付けられたリアクションを取得したメッセージに含めるために少しだけ待つ。
+            await sleep(self.timeout)
+        return await cache.fetch(channel, message_id, fresh=True)
+
+    def metrics(self) -> dict[str, Any]:
+        "メッセージの取得をしなかった回数などの統計を返します。"
+        return {"interests": len(self.interests), "skipped": self.skipped}
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
@@ -15,6 +176,9 @@ class OnFullReactionAddRemove(commands.Cog):
         await self.on_raw_reaction_addremove(payload, "remove")
 
     async def on_raw_reaction_addremove(self, payload, event: str):
+        if not self.is_interested(payload, event):
+            self.skipped += 1
+            return
         # もし`self.on_reaction_addremove`が呼ばれなかった場合は自分でmessageを取得する。
         try:
             channel = (
@@ -22,7 +186,7 @@ class OnFullReactionAddRemove(commands.Cog):
                 if payload.guild_id
                 else self.bot.get_user(payload.user_id)
             )
-            payload.message = await channel.fetch_message(payload.message_id)
+            payload.message = await self.fetch_message(channel, payload.message_id)
             payload.member = (
                 payload.message.guild.get_member(payload.user_id)
                 if payload.guild_id else None
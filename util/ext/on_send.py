@@ -18,6 +18,12 @@
 async def on_send(channel, *args, **kwargs):
     return args, kwargs
 ```
+コルーチン関数ではない普通の関数も登録することができ、その場合は`await`をしない分速くなります。  
+また`add_event`の`kwargs`で関数が使うキーワード引数を指定すると、それが渡されていない送信の時は呼ばれなくなります。  
+(`content`を指定した場合は、位置引数が渡された時も呼ばれます。)  
+登録されている関数は変更のたびに一つの関数にまとめられます。  
+また関数が一つも登録されていないイベントでは`send`などは元のままになります。(`sended`などのイベントも呼ばれません。)  
+関数ごとにかかった時間は`bot.cogs["OnSend"].metrics()`で見ることができます。
 
 ## 使用例
 ```python
@@ -35,14 +41,74 @@ async def on_send(channel, *args, **kwargs):
 bot.cogs["OnSend"].add_event(on_send)
 ```"""
 
-from typing import Callable, Optional
+from typing import Any, Callable, NamedTuple, Optional
 
 from discord.ext import commands
 import discord
 
+from inspect import iscoroutinefunction
 from functools import wraps
+from time import perf_counter
 from copy import copy
 
+from ..query_stats import Histogram
+
+
+class Hook(NamedTuple):
+    func: Callable
+    name: str
+    sync: bool
+    kwargs: frozenset[str]
+    timing: Histogram
+
+    def wanted(self, args: tuple, kwargs: dict) -> bool:
+        # 使うキーワード引数が渡されていない場合は呼ばない。
+        return not self.kwargs or (bool(args) and "content" in self.kwargs) \
+            or not self.kwargs.isdisjoint(kwargs)
+
+
+def _error(hook: Hook) -> None:
+    print(f"Error on `on_send`, {hook.func.__name__}:")
+
+
+def _compile(hooks: tuple[Hook, ...]) -> Optional[tuple[Callable, bool]]:
+    # 登録されている関数を順番に呼び出す一つの関数にする。
+    # 全てが普通の関数の場合は、コルーチン関数にしないでawaitをしないで済むようにする。
+    if not hooks:
+        return None
+
+    if all(hook.sync for hook in hooks):
+        def chain(target, args, kwargs):
+            for hook in hooks:
+                if hook.wanted(args, kwargs):
+                    started = perf_counter()
+                    try:
+                        args, kwargs = hook.func(target, *args, **kwargs)
+                    except Exception:
+                        _error(hook)
+                        raise
+                    finally:
+                        hook.timing.add(perf_counter() - started)
+            return args, kwargs
+        return chain, False
+
+    async def async_chain(target, args, kwargs):
+        for hook in hooks:
+            if hook.wanted(args, kwargs):
+                started = perf_counter()
+                try:
+                    if hook.sync:
+                        args, kwargs = hook.func(target, *args, **kwargs)
+                    else:
+                        args, kwargs = await hook.func(target, *args, **kwargs)
+                except Exception:
+                    _error(hook)
+                    raise
+                finally:
+                    hook.timing.add(perf_counter() - started)
+        return args, kwargs
+    return async_chain, True
+
 
 class OnSend(commands.Cog):
     def __init__(self, bot):
@@ -55,6 +121,11 @@ class OnSend(commands.Cog):
             "on_interaction_response": [],
             "on_interaction_response_edit": []
         }
+        self.hooks: dict[str, list[Hook]] = {name: [] for name in self.events}
+        # イベントごとにまとめた関数です。何も登録されていない場合は`None`です。
+        self.chains: dict[str, Optional[tuple[Callable, bool]]] = {
+            name: None for name in self.events
+        }
         self._dpy_injection()
 
     def wrap_send(self, coro, event_name="on_send"):
@@ -62,22 +133,19 @@ class OnSend(commands.Cog):
 
         @wraps(default)
         async def new(ir, *args, **kwargs):
-            args, kwargs = await self._run_event(
-                event_name, ir, *args, **kwargs
-            )
-            return await default(ir, *args, **kwargs)            
+            if (chain := self.chains[event_name]) is not None:
+                args, kwargs = await chain[0](ir, args, kwargs) if chain[1] \
+                    else chain[0](ir, args, kwargs)
+            return await default(ir, *args, **kwargs)
         return new
 
     async def _run_event(self, event_name: str, arg, *args, **kwargs):
         # イベントを実行する。
-        for coro in self.events[event_name]:
-            try:
-                args, kwargs = await coro(arg, *args, **kwargs)
-            except Exception as e:
-                print(f"Error on `on_send`, {coro.__name__}:")
-                raise e
-                break
-        return args, kwargs
+        if (chain := self.chains[event_name]) is None:
+            return args, kwargs
+        if chain[1]:
+            return await chain[0](arg, args, kwargs)
+        return chain[0](arg, args, kwargs)
 
     def _dpy_injection(self):
         default_send = copy(discord.abc.Messageable.send)
@@ -89,7 +157,9 @@ class OnSend(commands.Cog):
             default_webhook_send = None
 
         async def new_send(channel, *args, **kwargs):
-            args, kwargs = await self._run_event("on_send", channel, *args, **kwargs)
+            if (chain := self.chains["on_send"]) is not None:
+                args, kwargs = await chain[0](channel, args, kwargs) if chain[1] \
+                    else chain[0](channel, args, kwargs)
             message = await default_send(
                 channel.channel if isinstance(channel, commands.Context) else channel,
                 *args, **kwargs
@@ -99,48 +169,67 @@ class OnSend(commands.Cog):
 
         if default_webhook_send:
             async def new_webhook_send(channel, *args, **kwargs):
-                args, kwargs = await self._run_event(
-                    "on_webhook_send", channel, *args, **kwargs)
+                if (chain := self.chains["on_webhook_send"]) is not None:
+                    args, kwargs = await chain[0](channel, args, kwargs) if chain[1] \
+                        else chain[0](channel, args, kwargs)
                 message = await default_webhook_send(
                     channel.channel if isinstance(channel, commands.Context) else channel,
                     *args, **kwargs
                 )
                 self.bot.dispatch("webhook_sended", message, args, kwargs)
                 return message
+        else:
+            new_webhook_send = False
 
         async def new_edit(message, *args, **kwargs):
-            args, kwargs = await self._run_event("on_edit", message, *args, **kwargs)
+            if (chain := self.chains["on_edit"]) is not None:
+                args, kwargs = await chain[0](message, args, kwargs) if chain[1] \
+                    else chain[0](message, args, kwargs)
             message = await default_edit(message, *args, **kwargs)
             self.bot.dispatch("edited", message, args, kwargs)
             return message
 
-        discord.Webhook.edit_message = self.wrap_send(
-            discord.Webhook.edit_message, "on_webhook_message_edit"
-        )
-        discord.InteractionResponse.send_message = self.wrap_send(
-            discord.InteractionResponse.send_message, "on_send"
-        )
-        discord.InteractionResponse.edit_message = self.wrap_send(
-            discord.InteractionResponse.edit_message, "on_edit"
-        )
-        discord.Interaction.edit_original_message = self.wrap_send(
-            discord.Interaction.edit_original_message, "on_edit"
-        )
+        # 登録されている関数がない間は元の関数のままにしておく。
+        self._patches: dict[str, list[tuple[type, str, Callable, Callable]]] = {}
+        for event_name, owner, name, new in (
+            ("on_webhook_message_edit", discord.Webhook, "edit_message", None),
+            ("on_send", discord.InteractionResponse, "send_message", None),
+            ("on_edit", discord.InteractionResponse, "edit_message", None),
+            ("on_edit", discord.Interaction, "edit_original_message", None),
+            ("on_send", discord.abc.Messageable, "send", new_send),
+            ("on_send", discord.ext.commands.Context, "send", None),
+            ("on_edit", discord.Message, "edit", new_edit),
+            ("on_webhook_send", discord.abc.Messageable, "webhook_send", new_webhook_send)
+        ):
+            if new is not False:
+                default = getattr(owner, name)
+                self._patches.setdefault(event_name, []).append((
+                    owner, name, default,
+                    new or self.wrap_send(default, event_name)
+                ))
 
-        discord.abc.Messageable.send = new_send
-        discord.ext.commands.Context.send = self.wrap_send(
-            discord.ext.commands.Context.send, "on_send"
-        )
-        discord.Message.edit = new_edit
-        if default_webhook_send:
-            discord.abc.Messageable.webhook_send = new_webhook_send
+    def _install(self, event_name: str) -> None:
+        # 登録されている関数があるイベントだけ、sendなどを改造したものにする。
+        for owner, name, default, new in self._patches.get(event_name, ()):
+            setattr(owner, name, default if self.chains[event_name] is None else new)
+
+    def cog_unload(self):
+        for patches in self._patches.values():
+            for owner, name, default, _ in patches:
+                setattr(owner, name, default)
+
+    def _compile(self, event_name: str) -> None:
+        self.events[event_name] = [hook.func for hook in self.hooks[event_name]]
+        self.chains[event_name] = _compile(tuple(self.hooks[event_name]))
+        self._install(event_name)
 
     def add_event(self, coro: Callable, event_name: Optional[str] = None,
-                  first: bool = False) -> None:
+                  first: bool = False, kwargs: tuple[str, ...] = ()) -> None:
         """send時に呼び出して欲しいコルーチン関数を登録します。  
         登録したコルーチン関数は`送信対象のチャンネル, *args, **kwargs`の引数が渡されます。  
         そして`args, kwargs`を返却しなければなりません。  
-        この時`args, kwargs`の値を変えることでsendの引数ができます。
+        この時`args, kwargs`の値を変えることでsendの引数ができます。  
+        コルーチン関数ではない普通の関数を登録することもできます。
 
         Parameters
         ----------
@@ -152,12 +241,20 @@ class OnSend(commands.Cog):
         first : bool, default False
             一番最初に実行されるようにするかどうかです。  
             複数のイベントがこれをTrueとする場合は一番になれないのでご注意！  
-            (この場合は`bot.cogs["OnSend"].events`から手動で変更を加える必要がありますねえ。)"""
+            (この場合は`bot.cogs["OnSend"].hooks`から手動で変更を加えて`_compile`を実行する必要がありますねえ。)
+        kwargs : tuple[str, ...], default ()
+            関数が使うキーワード引数の名前です。  
+            指定した場合は、そのどれもが渡されていない時は関数が呼ばれなくなります。"""
         event_name = event_name if event_name else coro.__name__
-        if first and self.events:
-            self.events[event_name] = [coro] + self.events[event_name][1:]
+        hook = Hook(
+            coro, f"{event_name}: {getattr(coro, '__qualname__', coro)}",
+            not iscoroutinefunction(coro), frozenset(kwargs), Histogram()
+        )
+        if first:
+            self.hooks[event_name].insert(0, hook)
         else:
-            self.events[event_name].append(coro)
+            self.hooks[event_name].append(hook)
+        self._compile(event_name)
 
     def remove_event(self, coro: Callable, event_name: Optional[str]):
         """OnSend.add_eventで登録したコルーチン関数を削除します。
@@ -170,7 +267,20 @@ class OnSend(commands.Cog):
             イベント名です。
             指定されなかった場合はcoroの名前が使用されます。"""
         event_name = event_name if event_name else coro.__name__
-        self.events[event_name].remove(coro)
+        for hook in self.hooks[event_name]:
+            if hook.func == coro:
+                self.hooks[event_name].remove(hook)
+                break
+        else:
+            raise ValueError("The function is not registered.")
+        self._compile(event_name)
+
+    def metrics(self) -> dict[str, Any]:
+        "登録されている関数ごとにかかった時間の統計を返します。"
+        return {
+            hook.name: hook.timing.to_dict()
+            for hooks in self.hooks.values() for hook in hooks
+        }
 
 
 async def setup(bot):
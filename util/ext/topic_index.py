@@ -0,0 +1,159 @@
+"""チャンネルのトピックに書かれた設定(`rf>log`など)を、チャンネルの作成や更新の時だけ読み取って保存しておくためのエクステンションです。
+メッセージなどのイベントのたびにトピックを分割して調べたり、サーバーのチャンネルを全て探したりしないで済むようになります。
+`bot.load_extension("util.ext.topic_index")`で有効化することができます。
+また`util.setup(bot)`でも有効化することができます。
+
+# Examples
+```python
+index = bot.cogs["TopicIndex"]
+if index.has(message.channel.id, "rf>asp"):
+    ...
+for line in index.lines(message.channel.id, "rf>delaydelete "):
+    ...
+channel = index.find(guild, "rf>log")
+```"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Union
+
+from collections import defaultdict
+from types import MappingProxyType
+
+from discord.ext import commands
+import discord
+
+if TYPE_CHECKING:
+    from ..bot import RT
+
+
+DIRECTIVES = (
+    "rf>log", "rt>automod", "RT-GlobalChat", "RTフリーチャンネル", "RTチケットチャンネル",
+    "rf>asp", "rf>ce", "rf>embed", "rf>kick ", "rf>autopublic", "rf>delaydelete ",
+    "rf>translate", "rf>tran", "rf>翻訳", "rf>ほんやく",
+    "rt>ar ", "rt>search", "rt>thread", "rt>star", "rt>fpm "
+)
+"保存しておく設定です。トピックの行にこれが含まれている場合にその行が保存されます。"
+LOG_CHANNEL_NAME = "log-rt"
+"名前にこれが含まれているテキストチャンネルは`rf>log`が書かれているものとして扱います。"
+EMPTY: MappingProxyType[str, list[str]] = MappingProxyType({})
+
+Directives = dict[str, list[str]]
+Channel = Union[discord.abc.GuildChannel, discord.Thread]
+
+
+def parse(topic: Optional[str], name: str = "") -> Directives:
+    "トピックを読み取って、設定とそれが含まれている行の辞書を返します。"
+    directives: Directives = {}
+    if topic:
+        for line in topic.splitlines():
+            for directive in DIRECTIVES:
+                if directive in line:
+                    directives.setdefault(directive, []).append(line)
+    if LOG_CHANNEL_NAME in name:
+        directives.setdefault("rf>log", [])
+    return directives
+
+
+class TopicIndex(commands.Cog):
+    def __init__(self, bot: RT):
+        self.bot = bot
+        self.channels: dict[int, Directives] = {}
+        self.guilds: defaultdict[int, defaultdict[str, set[int]]] = \
+            defaultdict(lambda: defaultdict(set))
+
+    async def cog_load(self):
+        if self.bot.is_ready():
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        "全てのサーバーのチャンネルを読み取り直します。"
+        self.channels.clear()
+        self.guilds.clear()
+        for guild in self.bot.guilds:
+            self.add_guild(guild)
+
+    def add_guild(self, guild: discord.Guild) -> None:
+        for channel in guild.channels:
+            self.update(channel)
+
+    def remove_guild(self, guild_id: int) -> None:
+        for channel_ids in self.guilds.pop(guild_id, {}).values():
+            for channel_id in channel_ids:
+                self.channels.pop(channel_id, None)
+
+    def update(self, channel: Channel) -> None:
+        "チャンネルの設定を読み取り直します。"
+        self.remove(channel)
+        if not hasattr(channel, "topic"):
+            return
+        if directives := parse(
+            channel.topic, channel.name if isinstance(channel, discord.TextChannel) else ""
+        ):
+            self.channels[channel.id] = directives
+            for directive in directives:
+                self.guilds[channel.guild.id][directive].add(channel.id)
+
+    def remove(self, channel: Channel) -> None:
+        "チャンネルの設定を削除します。"
+        if (directives := self.channels.pop(channel.id, None)) is not None:
+            guild = self.guilds[channel.guild.id]
+            for directive in directives:
+                guild[directive].discard(channel.id)
+                if not guild[directive]:
+                    del guild[directive]
+
+    def get(self, channel_id: int) -> MappingProxyType[str, list[str]]:
+        "チャンネルの設定を返します。"
+        return MappingProxyType(self.channels[channel_id]) \
+            if channel_id in self.channels else EMPTY
+
+    def has(self, channel_id: int, directive: str) -> bool:
+        "チャンネルに設定があるかどうかを返します。"
+        return channel_id in self.channels and directive in self.channels[channel_id]
+
+    def lines(self, channel_id: int, directive: str) -> list[str]:
+        "チャンネルのトピックにある、設定が含まれている行を返します。"
+        return self.channels.get(channel_id, EMPTY).get(directive, [])
+
+    def channel_ids(self, guild_id: int, directive: str) -> set[int]:
+        "サーバーの設定があるチャンネルのIDを返します。"
+        if guild_id in self.guilds and directive in self.guilds[guild_id]:
+            return self.guilds[guild_id][directive]
+        return set()
+
+    def find(self, guild: discord.Guild, directive: str) -> Optional[discord.TextChannel]:
+        "サーバーの設定があるテキストチャンネルのうち、一番上にあるものを返します。"
+        channels = [
+            channel for channel_id in self.channel_ids(guild.id, directive)
+            if isinstance(channel := guild.get_channel(channel_id), discord.TextChannel)
+        ]
+        return min(channels, key=lambda channel: channel.position) if channels else None
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.rebuild()
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.add_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.remove_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        self.update(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, _, after: discord.abc.GuildChannel):
+        self.update(after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.remove(channel)
+
+
+async def setup(bot):
+    await bot.add_cog(TopicIndex(bot))
@@ -126,9 +126,9 @@ class Componesy(commands.Cog):
         if "OnSend" not in self.bot.cogs:
             self.bot.load_extension("util.ext.on_send")
         for name in ("on_send", "on_edit", "on_interaction_response"):
-            self.bot.cogs["OnSend"].add_event(self._new_send, name)
+            self.bot.cogs["OnSend"].add_event(self._new_send, name, kwargs=("view",))
 
-    async def _new_send(self, channel, *args, **kwargs):
+    def _new_send(self, channel, *args, **kwargs):
         # 何かしらの送信時にキーワード引数のviewがあるなら
         if (view := kwargs.get("view")):
             # Componesyによるものなら。
@@ -0,0 +1,242 @@
+# Free RT Util - Extension Loader
+
+"""`cogs`にあるエクステンションを、依存関係を見ながら並列で読み込むためのものです。
+各コグの`cog_load`でのテーブルの作成やキャッシュの読み込みが同時に行われるので、起動が速くなります。
+読み込みにかかった時間は最後にウォーターフォールで表示されます。
+`RT`を作る際に自動で作られ、`bot.loader`からアクセスできます。
+先に読み込まれている必要があるエクステンションは、エクステンションのモジュールの`DEPENDS`に書きます。
+`DEPENDS`はインポートせずにファイルから読み込まれるので、タプルかリストの文字列のリテラルで書いてください。
+
+# Examples
+```python
+# cogs/xxx/__init__.py
+async def setup(bot):
+    await bot.loader.load_package("cogs.xxx")
+
+# cogs/xxx/yyy.py
+DEPENDS = ("util.ext.on_send", "cogs.xxx._zzz")
+"先に読み込まれている必要があるエクステンションです。"
+```"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Optional
+
+from asyncio import Event, Semaphore, gather
+from ast import Assign, Name, literal_eval, parse
+from os import listdir
+from os.path import isdir, isfile
+from time import perf_counter
+import traceback
+
+if TYPE_CHECKING:
+    from .bot import RT
+
+
+DEFERRED = ("cogs.entertainment", "cogs.music", "cogs.other")
+"遅延読み込みが有効な場合に、`full_ready`の後に読み込むエクステンションです。"
+CONCURRENCY = 8
+"同時に読み込むエクステンションの数です。データベースの接続を使い切らないようにするためのものです。"
+
+
+class Timing(NamedTuple):
+    "エクステンションの読み込みにかかった時間です。"
+
+    name: str
+    started: float
+    ended: float
+    ok: bool
+
+    @property
+    def elapsed(self) -> float:
+        return self.ended - self.started
+
+
+def discover(package: str) -> list[str]:
+    "パッケージにあるエクステンションの名前を返します。`_`か`.`で始まるものは含まれません。"
+    return [
+        f"{package}.{name[:-3] if name.endswith('.py') else name}"
+        for name in sorted(listdir(package.replace(".", "/")))
+        if not name.startswith(("_", ".")) and name != "__pycache__"
+    ]
+
+
+class UnknownDependency(Exception):
+    "`DEPENDS`に存在しないエクステンションが書かれていた際に発生するエラーです。"
+
+
+def source(name: str) -> Optional[str]:
+    "エクステンションのファイルのパスを返します。見つからない場合は`None`を返します。"
+    path = name.replace(".", "/")
+    if isdir(path):
+        path = f"{path}/__init__.py"
+    else:
+        path = f"{path}.py"
+    return path if isfile(path) else None
+
+
+def read_depends(name: str) -> tuple[str, ...]:
+    """エクステンションの`DEPENDS`をインポートせずに読み込みます。
+
+    Raises
+    ------
+    UnknownDependency
+        `DEPENDS`にあるエクステンションが見つからない場合に発生します。"""
+    if (path := source(name)) is None:
+        return ()
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if "DEPENDS" not in text:
+        return ()
+    depends: tuple[str, ...] = ()
+    for node in parse(text, path).body:
+        if isinstance(node, Assign) and any(
+            isinstance(target, Name) and target.id == "DEPENDS" for target in node.targets
+        ):
+            depends = tuple(literal_eval(node.value))
+    for dependency in depends:
+        if source(dependency) is None:
+            raise UnknownDependency(f"{name}の`DEPENDS`にある{dependency}が見つかりません。")
+    return depends
+
+
+class ExtensionLoader:
+    """エクステンションを並列で読み込むためのクラスです。
+
+    Parameters
+    ----------
+    bot : RT
+        Botです。
+    concurrency : int, default CONCURRENCY
+        同時に読み込むエクステンションの数です。
+        パッケージ(`load_package`で中身を読み込むもの)はこれに数えられません。"""
+
+    def __init__(self, bot: RT, concurrency: int = CONCURRENCY):
+        self.bot, self.concurrency = bot, concurrency
+        self._semaphore: Optional[Semaphore] = None
+        self.timings: dict[str, Timing] = {}
+        self._loading: dict[str, Event] = {}
+        self.dependencies: dict[str, tuple[str, ...]] = {}
+        "エクステンションと、その`DEPENDS`です。"
+        self.started: Optional[float] = None
+
+    @property
+    def semaphore(self) -> Semaphore:
+        # イベントループが動き出してから作る。
+        if self._semaphore is None:
+            self._semaphore = Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def _wait_dependencies(self, name: str) -> None:
+        if name not in self.dependencies:
+            self.dependencies[name] = read_depends(name)
+        for dependency in self.dependencies[name]:
+            if dependency in self.bot.extensions:
+                continue
+            if dependency in self._loading:
+                await self._loading[dependency].wait()
+            else:
+                await self.load(dependency)
+
+    async def load(self, name: str, *, package: bool = False) -> bool:
+        """エクステンションを読み込みます。`DEPENDS`にあるエクステンションが先に読み込まれます。
+        失敗した場合はトレースバックを出力して`False`を返します。
+
+        Parameters
+        ----------
+        name : str
+            エクステンションの名前です。
+        package : bool, default False
+            `load_package`で中身を読み込むパッケージかどうかです。
+            `True`の場合は同時に読み込む数の制限を受けません。
+
+        Raises
+        ------
+        UnknownDependency
+            `DEPENDS`にあるエクステンションが見つからない場合に発生します。"""
+        if name in self._loading:
+            await self._loading[name].wait()
+            return name in self.bot.extensions
+        if self.started is None:
+            self.started = perf_counter()
+        self._loading[name] = done = Event()
+        try:
+            await self._wait_dependencies(name)
+            if package:
+                return await self._load(name)
+            async with self.semaphore:
+                return await self._load(name)
+        finally:
+            done.set()
+            del self._loading[name]
+
+    async def _load(self, name: str) -> bool:
+        started, ok = perf_counter(), False
+        try:
+            await self.bot.load_extension(name)
+        except Exception:
+            traceback.print_exc()
+        else:
+            ok = True
+            self.bot.print("[Extension]", "Loaded", name.split(".")[-1], limit=False)  # ロードログの出力
+        finally:
+            self.timings[name] = Timing(name, started, perf_counter(), ok)
+        return ok
+
+    async def load_many(self, names: Iterable[str], *, package: bool = False) -> None:
+        "複数のエクステンションを並列で読み込みます。"
+        await gather(*(self.load(name, package=package) for name in names))
+
+    async def load_package(self, package: str) -> None:
+        "パッケージにあるエクステンションを並列で読み込みます。パッケージの`setup`で使います。"
+        await self.load_many(discover(package))
+
+    async def load_all(
+        self, package: str = "cogs", deferred: bool = False
+    ) -> list[str]:
+        """`cogs`にある全てのエクステンションを読み込みます。
+
+        Parameters
+        ----------
+        package : str, default "cogs"
+            読み込むパッケージです。
+        deferred : bool, default False
+            `DEFERRED`にあるものを読み込まないようにするかどうかです。
+
+        Returns
+        -------
+        list[str]
+            読み込まなかったエクステンションの名前です。`load_deferred`に渡してください。"""
+        names = discover(package)
+        later = [name for name in names if deferred and name in DEFERRED]
+        await self.load_many((name for name in names if name not in later), package=True)
+        return later
+
+    async def load_deferred(self, names: Iterable[str]) -> None:
+        "`load_all`で読み込まなかったエクステンションを読み込み、ヘルプを作り直します。"
+        await self.load_many(names, package=True)
+        if "DocHelp" in self.bot.cogs:
+            await self.bot.cogs["DocHelp"].on_full_ready()
+
+    def report(self, width: int = 30) -> list[str]:
+        "読み込みにかかった時間のウォーターフォールを行のリストで返します。"
+        if not self.timings or self.started is None:
+            return []
+        timings = sorted(self.timings.values(), key=lambda timing: timing.started)
+        total = max(timing.ended for timing in timings) - self.started
+        scale = width / total if total else 0
+        length = max(len(timing.name) for timing in timings)
+        lines = [f"{len(timings)} extensions in {total:.2f}s"]
+        for timing in timings:
+            start = int((timing.started - self.started) * scale)
+            bar = "#" * max(min(int(timing.elapsed * scale), width - start), 1)
+            lines.append(
+                f"{timing.name.ljust(length)} |{(' ' * start + bar).ljust(width)}| "
+                f"{timing.elapsed:6.2f}s{'' if timing.ok else ' FAILED'}"
+            )
+        return lines
+
+    def print_report(self) -> None:
+        "読み込みにかかった時間のウォーターフォールを出力します。"
+        for line in self.report():
+            self.bot.print("[Boot]", line, limit=False)
@@ -0,0 +1,104 @@
+# Free RT Util - Handler Stats
+
+"""リスナーとコマンドの実行時間を記録するためのものです。
+ハンドラごとにレイテンシのヒストグラムとパーセンタイル用の最近の実行時間、エラーの数、同時実行数を記録します。
+`RT`を作る際に自動で作られ、`bot.handler_stats`からアクセスできます。
+リスナーは`RT._run_event`、コマンドは`RT.invoke`と`RTCommandTree._call`で記録されます。"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from collections import deque
+
+from .query_stats import Histogram
+
+
+SAMPLES = 1024
+"パーセンタイルの計算に使う、ハンドラごとに保存しておく最近の実行時間の数です。"
+PERCENTILES = (50, 95, 99)
+"出力するパーセンタイルです。"
+KEYS = (
+    "count", "total", "average", "max", "errors", "inflight", "max_inflight",
+    *(f"p{p}" for p in PERCENTILES)
+)
+"`HandlerStats.summary`で並べ替えに使える値の名前です。"
+
+
+def percentile(values: list[float], p: float) -> float:
+    "ソート済みのリストのパーセンタイルを最近傍順位法で返します。"
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(-(-len(values) * p // 100)) - 1))]
+
+
+class HandlerMetric:
+    "一つのハンドラの統計です。"
+
+    __slots__ = ("histogram", "samples", "errors", "inflight", "max_inflight")
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.samples: deque[float] = deque(maxlen=SAMPLES)
+        self.errors = self.inflight = self.max_inflight = 0
+
+    def start(self) -> None:
+        "実行が始まった時に呼びます。"
+        self.inflight += 1
+        if self.inflight > self.max_inflight:
+            self.max_inflight = self.inflight
+
+    def stop(self, elapsed: float, failed: bool = False) -> None:
+        "実行が終わった時に呼びます。"
+        self.inflight -= 1
+        self.histogram.add(elapsed)
+        self.samples.append(elapsed)
+        if failed:
+            self.errors += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        samples = sorted(self.samples)
+        return {
+            **self.histogram.to_dict(), "errors": self.errors, "inflight": self.inflight,
+            "max_inflight": self.max_inflight, **{
+                f"p{p}": round(percentile(samples, p), 4) for p in PERCENTILES
+            }
+        }
+
+
+class HandlerStats:
+    """ハンドラごとの統計を記録するためのクラスです。
+    ハンドラの名前はリスナーは`on_message:Cog.on_message`、コマンドは`command:help`のようになります。"""
+
+    def __init__(self):
+        self.handlers: dict[str, HandlerMetric] = {}
+
+    def get(self, name: str) -> HandlerMetric:
+        "ハンドラの統計を取得します。ない場合は作ります。"
+        if (metric := self.handlers.get(name)) is None:
+            metric = self.handlers[name] = HandlerMetric()
+        return metric
+
+    def summary(self, limit: int = 20, prefix: str = "", key: str = "p95") -> dict[str, Any]:
+        """統計を`key`の大きい順に返します。
+
+        Parameters
+        ----------
+        limit : int, default 20
+            返す数です。
+        prefix : str, default ""
+            `on_message:`のように、名前がこれで始まるものだけにします。
+        key : str, default "p95"
+            並べ替えに使う値です。`KEYS`にあるもので、`total`や`errors`なども使えます。
+
+        Raises
+        ------
+        ValueError
+            `key`が`KEYS`にない場合に発生します。"""
+        if key not in KEYS:
+            raise ValueError(f"`key`は{', '.join(KEYS)}のどれかにしてください。")
+        rows = {
+            name: metric.to_dict() for name, metric in self.handlers.items()
+            if name.startswith(prefix)
+        }
+        return dict(sorted(rows.items(), key=lambda item: item[1][key], reverse=True)[:limit])
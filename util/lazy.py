@@ -0,0 +1,188 @@
+# Free RT Util - Lazy
+
+"""重いライブラリやデータファイルを、初めて使われた時に読み込むためのものです。
+TTSや音楽を使わない環境でも起動時に全て読み込まれて、起動時間とメモリを使ってしまうのを防ぐためのものです。
+また`python -X importtime`を使ってエクステンションごとのインポートにかかる時間を調べることができます。
+
+# Examples
+```python
+cv2 = lazy_import("cv2")
+gTTS = lazy_import("gtts", "gTTS")
+AREA_CODE = lazy_load("data/area_code.json")
+
+cv2.imread(path)  # ここで初めて`cv2`がインポートされる。
+AREA_CODE["pref"]  # ここで初めてファイルが読み込まれる。
+```"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Generic, Iterator, NamedTuple, Optional, TypeVar
+
+from asyncio import Semaphore, create_subprocess_exec, gather
+from asyncio.subprocess import PIPE
+from importlib import import_module
+from time import perf_counter
+import sys
+
+from ujson import loads
+
+
+T = TypeVar("T")
+_UNSET: Any = object()
+LOADED: dict[str, float] = {}
+"読み込まれた`Lazy`の名前と、読み込みにかかった秒数です。"
+
+
+class Lazy(Generic[T]):
+    """初めて使われた時に`loader`を実行して、その返り値として振る舞うものです。
+    属性の取得、呼び出し、`[]`、`in`、`len`、`iter`は返り値に渡されます。
+    `isinstance`や継承には使えないので、その場合は`load`で中身を取り出してください。
+
+    Parameters
+    ----------
+    loader : Callable[[], T]
+        中身を返す関数です。
+    name : str
+        `LOADED`に記録する名前です。"""
+
+    __slots__ = ("_loader", "_name", "_value")
+
+    def __init__(self, loader: Callable[[], T], name: str):
+        self._loader, self._name, self._value = loader, name, _UNSET
+
+    @property
+    def loaded(self) -> bool:
+        "既に読み込まれているかどうかです。"
+        return self._value is not _UNSET
+
+    def load(self) -> T:
+        "中身を返します。まだ読み込まれていない場合は読み込みます。"
+        if self._value is _UNSET:
+            started = perf_counter()
+            self._value = self._loader()
+            LOADED[self._name] = perf_counter() - started
+        return self._value
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.load()(*args, **kwargs)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.load()[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.load()[key] = value
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.load()
+
+    def __iter__(self) -> Iterator:
+        return iter(self.load())
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    def __repr__(self) -> str:
+        return f"<Lazy {self._name} {'loaded' if self.loaded else 'not loaded'}>"
+
+
+def lazy_import(name: str, attribute: Optional[str] = None) -> Lazy:
+    """モジュールを初めて使われた時にインポートするようにします。
+
+    Parameters
+    ----------
+    name : str
+        モジュールの名前です。
+    attribute : str, optional
+        `from name import attribute`のようにモジュールにあるものを取り出す場合に指定します。"""
+    if attribute is None:
+        return Lazy(lambda: import_module(name), name)
+    return Lazy(
+        lambda: getattr(import_module(name), attribute), f"{name}.{attribute}"
+    )
+
+
+def lazy_load(
+    path: str, parser: Callable[[str], Any] = loads, default: Any = _UNSET
+) -> Lazy:
+    """ファイルを初めて使われた時に読み込むようにします。
+
+    Parameters
+    ----------
+    path : str
+        ファイルのパスです。
+    parser : Callable[[str], Any], default ujson.loads
+        ファイルの中身を変換する関数です。
+    default : Any, optional
+        ファイルが存在しない場合に使う値です。指定しない場合は`FileNotFoundError`が発生します。"""
+    def loader():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return parser(f.read())
+        except FileNotFoundError:
+            if default is _UNSET:
+                raise
+            return default
+    return Lazy(loader, path)
+
+
+class ImportCost(NamedTuple):
+    "`python -X importtime`で出力されるモジュールごとのインポートにかかった時間です。"
+
+    module: str
+    self: float
+    cumulative: float
+    depth: int
+
+
+def _parse_importtime(stderr: str, after: str) -> list[ImportCost]:
+    # `after`の行より後にあるものだけを返す。`after`が読み込んだものを除くためのものです。
+    costs, found = [], False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_, cumulative, module = line[12:].split("|", 2)
+        if not self_.strip().isdecimal():
+            # 見出しの行
+            continue
+        name, depth = module.strip(), (len(module) - len(module.lstrip()) - 1) // 2
+        if not found:
+            # 子のモジュールの行は親より先に出力されるので、`after`の行より後は全て対象になる。
+            found = depth == 0 and name == after
+            continue
+        costs.append(ImportCost(
+            name, int(self_) / 1_000_000, int(cumulative) / 1_000_000, depth
+        ))
+    return costs
+
+
+async def importtime(extension: str, base: str = "util") -> list[ImportCost]:
+    """新しいプロセスで`python -X importtime`を使ってエクステンションをインポートし、モジュールごとの時間を返します。
+    `base`のインポートで読み込まれたものは含まれません。
+
+    Parameters
+    ----------
+    extension : str
+        エクステンションの名前です。
+    base : str, default "util"
+        先にインポートしておくモジュールです。"""
+    process = await create_subprocess_exec(
+        sys.executable, "-X", "importtime", "-c", f"import {base}; import {extension}",
+        stdout=PIPE, stderr=PIPE
+    )
+    _, stderr = await process.communicate()
+    return _parse_importtime(stderr.decode(errors="replace"), base)
+
+
+async def importtime_many(
+    extensions: list[str], base: str = "util", concurrency: int = 4
+) -> dict[str, list[ImportCost]]:
+    "複数のエクステンションの`importtime`を並列で実行します。"
+    semaphore = Semaphore(concurrency)
+
+    async def run(extension):
+        async with semaphore:
+            return await importtime(extension, base)
+    return dict(zip(extensions, await gather(*map(run, extensions))))
@@ -7,13 +7,18 @@ from typing import (
 )
 
 from collections import defaultdict
-from asyncio import Event
+from collections.abc import Iterable
+from asyncio import Event, Task, current_task
+from time import time
 
 from discord.ext import commands, tasks
+import discord
 
 from ujson import loads, dumps
 from aiomysql import Cursor
 
+from .ext.message_pipeline import message_listener
+
 if TYPE_CHECKING:
     from util import RT
 
@@ -23,23 +28,274 @@ Key = Optional[Union[str, int, Any]]
 ALLOCATIONS = get_args(get_args(Allocation)[0])
 
 
-class ChangedDict(dict):
+Path = tuple[Union[str, int], ...]
 
-    changed = False
-    _new = False
+
+class NotLoadedError(LookupError):
+    "遅延読み込みモードのテーブルで、読み込まれていない行にアクセスした際に発生するエラーです。"
+
+    def __init__(self, table: str, key: Key):
+        self.table, self.key = table, key
+        super().__init__(
+            f"まだ読み込まれていない行です。先に`Table.load`を実行してください。: {table} {key}"
+        )
+
+
+class _Tracked:
+    """行の中にあるコンテナです。変更されると行に変更があった場所を伝えます。
+    リストの中身はインデックスがずれることがあるので、変更はリスト全体の変更として扱います。"""
+
+    _root: ChangedDict
+    _path: Path
+    _whole: bool
+
+    def _record(self, key: Any = None, removed: bool = False) -> None:
+        self._root._record_path(
+            self._path if self._whole or key is None else self._path + (key,),
+            removed and not self._whole
+        )
+
+    def _child(self, key: Any, value: Any) -> Any:
+        return _track(
+            value, self._root, self._path if self._whole else self._path + (key,),
+            self._whole
+        )
+
+    def _store(self, key: Any, value: Any) -> Any:
+        # 代入された辞書やリストは複製せずにそのまま持ち、同期の際に変更がないかを確認する。
+        if _untracked(value):
+            self._root._raw.setdefault(self._path if self._whole else self._path + (key,), None)
+            return value
+        return self._child(key, value)
+
+
+def _untracked(value: Any) -> bool:
+    return isinstance(value, (dict, list)) and not isinstance(value, _Tracked)
+
+
+def _has_untracked(value: Any) -> bool:
+    # 変更を検知できない辞書やリストが含まれているかを調べる。
+    if isinstance(value, _Tracked):
+        return any(map(_has_untracked, value.values() if isinstance(value, dict) else value))
+    return _untracked(value)
+
+
+def _track(value: Any, root: ChangedDict, path: Path, whole: bool = False) -> Any:
+    # 辞書やリストを変更を検知できるものに変換する。
+    if isinstance(value, _Tracked) and value._root is root \
+            and value._path == path and value._whole == whole:
+        return value
+    if isinstance(value, dict):
+        return _TrackedDict(root, path, whole, value)
+    if isinstance(value, list):
+        return _TrackedList(root, path, whole, value)
+    return value
+
+
+class _TrackedDictMixin(_Tracked):
+    def _init_items(self) -> None:
+        for key, value in dict.items(self):
+            dict.__setitem__(self, key, self._child(key, value))
 
     def __setitem__(self, key, value):
-        self.changed = True
-        return super().__setitem__(key, value)
+        self._record(key)
+        return dict.__setitem__(self, key, self._store(key, value))
 
     def __delitem__(self, key):
+        self._record(key, True)
+        return dict.__delitem__(self, key)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, key, *args):
+        if key in self:
+            self._record(key, True)
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        self._record(key, True)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        self._record()
+        return dict.clear(self)
+
+
+class _TrackedDict(_TrackedDictMixin, dict):
+    def __init__(self, root: ChangedDict, path: Path, whole: bool, data: dict):
+        self._root, self._path, self._whole = root, path, whole
+        dict.__init__(self, data)
+        self._init_items()
+
+
+class _TrackedList(_Tracked, list):
+    def __init__(self, root: ChangedDict, path: Path, whole: bool, data: list):
+        self._root, self._path, self._whole = root, path, whole
+        super().__init__(self._child(value) for value in data)
+
+    def _child(self, value: Any) -> Any:
+        return _track(value, self._root, self._path, True)
+
+    def _store(self, value: Any) -> Any:
+        if _untracked(value):
+            self._root._raw.setdefault(self._path, None)
+            return value
+        return self._child(value)
+
+    def __setitem__(self, index, value):
+        self._record()
+        if isinstance(index, slice):
+            value = [self._store(v) for v in value]
+        else:
+            value = self._store(value)
+        return super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self._record()
+        return super().__delitem__(index)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, other):
+        self._record()
+        return super().__imul__(other)
+
+    def append(self, value):
+        self._record()
+        return super().append(self._store(value))
+
+    def extend(self, values):
+        self._record()
+        return super().extend(self._store(value) for value in values)
+
+    def insert(self, index, value):
+        self._record()
+        return super().insert(index, self._store(value))
+
+    def pop(self, *args):
+        self._record()
+        return super().pop(*args)
+
+    def remove(self, value):
+        self._record()
+        return super().remove(value)
+
+    def clear(self):
+        self._record()
+        return super().clear()
+
+    def sort(self, *args, **kwargs):
+        self._record()
+        return super().sort(*args, **kwargs)
+
+    def reverse(self):
+        self._record()
+        return super().reverse()
+
+
+class ChangedDict(_TrackedDictMixin, dict):
+    """行のデータを格納する辞書です。
+    入れ子になっている辞書やリストへの変更も検知して`changed`をTrueにし、
+    変更があった場所のパスを記録します。
+    代入された辞書やリストは複製されずにそのまま入るので、代入した後に元の変数から変更しても反映されます。
+    その変更は`refresh`で同期の際に確認されます。"""
+
+    changed = False
+    _new = False
+
+    def __init__(self, *args, **kwargs):
+        self._root, self._path, self._whole = self, (), False
+        # 変更された場所のパスと、それが削除であるかどうかです。
+        self._paths: dict[Path, bool] = {}
+        # 全体を書き直す必要があるかどうかです。
+        self._full = False
+        # 変更を検知できない辞書やリストが代入された場所と、最後に確認した時のJSONです。
+        self._raw: dict[Path, Optional[str]] = {}
+        # データベースに行があるかどうかと、その時のJSONの大きさです。
+        self._persisted, self._size = False, 0
+        dict.__init__(self, *args, **kwargs)
+        self._init_items()
+
+    @classmethod
+    def from_json(cls, raw: str) -> ChangedDict:
+        "データベースから読み込んだJSONから作ります。"
+        self = cls(loads(raw))
+        self._persisted, self._size = True, len(raw)
+        return self
+
+    def _record_path(self, path: Path, removed: bool = False) -> None:
         self.changed = True
-        return super().__delitem__(key)
+        if not path:
+            self._full = True
+        elif not self._full:
+            self._paths[path] = removed
+
+    def refresh(self) -> bool:
+        """代入された辞書やリストが元の変数から変更されていないかを確認して、`changed`を返します。
+        変更されていた場合は、その場所を変更があった場所として記録します。"""
+        for path, last in list(self._raw.items()):
+            try:
+                value = self.resolve(path)
+            except (KeyError, IndexError, TypeError):
+                value = None
+            if not _has_untracked(value):
+                # 別の値で上書きされたか削除された。
+                del self._raw[path]
+            elif (raw := dumps(value)) != last:
+                self._raw[path] = raw
+                self._record_path(path)
+        return self.changed
+
+    def pop_patch(self) -> Optional[tuple[list[Path], list[Path]]]:
+        """記録されている変更を`(削除するパス, 設定するパス)`として取り出します。
+        全体を書き直すべき場合は`None`を返します。"""
+        paths, full = self._paths, self._full
+        self._paths, self._full = {}, False
+        if full or not self._persisted:
+            return None
+        removes, sets = [], []
+        for path, removed in paths.items():
+            # 親が変更されているならそちらに含まれる。
+            if any(path[:index] in paths for index in range(1, len(path))):
+                continue
+            (removes if removed else sets).append(path)
+        return removes, sets
+
+    def resolve(self, path: Path) -> Any:
+        "パスにある値を取得します。"
+        value = self
+        for key in path:
+            value = value[key]
+        return value
+
+
+def json_path(path: Path) -> str:
+    "パスをMySQLのJSONパスの文字列にします。"
+    return "$" + "".join(
+        "." + dumps(str(key), ensure_ascii=False, escape_forward_slashes=False)
+        for key in path
+    )
 
 
 class DataDict(defaultdict):
 
-    _removed = []
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._removed: list[Key] = []
 
     def __delitem__(self, key: str) -> None:
         self._removed.append(key)
@@ -51,6 +307,67 @@ class DataDict(defaultdict):
         return super().__setitem__(key, value)
 
 
+class LRUDataDict(DataDict):
+    """遅延読み込みモードのテーブルのキャッシュです。
+    `maxsize`を超えた場合は最後に使われたのが古い行から追い出されます。
+    変更があった行は書き込みが終わるまで`_evicted`に置かれます。
+    `pin`で固定された行は、固定したタスクが終わるまで追い出されません。"""
+
+    def __init__(self, maxsize: int, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.maxsize = maxsize
+        self._evicted: dict[Key, ChangedDict] = {}
+        # 行ごとの固定しているタスクの数と、タスクごとの固定している行です。
+        self._pins: dict[Key, int] = {}
+        self._pinned: dict[Task, set[Key]] = {}
+
+    def touch(self, key: Key) -> None:
+        "行を最近使われたものとします。"
+        if key in self:
+            value = dict.pop(self, key)
+            dict.__setitem__(self, key, value)
+
+    def pin(self, keys: Iterable[Key]) -> None:
+        """今のタスクが終わるまで行を追い出さないようにします。
+        `Table.load`をした後に他の`await`をしている間に、行が追い出されないようにするためのものです。"""
+        if (task := current_task()) is None:
+            return
+        if (pinned := self._pinned.get(task)) is None:
+            pinned = self._pinned[task] = set()
+            task.add_done_callback(self._unpin)
+        for key in keys:
+            if key not in pinned:
+                pinned.add(key)
+                self._pins[key] = self._pins.get(key, 0) + 1
+
+    def _unpin(self, task: Task) -> None:
+        for key in self._pinned.pop(task, ()):
+            if count := self._pins[key] - 1:
+                self._pins[key] = count
+            else:
+                del self._pins[key]
+        self._trim()
+
+    def _trim(self) -> None:
+        # 固定されていない行を古いものから追い出す。
+        if (over := len(self) - self.maxsize) <= 0:
+            return
+        olds = []
+        for key in self:
+            if key not in self._pins:
+                olds.append(key)
+                if len(olds) == over:
+                    break
+        for old in olds:
+            data = dict.pop(self, old)
+            if data.refresh():
+                self._evicted[old] = data
+
+    def __setitem__(self, key: Key, value: ChangedDict):
+        super().__setitem__(key, value)
+        self._trim()
+
+
 TableSelfT = TypeVar("TableSelfT", bound="Table")
 
 
@@ -58,6 +375,12 @@ class Table:
 
     __allocation__: Optional[str] = None
     __key__: Optional[Key] = None
+    __lazy__: bool = False
+    "Trueにすると起動時に全ての行を読み込まずに、`Table.load`で必要な行だけを読み込みます。"
+    __cache_size__: int = 5000
+    "遅延読み込みモードでキャッシュしておく行の最大数です。"
+    __prefetch__: bool = False
+    "遅延読み込みモードで、メッセージがあったサーバーやユーザーの行を先読みするかどうかです。"
 
     def __init__(self, bot: RT, immediately_sync: bool = False, heritance: bool = False):
         assert self.__allocation__ is not None, "割り振りを設定してください。"
@@ -77,18 +400,33 @@ class Table:
         else:
             self.bot.dispatch("table_create", self)
 
+    def _row(self) -> ChangedDict:
+        # キーに対応する行を取得する。
+        return self.cog.get_row(self.name, self.__key__)
+
     def __getattr__(self: TableSelfT, key: str) -> Any:
         if self.__key__:
             if key in ("pop", "update", "get", "items", "values", "keys"):
-                return getattr(self.cog.data[self.name][self.__key__], key)
+                return getattr(self._row(), key)
             elif key in self.__annotations__:
-                return self.cog.data[self.name][self.__key__][key]
+                return self._row()[key]
         raise AttributeError(key)
 
     def to_dict(self) -> dict:
-        "このデータにある辞書を返します。この関数が返すものに値は書き込まないでください。"
+        """このデータにある辞書を返します。この関数が返すものに値は書き込まないでください。
+        遅延読み込みモードの場合は読み込み済みの行しか含まれません。"""
         return self.cog.data[self.name] if self.__key__ is None \
-            else self.cog.data[self.name][self.__key__]
+            else self._row()
+
+    async def load(self, *keys: Key) -> None:
+        """遅延読み込みモードのテーブルで、指定されたキーの行をデータベースから読み込みます。
+        遅延読み込みモードでは、行にアクセスする前にこれを実行する必要があります。
+        読み込んだ行は、これを実行したタスク(イベントやコマンドの処理)が終わるまでは追い出されません。
+        読み込まれていない行にアクセスした場合は`NotLoadedError`が発生します。
+        遅延読み込みモードではない場合は何もしません。"""
+        await self.locked.wait()
+        if self.__lazy__:
+            await self.cog.load(self.name, keys or (self.__key__,))
 
     def sync(self):
         self.cog.sync(self.name)
@@ -100,36 +438,46 @@ class Table:
         if key in self.__annotations__:
             self._assert_key()
             new = self.__key__ not in self.cog.data[self.name]
-            self.cog.data[self.name][self.__key__][key] = value
+            row = self._row()
+            row[key] = value
             if new:
-                self.cog.data[self.name][self.__key__]._new = new
+                row._new = new
         else:
             return super().__setattr__(key, value)
 
     def __getitem__(self: TableSelfT, key: Key) -> TableSelfT:
         assert self.__key__ is None, "既にキーは設定されています。"
+        if self.__lazy__ and not self.cog.is_loaded(self.name, key):
+            raise NotLoadedError(self.name, key)
         new = self.__class__(self.bot, heritance=True)
         new.__key__ = key
         return new
 
     def __delitem__(self, key: Key) -> None:
-        del self.cog.data[self.name][key]
+        self.cog.remove_row(self.name, key)
 
     def __delattr__(self, key: str) -> None:
         if key in self.__annotations__:
             self._assert_key()
-            del self.cog.data[self.name][self.__key__][key]
+            del self._row()[key]
         else:
             return super().__delattr__(key)
 
     def __contains__(self, key: str) -> bool:
         if self.__key__ is None:
+            if self.__lazy__:
+                return self.cog.is_loaded(self.name, key) \
+                    and bool(self.cog.get_row(self.name, key))
             return key in self.cog.data[self.name]
         else:
-            return key in self.cog.data[self.name][self.__key__]
+            return key in self._row()
 
 
 class DataManager(commands.Cog):
+
+    FLUSH_CHUNK = 500
+    "一度のクエリ及びコミットで書き込む行の最大数です。"
+
     def __init__(self, bot: RT):
         self.bot = bot
         self.data: defaultdict[str, DataDict[Key, ChangedDict]] = defaultdict(
@@ -137,6 +485,10 @@ class DataManager(commands.Cog):
         )
         self.allocations: dict[str, str] = {}
         self._loaded: list[str] = []
+        # 主キーがありON DUPLICATE KEY UPDATEが使えるテーブルです。
+        self._upsertable: set[str] = set()
+        # 遅延読み込みモードのテーブルです。
+        self.lazy_tables: dict[str, Table] = {}
         self._auto_sync.start()
 
     @commands.Cog.listener()
@@ -147,15 +499,33 @@ class DataManager(commands.Cog):
                 if table.name not in self._loaded:
                     await cursor.execute(
                         f"""CREATE TABLE IF NOT EXISTS {table.name} (
-                            {table.__allocation_name__} {table.__allocation_type__}, Data JSON
+                            {table.__allocation_name__} {table.__allocation_type__}
+                                PRIMARY KEY NOT NULL,
+                            Data JSON
                         );"""
                     )
-                # キャッシュを作る。
+                    # 昔に作られたテーブルには主キーがないことがあるので確認しておく。
+                    await cursor.execute(
+                        f"SHOW KEYS FROM {table.name} WHERE Key_name = 'PRIMARY';"
+                    )
+                    if await cursor.fetchone():
+                        self._upsertable.add(table.name)
+                    self._loaded.append(table.name)
                 self.allocations[table.name] = table.__allocation_name__
+                if table.__lazy__:
+                    # 遅延読み込みモードの場合は必要になるまで読み込まない。
+                    if not isinstance(self.data[table.name], LRUDataDict):
+                        self.data[table.name] = LRUDataDict(
+                            table.__cache_size__, ChangedDict
+                        )
+                    self.lazy_tables[table.name] = table
+                    table.locked.set()
+                    return
+                # キャッシュを作る。
                 await cursor.execute(f"SELECT * FROM {table.name};")
                 for row in await cursor.fetchall():
                     if row:
-                        self.data[table.name][row[0]] = ChangedDict(loads(row[1]))
+                        self.data[table.name][row[0]] = ChangedDict.from_json(row[1])
                         self.data[table.name][row[0]].changed = False
 
         table.locked.set()
@@ -163,61 +533,194 @@ class DataManager(commands.Cog):
     def print(self, *args, **kwargs):
         return self.bot.print(f"[{self.__cog_name__}]", *args, **kwargs)
 
+    def is_loaded(self, table: str, key: Key) -> bool:
+        "指定された行がキャッシュにあるかどうかを調べます。"
+        datas = self.data[table]
+        return key in datas or key in getattr(datas, "_evicted", ())
+
+    def get_row(self, table: str, key: Key) -> ChangedDict:
+        "指定された行を取得します。"
+        datas = self.data[table]
+        if isinstance(datas, LRUDataDict):
+            if key in datas:
+                datas.touch(key)
+            else:
+                # 追い出されたが書き込みがまだの行なら戻す。
+                if key not in datas._evicted:
+                    raise NotLoadedError(table, key)
+                datas[key] = datas._evicted.pop(key)
+        return datas[key]
+
+    def remove_row(self, table: str, key: Key) -> None:
+        "指定された行を削除します。"
+        datas = self.data[table]
+        if key in datas:
+            del datas[key]
+        else:
+            getattr(datas, "_evicted", {}).pop(key, None)
+            datas._removed.append(key)
+
+    async def load(self, table: str, keys: Iterable[Key]) -> None:
+        """遅延読み込みモードのテーブルの指定された行を読み込みます。
+        読み込んだ行は、実行したタスクが終わるまでキャッシュから追い出されません。"""
+        datas = self.data[table]
+        assert isinstance(datas, LRUDataDict), "遅延読み込みモードのテーブルではありません。"
+        datas.pin(keys := list(keys))
+        keys = [key for key in keys if not self.is_loaded(table, key)]
+        if not keys:
+            return
+        async with self.bot.mysql.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    f"SELECT * FROM {table} WHERE {self.allocations[table]} IN "
+                    f"({', '.join(['%s'] * len(keys))});", keys
+                )
+                rows = {row[0]: row[1] for row in await cursor.fetchall() if row}
+        for key in keys:
+            # 読み込み中に他の場所で読み込まれた場合はそちらを優先する。
+            if not self.is_loaded(table, key) and key not in datas._removed:
+                datas[key] = ChangedDict.from_json(rows[key]) if key in rows else ChangedDict()
+                datas[key].changed = False
+        if datas._evicted:
+            # 追い出された行の書き込みを行う。
+            self.sync(table)
+
+    @message_listener()
+    async def on_message(self, message: discord.Message):
+        # 先読みを行う。
+        for table in self.lazy_tables.values():
+            if table.__prefetch__:
+                if table.__allocation_name__ == "GuildID" and message.guild is not None:
+                    await self.load(table.name, (message.guild.id,))
+                elif table.__allocation_name__ == "UserID":
+                    await self.load(table.name, (message.author.id,))
+
     async def _remove(
-        self, cursor: Cursor, table: str, key: Key, print_: bool = False
+        self, cursor: Cursor, table: str, keys: list[Key]
     ) -> None:
-        # 削除を行う。
-        if print_:
-            self.print("[sync.remove]", f"{table}.{key}")
+        # まとめて削除を行う。
         await cursor.execute(
-            f"DELETE FROM {table} WHERE {self.allocations[table]} = %s;",
-            (key,)
+            f"DELETE FROM {table} WHERE {self.allocations[table]} IN "
+            f"({', '.join(['%s'] * len(keys))});", keys
         )
 
     async def _update(
+        self, cursor: Cursor, table: str, rows: list[tuple[Key, str]]
+    ) -> None:
+        # まとめて更新を行う。
+        if table not in self._upsertable:
+            # 主キーがない場合は消してから入れ直す。
+            await self._remove(cursor, table, [key for key, _ in rows])
+        await cursor.execute(
+            f"INSERT INTO {table} ({self.allocations[table]}, Data) VALUES "
+            f"{', '.join(['(%s, %s)'] * len(rows))}"
+            + (" ON DUPLICATE KEY UPDATE Data = VALUES(Data);"
+               if table in self._upsertable else ";"),
+            [value for row in rows for value in row]
+        )
+
+    async def _patch(
         self, cursor: Cursor, table: str, key: Key,
-        data: ChangedDict, print_: bool = False
+        removes: list[str], sets: list[tuple[str, str]]
     ) -> None:
-        # 更新を行う。
-        if print_:
-            self.print("[sync.update]", f"{table}.{key}: {data}")
+        # JSON_REMOVEとJSON_SETで変更された場所だけを更新する。
+        expression, args = "Data", []
+        if removes:
+            expression = f"JSON_REMOVE({expression}, {', '.join(['%s'] * len(removes))})"
+            args.extend(removes)
+        if sets:
+            expression = f"JSON_SET({expression}, " \
+                f"{', '.join(['%s, CAST(%s AS JSON)'] * len(sets))})"
+            args.extend(value for pair in sets for value in pair)
         await cursor.execute(
-            f"SELECT * FROM {table} WHERE {self.allocations[table]} = %s;",
-            (key,)
+            f"UPDATE {table} SET Data = {expression} WHERE {self.allocations[table]} = %s;",
+            args + [key]
         )
-        if await cursor.fetchone():
-            await cursor.execute(
-                f"UPDATE {table} SET Data = %s WHERE {self.allocations[table]} = %s;",
-                (dumps(data), key)
-            )
-        else:
-            await cursor.execute(
-                f"INSERT INTO {table} VALUES (%s, %s);", (key, dumps(data))
-            )
+
+    def _make_patch(
+        self, data: ChangedDict
+    ) -> Optional[tuple[list[str], list[tuple[str, str]]]]:
+        # 部分的な更新の内容を作る。全体を書き直した方が良い場合はNoneを返す。
+        if (patch := data.pop_patch()) is None:
+            return None
+        try:
+            sets = [(json_path(path), dumps(data.resolve(path))) for path in patch[1]]
+        except (KeyError, IndexError, TypeError):
+            return None
+        removes = [json_path(path) for path in patch[0]]
+        if sum(map(len, removes)) + sum(len(a) + len(b) for a, b in sets) >= data._size:
+            return None
+        return removes, sets
 
     async def _sync(self, table: str, datas: DataDict[Key, ChangedDict]) -> None:
-        # 指定されたテーブルのデータの同期を行います。
-        self.print("[sync]", table)
+        # 指定されたテーブルの変更があった行だけを書き込みます。
+        removed, datas._removed = datas._removed, []
+        updated: list[tuple[Key, ChangedDict, Optional[str], Optional[tuple]]] = []
+        evicted = getattr(datas, "_evicted", {})
+        for key, data in list(datas.items()) + list(evicted.items()):
+            if data.refresh():
+                # 書き込み中に変更された場合に次回また書き込まれるよう、先にフラグを戻しておく。
+                data.changed = data._new = False
+                patch = self._make_patch(data)
+                updated.append((key, data, None if patch else dumps(data), patch))
+        if not removed and not updated:
+            return
+
+        started = time()
         async with self.bot.mysql.pool.acquire() as conn:
             async with conn.cursor() as cursor:
-                # 削除されたものを消す。
-                for removed_key in datas._removed:
-                    await self._remove(cursor, table, removed_key)
-                # 変更されたものをアップデートする。
-                for key, data in list(datas.items()):
-                    await self._update(cursor, table, key, data)
-                    data.changed = False
+                for index in range(0, len(removed), self.FLUSH_CHUNK):
+                    chunk = removed[index:index + self.FLUSH_CHUNK]
+                    try:
+                        await conn.begin()
+                        await self._remove(cursor, table, chunk)
+                        await conn.commit()
+                    except Exception:
+                        await conn.rollback()
+                        # 次回の同期でやり直す。
+                        datas._removed.extend(
+                            key for key in removed[index:] if key not in datas
+                        )
+                        for _, data, _, _ in updated:
+                            data.changed = data._full = True
+                        raise
+                for index in range(0, len(updated), self.FLUSH_CHUNK):
+                    chunk = updated[index:index + self.FLUSH_CHUNK]
+                    try:
+                        await conn.begin()
+                        if rows := [(key, raw) for key, _, raw, _ in chunk if raw is not None]:
+                            await self._update(cursor, table, rows)
+                        for key, _, _, patch in chunk:
+                            if patch is not None:
+                                await self._patch(cursor, table, key, *patch)
+                        await conn.commit()
+                    except Exception:
+                        await conn.rollback()
+                        for _, data, _, _ in updated[index:]:
+                            data.changed = data._full = True
+                        raise
+                    for _, data, raw, _ in chunk:
+                        if raw is not None:
+                            data._persisted, data._size = True, len(raw)
+        for key, _, _, _ in updated:
+            if key in evicted and not evicted[key].changed:
+                del evicted[key]
+        patched = sum(patch is not None for _, _, _, patch in updated)
+        self.print(
+            "[sync]", f"{table}: {len(updated)} updated ({patched} patched), "
+            f"{len(removed)} removed ({time() - started:.3f}s)"
+        )
 
     def sync(self, table: Optional[str] = None):
-        "同期を行います。注意：キャッシュのデータが優先されます。"
-        if table is None:
-            if self.data[table]:
+        "同期を行います。変更があった行のみが書き込まれます。注意：キャッシュのデータが優先されます。"
+        if table is not None:
+            datas = self.data[table]
+            if datas or datas._removed or getattr(datas, "_evicted", None):
                 self.bot.loop.create_task(
-                    self._sync(table, self.data[table]), name=f"[{self.__cog_name__}] Sync: {table}"
+                    self._sync(table, datas), name=f"[{self.__cog_name__}] Sync: {table}"
                 )
         else:
             if self.data:
-                self.print("Now syncing...")
                 for table, datas in list(self.data.items()):
                     self.bot.loop.create_task(
                         self._sync(table, datas), name=f"[{self.__cog_name__}] Sync: {table}"
@@ -229,7 +732,7 @@ class DataManager(commands.Cog):
         self.sync()
 
     def cog_unload(self):
-        self._auto_save.cancel()
+        self._auto_sync.cancel()
 
     @commands.Cog.listener()
     async def on_close(self, _):
@@ -0,0 +1,166 @@
+# Free RT Util - Log
+
+"""`bot.print`のログを、イベントループを止めずに出力するためのものです。
+ログは`QueueHandler`でキューに入れるだけで、出力は`QueueListener`のスレッドで行われます。
+出力先は今までと同じ色付きの標準出力と、ログの収集に使えるJSON Linesのファイルです。
+また出所(コグかタグ)ごとに件数を制限して、スパム対策などのログで溢れないようにします。
+
+# Examples
+```python
+bot.print("[AutoMod]", "Muted", member, guild_id=guild.id, event="mute")
+bot.print("[Bump]", "Failed to notify", level=logging.WARNING, exc_info=True)
+```"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from logging import (
+    Filter, Formatter, Logger, LogRecord, StreamHandler, getLogger, INFO, WARNING
+)
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from traceback import format_exception
+from queue import SimpleQueue
+from os import makedirs
+from os.path import dirname
+import sys
+
+from ujson import dumps
+
+
+LOGGER = "rt"
+"`bot.print`で使うロガーの名前です。"
+FIELDS = ("tags", "cog", "guild_id", "shard_id", "event")
+"構造化されたログに含める`LogRecord`の属性です。"
+JSON_PATH = "log/rt.jsonl"
+"JSON Linesのログを書き込むファイルのパスです。"
+JSON_MAX_BYTES = 10 * 1024 * 1024
+"JSON Linesのログのファイルの最大の大きさです。超えた場合は`rt.jsonl.1`のように古いものが残されます。"
+JSON_BACKUP_COUNT = 5
+"残しておく古いJSON Linesのログのファイルの数です。"
+
+
+class RateLimitFilter(Filter):
+    """出所ごとにログの件数を制限するフィルターです。
+    出所は`cogs.`で始まるコグのモジュール名で、そうでない場合は最初のタグです。
+    `WARNING`以上のログと、`limit`が`False`のログ(起動時のログなど)は制限しません。
+    制限で出力しなかった件数は、次の区間の最初のログに`suppressed`として付けられます。
+
+    Parameters
+    ----------
+    rate : int, default 30
+        一つの区間で出力する最大の件数です。
+    per : float, default 10.0
+        区間の秒数です。"""
+
+    def __init__(self, rate: int = 30, per: float = 10.0):
+        super().__init__()
+        self.rate, self.per = rate, per
+        # 出所ごとの`[区間の開始時間, 件数, 出力しなかった件数]`です。
+        self.windows: dict[str, list] = {}
+        self.suppressed = 0
+
+    def filter(self, record: LogRecord) -> bool:
+        if record.levelno >= WARNING or not getattr(record, "limit", True):
+            return True
+        if not (source := getattr(record, "cog", None) or "").startswith("cogs."):
+            # utilやmain.pyからのものはタグで分ける。
+            source = next(iter(getattr(record, "tags", ())), record.name)
+        window = self.windows.get(source)
+        if window is None or record.created - window[0] >= self.per:
+            if window is not None and window[2]:
+                record.suppressed = window[2]
+            self.windows[source] = [record.created, 1, 0]
+            return True
+        if window[1] < self.rate:
+            window[1] += 1
+            return True
+        window[2] += 1
+        self.suppressed += 1
+        return False
+
+
+class ConsoleFormatter(Formatter):
+    "今までの`bot.print`と同じ色付きの形式にするフォーマッターです。"
+
+    COLORS = ("\033[93m", "\033[95m")
+
+    def format(self, record: LogRecord) -> str:
+        tags = [
+            f"{color}[{tag}]\033[0m" for color, tag
+            in zip(self.COLORS, getattr(record, "tags", ()))
+        ]
+        message = " ".join(("\033[32m[RT log]\033[0m", *tags, record.getMessage()))
+        if suppressed := getattr(record, "suppressed", 0):
+            message += f" \033[90m({suppressed} suppressed)\033[0m"
+        if record.exc_text:
+            message += "\n" + record.exc_text
+        return message
+
+
+class JSONFormatter(Formatter):
+    "一つのログを一行のJSONにするフォーマッターです。"
+
+    def format(self, record: LogRecord) -> str:
+        data: dict[str, Any] = {
+            "time": round(record.created, 3), "level": record.levelname,
+            "message": record.getMessage()
+        }
+        for field in FIELDS:
+            if (value := getattr(record, field, None)) is not None:
+                data[field] = value
+        if suppressed := getattr(record, "suppressed", 0):
+            data["suppressed"] = suppressed
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        return dumps(data, ensure_ascii=False)
+
+
+class StructuredQueueHandler(QueueHandler):
+    "例外の情報をJSONのログにも残すために、メッセージに含めずにそのまま渡す`QueueHandler`です。"
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            # トレースバックのオブジェクトは別のスレッドに渡すと重いので文字列にしておく。
+            record.exc_text = "".join(format_exception(*record.exc_info))
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+    json_path: Optional[str] = JSON_PATH, rate: int = 30, per: float = 10.0
+) -> tuple[Logger, QueueListener, RateLimitFilter]:
+    """`bot.print`で使うロガーを用意して、出力を行うスレッドを開始します。
+
+    Parameters
+    ----------
+    json_path : str, optional
+        JSON Linesのログを書き込むファイルのパスです。`None`の場合は書き込みません。
+    rate : int, default 30
+        出所ごとに`per`秒で出力する最大の件数です。
+    per : float, default 10.0
+        件数を数える区間の秒数です。"""
+    queue: SimpleQueue = SimpleQueue()
+    console = StreamHandler(sys.stdout)
+    console.setFormatter(ConsoleFormatter())
+    handlers = [console]
+    if json_path is not None:
+        makedirs(dirname(json_path) or ".", exist_ok=True)
+        sink = RotatingFileHandler(
+            json_path, maxBytes=JSON_MAX_BYTES, backupCount=JSON_BACKUP_COUNT,
+            encoding="utf-8"
+        )
+        sink.setFormatter(JSONFormatter())
+        handlers.append(sink)
+    listener = QueueListener(queue, *handlers, respect_handler_level=True)
+
+    handler = StructuredQueueHandler(queue)
+    limiter = RateLimitFilter(rate, per)
+    handler.addFilter(limiter)
+    logger = getLogger(LOGGER)
+    logger.handlers = [handler]
+    logger.setLevel(INFO)
+    logger.propagate = False
+    listener.start()
+    return logger, listener, limiter
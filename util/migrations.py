@@ -0,0 +1,282 @@
+# Free RT Util - Migrations
+
+"""データベースのテーブルに主キーやインデックスを追加するためのマイグレーションです。
+`RT.setup_hook`で実行され、実行したものは`Migrations`テーブルに記録されるので同じものは二度実行されません。
+対象のテーブルがまだ作られていない場合は、次の起動時に実行されます。
+
+マイグレーションを追加する場合は`MIGRATIONS`の最後に、前のものより大きい番号で追加してください。
+主キーは重複した行を作らないようにしているテーブルにだけ付けてください。
+そうでないテーブルに付けると、書き込みの際にエラーが発生するようになってしまいます。"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
+
+from time import time
+import traceback
+
+if TYPE_CHECKING:
+    from .bot import RT
+
+
+TABLE = "Migrations"
+"実行したマイグレーションを記録するテーブルの名前です。"
+
+
+class Migration(NamedTuple):
+    "マイグレーションです。"
+
+    version: int
+    "番号です。"
+    table: str
+    "対象のテーブルです。"
+    description: str
+    "説明です。"
+    primary: tuple[str, ...] = ()
+    "主キーにする列です。"
+    indexes: tuple[tuple[str, ...], ...] = ()
+    "追加するインデックスの列です。`TEXT`の列は`Mode(32)`のように長さを指定してください。"
+    explain: str = ""
+    "前後で`EXPLAIN`をして比べるクエリです。"
+
+
+def _lib_data_manager(version: int, table: str, column: str) -> Migration:
+    # `lib_data_manager`で作られるテーブルは昔は主キーなしで作られていた。
+    return Migration(
+        version, table, f"add primary key to {table}", (column,),
+        explain=f"SELECT Data FROM {table} WHERE {column} = 0"
+    )
+
+
+MIGRATIONS = (
+    Migration(
+        1, "language", "add primary key to language", ("id",),
+        explain="SELECT id FROM language WHERE id = 0"
+    ),
+    Migration(
+        2, "NgNickName", "add index on NgNickName.GuildID", indexes=(("GuildID",),),
+        explain="SELECT Word FROM NgNickName WHERE GuildID = 0"
+    ),
+    Migration(
+        3, "SecURL", "add primary key to SecURL", ("GuildID",),
+        explain="SELECT * FROM SecURL WHERE GuildID = 0"
+    ),
+    Migration(
+        4, "RoleKeeper", "add primary key to RoleKeeper", ("GuildID",),
+        explain="SELECT GuildID FROM RoleKeeper WHERE GuildID = 0"
+    ),
+    Migration(
+        5, "RoleKeeperData", "add primary key and UpdateTime index to RoleKeeperData",
+        ("GuildID", "UserID"), (("UpdateTime",),),
+        explain="SELECT Roles FROM RoleKeeperData WHERE GuildID = 0 AND UserID = 0"
+    ),
+    Migration(
+        6, "DelayDelete", "add ChannelID and DeleteTime indexes to DelayDelete",
+        indexes=(("ChannelID", "MessageID"), ("DeleteTime",)),
+        explain="SELECT * FROM DelayDelete WHERE DeleteTime <= 0"
+    ),
+    _lib_data_manager(7, "LocalLevel", "GuildID"),
+    _lib_data_manager(8, "GlobalLevel", "UserID"),
+    _lib_data_manager(9, "NGWords", "GuildID"),
+    _lib_data_manager(10, "CaptchaSaveData", "GuildID"),
+    _lib_data_manager(11, "RoleLinkerData", "GuildID"),
+    _lib_data_manager(12, "ThreadNotification", "GuildID"),
+    _lib_data_manager(13, "TTSUserData", "UserID"),
+    _lib_data_manager(14, "TTSGuildData", "GuildID"),
+    _lib_data_manager(15, "DJData", "GuildID"),
+    _lib_data_manager(16, "Yahoo", "GuildID"),
+    Migration(
+        17, "LinkBlocker", "add primary key to LinkBlocker", ("GuildID",),
+        explain="SELECT * FROM LinkBlocker WHERE GuildID = 0"
+    ),
+    Migration(
+        18, "LinkBlockerIgnores", "add index on LinkBlockerIgnores.ChannelID",
+        indexes=(("ChannelID",),),
+        explain="SELECT * FROM LinkBlockerIgnores WHERE ChannelID = 0"
+    ),
+    Migration(
+        19, "AFKPlus", "add index on AFKPlus.UserID", indexes=(("UserID",),),
+        explain="SELECT Reason, Data FROM AFKPlus WHERE UserID = 0"
+    ),
+    Migration(
+        20, "RequireSendQueue", "add indexes to RequireSendQueue",
+        indexes=(("GuildID", "UserID"), ("ChannelID", "UserID")),
+        explain="SELECT * FROM RequireSendQueue WHERE GuildID = 0 AND UserID = 0"
+    ),
+    Migration(
+        21, "RoleMessage", "add index on RoleMessage.GuildID",
+        indexes=(("GuildID", "RoleID"),),
+        explain="SELECT * FROM RoleMessage WHERE GuildID = 0 AND RoleID = 0"
+    ),
+    Migration(
+        22, "OriginalCommand", "add index on OriginalCommand.GuildID",
+        indexes=(("GuildID", "Command(64)"),),
+        explain="SELECT * FROM OriginalCommand WHERE GuildID = 0"
+    ),
+    Migration(
+        23, "Blocker", "add index on Blocker.GuildID", indexes=(("GuildID", "Mode(16)"),),
+        explain="SELECT * FROM Blocker WHERE GuildID = 0"
+    ),
+    Migration(
+        24, "bump", "add index on bump.GuildID", indexes=(("GuildID", "Mode(16)"),),
+        explain="SELECT * FROM bump WHERE GuildID = 0 AND Mode = 'bump'"
+    ),
+    Migration(
+        25, "bumpRanking", "add index on bumpRanking.UserID",
+        indexes=(("UserID", "Mode(16)"),),
+        explain="SELECT * FROM bumpRanking WHERE UserID = 0 AND Mode = 'bump'"
+    ),
+    Migration(
+        26, "Welcome", "add index on Welcome.GuildID", indexes=(("GuildID", "Mode(16)"),),
+        explain="SELECT * FROM Welcome WHERE GuildID = 0 AND Mode = 'join'"
+    ),
+    Migration(
+        27, "channelStatus", "add indexes to channelStatus",
+        indexes=(("GuildID",), ("ChannelID",)),
+        explain="SELECT * FROM channelStatus WHERE ChannelID = 0"
+    ),
+    Migration(
+        28, "VoiceRole", "add index on VoiceRole.GuildID",
+        indexes=(("GuildID", "ChannelID"),),
+        explain="SELECT * FROM VoiceRole WHERE GuildID = 0 AND ChannelID = 0"
+    ),
+    Migration(
+        29, "Locker", "add index on Locker.ChannelID", indexes=(("ChannelID",),),
+        explain="SELECT * FROM Locker WHERE ChannelID = 0"
+    ),
+    Migration(
+        30, "ExpandIgnore", "add index on ExpandIgnore.ChannelID",
+        indexes=(("ChannelID",),),
+        explain="SELECT * FROM ExpandIgnore WHERE ChannelID = 0"
+    ),
+    Migration(
+        31, "gban", "add index on gban.UserID", indexes=(("UserID",),),
+        explain="SELECT * FROM gban WHERE UserID = 0"
+    ),
+    Migration(
+        32, "TenkiData", "add UserID and NofTime indexes to TenkiData",
+        indexes=(("UserID",), ("NofTime(8)",)),
+        explain="SELECT * FROM TenkiData WHERE NofTime = '00:00'"
+    ),
+    Migration(
+        33, "captcha", "add index on captcha.GuildID", indexes=(("GuildID",),),
+        explain="SELECT * FROM captcha WHERE GuildID = 0"
+    )
+)
+"マイグレーションの一覧です。"
+
+
+def _index_name(columns: tuple[str, ...]) -> str:
+    return "idx_" + "_".join(column.split("(")[0] for column in columns)
+
+
+async def _exists(cursor, table: str) -> bool:
+    await cursor.execute(
+        """SELECT 1 FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s;""",
+        (table,)
+    )
+    return bool(await cursor.fetchone())
+
+
+async def _keys(cursor, table: str) -> set[str]:
+    await cursor.execute(f"SHOW KEYS FROM {table};")
+    index = [column[0] for column in cursor.description].index("Key_name")
+    return {row[index] for row in await cursor.fetchall()}
+
+
+async def explain(cursor, query: str) -> list[dict[str, Any]]:
+    "`EXPLAIN`の結果を辞書のリストで返します。"
+    await cursor.execute(f"EXPLAIN {query};")
+    names = [column[0] for column in cursor.description]
+    return [dict(zip(names, row)) for row in await cursor.fetchall()]
+
+
+def _summary(rows: list[dict[str, Any]]) -> str:
+    return ", ".join(
+        f"type={row.get('type')} key={row.get('key')} rows={row.get('rows')}"
+        for row in rows
+    ) or "-"
+
+
+async def apply(cursor, migration: Migration) -> Optional[str]:
+    """マイグレーションを実行します。
+    既に主キーやインデックスがある場合はそれを飛ばします。
+
+    Returns
+    -------
+    Optional[str]
+        `EXPLAIN`の前後を比べた報告です。テーブルがまだない場合は`None`になります。"""
+    if not await _exists(cursor, migration.table):
+        return None
+    before = await explain(cursor, migration.explain) if migration.explain else []
+    keys, notes = await _keys(cursor, migration.table), []
+
+    indexes = list(migration.indexes)
+    if migration.primary and "PRIMARY" not in keys:
+        columns = ", ".join(migration.primary)
+        # 重複やNULLがある場合は主キーにできないので、代わりに普通のインデックスにする。
+        await cursor.execute(
+            f"""SELECT COUNT(*) FROM (
+                SELECT 1 FROM {migration.table} GROUP BY {columns} HAVING COUNT(*) > 1
+            ) AS Duplicates;"""
+        )
+        duplicates = (await cursor.fetchone())[0]
+        await cursor.execute(
+            f"SELECT COUNT(*) FROM {migration.table} WHERE "
+            + " OR ".join(f"{column} IS NULL" for column in migration.primary)
+        )
+        nulls = (await cursor.fetchone())[0]
+        if duplicates or nulls:
+            notes.append(
+                f"{duplicates} duplicated and {nulls} null keys, added an index instead of primary key"
+            )
+            indexes.insert(0, migration.primary)
+        else:
+            await cursor.execute(f"ALTER TABLE {migration.table} ADD PRIMARY KEY ({columns});")
+
+    for columns in indexes:
+        if (name := _index_name(columns)) not in keys:
+            await cursor.execute(
+                f"ALTER TABLE {migration.table} ADD INDEX {name} ({', '.join(columns)});"
+            )
+            keys.add(name)
+
+    after = await explain(cursor, migration.explain) if migration.explain else []
+    return f"{_summary(before)} -> {_summary(after)}" + "".join(
+        f" ({note})" for note in notes
+    )
+
+
+async def migrate(bot: RT) -> None:
+    "まだ実行していないマイグレーションを実行します。"
+    async with bot.mysql.pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                f"""CREATE TABLE IF NOT EXISTS {TABLE} (
+                    Version INT PRIMARY KEY NOT NULL, Description TEXT, AppliedAt DOUBLE
+                );"""
+            )
+            await cursor.execute(f"SELECT Version FROM {TABLE};")
+            applied = {row[0] for row in await cursor.fetchall()}
+
+            for migration in MIGRATIONS:
+                if migration.version in applied:
+                    continue
+                try:
+                    report = await apply(cursor, migration)
+                except Exception:
+                    bot.print(
+                        "[Migration]", f"Failed #{migration.version} {migration.description}"
+                    )
+                    traceback.print_exc()
+                    continue
+                if report is None:
+                    continue
+                await cursor.execute(
+                    f"INSERT INTO {TABLE} VALUES (%s, %s, %s);",
+                    (migration.version, migration.description, time())
+                )
+                bot.print(
+                    "[Migration]", f"#{migration.version} {migration.description}:", report
+                )
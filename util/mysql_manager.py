@@ -1,17 +1,314 @@
 # Free RT Util - MySQL Manager
 
-from typing import Any, Dict, Tuple
+from typing import (
+    Any, Dict, Tuple, Optional, Sequence, Iterable, Iterator, AsyncIterator, NamedTuple
+)
 
-from asyncio import get_event_loop, iscoroutinefunction
+from asyncio import get_event_loop, iscoroutinefunction, shield
 from aiomysql import create_pool, connect
-from functools import wraps
+from collections import namedtuple
+from functools import wraps, lru_cache
 import warnings
 import ujson
 
+from .query_stats import (
+    QueryStats, InstrumentedCursor, InstrumentedSSCursor, InstrumentedPool
+)
+from .pool_governor import PoolGovernor
+
 
 warnings.filterwarnings('ignore', module=r"aiomysql")
 
 
+MAX_PACKET = 4 * 1024 * 1024
+"MySQLの`max_allowed_packet`の既定値(4MiB)です。一括操作の一つのクエリの大きさはこれを超えないようにします。"
+
+
+BATCH_SIZE = 1000
+"ストリーミングで一度に取得する行の数の既定値です。"
+
+
+async def stream_rows(
+    pool, query: str, args: Optional[Sequence[Any]] = None,
+    batch_size: int = BATCH_SIZE
+) -> AsyncIterator[tuple]:
+    """プールから接続を取得し、SSCursor(サーバーサイドカーソル)を使って結果の行を`batch_size`行ずつ取得して一行ずつ返します。
+    全ての行を一度にメモリに読み込まないので、大きなテーブルの全ての行を見る場合に使います。
+
+    Notes
+    -----
+    取得中は接続を一つ使い続けます。
+    この接続は他のクエリには使えないので、取得中に書き込みなどを行う場合は別の接続を使ってください。
+    行ごとにDiscordのAPIを呼ぶような時間のかかる処理をする場合は、`page_rows`を使ってください。
+
+    Examples
+    --------
+    async for row in stream_rows(bot.mysql.pool, "SELECT * FROM DelayDelete;"):
+        print(row)"""
+    async with pool.acquire() as conn:
+        async with conn.cursor(InstrumentedSSCursor) as cursor:
+            await cursor.execute(query, args)
+            while rows := await cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield row
+
+
+async def page_rows(
+    pool, table: str, columns: Sequence[str], keys: Sequence[str],
+    where: str = "", args: Sequence[Any] = (), batch_size: int = BATCH_SIZE
+) -> AsyncIterator[list[tuple]]:
+    """キーセットページネーションで、`keys`の順に`batch_size`行ずつ取得して一ページずつ返します。
+    一ページを取得するたびに接続をプールに返すので、ページの処理中に時間のかかることをしても接続を使い続けません。
+    次のページは前のページの最後の行のキーの値から取得するので、処理中に行を削除しても構いません。
+
+    Parameters
+    ----------
+    pool
+        aiomysqlのプールです。
+    table : str
+        テーブルの名前です。
+    columns : Sequence[str]
+        取得する列の名前です。返される行はこの順番になります。
+    keys : Sequence[str]
+        行を一意に決める列の名前です。`columns`に含まれている必要があります。
+    where : str, default ""
+        `WHERE`に加える条件です。
+    args : Sequence[Any], default ()
+        `where`の中の`%s`に入れる値です。
+    batch_size : int, default BATCH_SIZE
+        一ページの行の数です。
+
+    Examples
+    --------
+    async for rows in page_rows(
+        bot.mysql.pool, "DelayDelete", ("ChannelID", "MessageID", "DeleteTime"),
+        ("ChannelID", "MessageID"), "DeleteTime <= %s", (now,)
+    ):
+        for row in rows:
+            ..."""
+    indexes = [columns.index(key) for key in keys]
+    order = ", ".join(keys)
+    base = f"SELECT {', '.join(columns)} FROM {table} WHERE "
+    after = f"({order}) > ({', '.join(['%s'] * len(keys))})"
+    last: Optional[list[Any]] = None
+    while True:
+        conditions = [f"({where})"] if where else []
+        if last is not None:
+            conditions.append(after)
+        async with pool.acquire() as conn:
+            async with conn.cursor(InstrumentedCursor) as cursor:
+                await cursor.execute(
+                    f"{base}{' AND '.join(conditions) or 'TRUE'} "
+                    f"ORDER BY {order} LIMIT {int(batch_size)};",
+                    (*args, *(last or ()))
+                )
+                rows = [row for row in await cursor.fetchall() if row]
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            break
+        last = [rows[-1][index] for index in indexes]
+
+
+def _value(value: Any) -> Any:
+    # 辞書はJSONにする。
+    return ujson.dumps(value) if isinstance(value, dict) else value
+
+
+def _chunk_rows(
+    rows: Iterable[Sequence[Any]], base: int, chunk_size: int, max_packet: int
+) -> Iterator[list[list[Any]]]:
+    # 行の数とだいたいのクエリの大きさが上限を超えないように分ける。
+    chunk, size = [], base
+    for row in rows:
+        row = [_value(value) for value in row]
+        row_size = sum(len(str(value)) + 4 for value in row) + 4
+        if chunk and (len(chunk) >= chunk_size or size + row_size > max_packet):
+            yield chunk
+            chunk, size = [], base
+        chunk.append(row)
+        size += row_size
+    if chunk:
+        yield chunk
+
+
+async def _execute_chunks(
+    cursor, query: str, rows: Iterable[Sequence[Any]],
+    make_values: str, separator: str, suffix: str,
+    chunk_size: int, max_packet: int
+) -> int:
+    # 分けた行を一つのトランザクションで一つずつ実行する。
+    affected = 0
+    for chunk in _chunk_rows(rows, len(query) + len(suffix), chunk_size, max_packet):
+        await cursor.connection.begin()
+        try:
+            await cursor.execute(
+                query + separator.join([make_values] * len(chunk)) + suffix,
+                [value for row in chunk for value in row]
+            )
+        except Exception:
+            await cursor.connection.rollback()
+            raise
+        else:
+            await cursor.connection.commit()
+            affected += max(cursor.rowcount, 0)
+    return affected
+
+
+async def bulk_insert(
+    cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+    ignore: bool = False, chunk_size: int = 1000, max_packet: int = MAX_PACKET
+) -> int:
+    """aiomysqlのカーソルを使って複数の行を一括で追加します。
+    行は`chunk_size`行ずつ、または`max_packet`を超えない大きさに分けられ、分けたものごとにトランザクションで実行されます。
+    引数の詳細は`Cursor.insert_many`を参照してください。
+
+    Returns
+    -------
+    int
+        追加された行の数です。"""
+    return await _execute_chunks(
+        cursor, f"INSERT {'IGNORE ' if ignore else ''}INTO {table} "
+        f"({', '.join(columns)}) VALUES ",
+        rows, f"({', '.join(['%s'] * len(columns))})", ", ", ";",
+        chunk_size, max_packet
+    )
+
+
+async def bulk_upsert(
+    cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = 1000, max_packet: int = MAX_PACKET
+) -> int:
+    """aiomysqlのカーソルを使って複数の行を一括で追加し、主キーなどが重複する場合は更新します。
+    引数の詳細は`Cursor.upsert_many`を参照してください。
+
+    Returns
+    -------
+    int
+        MySQLが返す影響を受けた行の数です。更新された行は2として数えられます。"""
+    return await _execute_chunks(
+        cursor, f"INSERT INTO {table} ({', '.join(columns)}) VALUES ",
+        rows, f"({', '.join(['%s'] * len(columns))})", ", ",
+        " ON DUPLICATE KEY UPDATE " + ", ".join(
+            f"{column} = VALUES({column})" for column in (update_columns or columns)
+        ) + ";", chunk_size, max_packet
+    )
+
+
+async def bulk_delete(
+    cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+    chunk_size: int = 1000, max_packet: int = MAX_PACKET
+) -> int:
+    """aiomysqlのカーソルを使って、列の値の組み合わせが一致する行を一括で削除します。
+    引数の詳細は`Cursor.delete_many`を参照してください。
+
+    Returns
+    -------
+    int
+        削除された行の数です。"""
+    return await _execute_chunks(
+        cursor, f"DELETE FROM {table} WHERE ({', '.join(columns)}) IN (",
+        rows, f"({', '.join(['%s'] * len(columns))})", ", ", ");",
+        chunk_size, max_packet
+    )
+
+
+class SchemaRegistry:
+    """テーブルの列の名前と型を保存しておくためのクラスです。
+    `Cursor.create_table`で作られたテーブルは自動で登録され、登録されていないテーブルは最初に使われた際に`INFORMATION_SCHEMA`から読み込まれます。
+    `Cursor.get_datas`などは、ここでJSONとして登録されている列だけを辞書にします。
+    モジュールにある`schemas`を使ってください。"""
+
+    def __init__(self):
+        self.columns: dict[str, dict[str, str]] = {}
+        self.json_columns: dict[str, frozenset[str]] = {}
+
+    def register(
+        self, table: str, columns: Dict[str, str], json_columns: Iterable[str] = ()
+    ) -> None:
+        """テーブルの列を登録します。
+
+        Parameters
+        ----------
+        table : str
+            テーブルの名前です。
+        columns : Dict[str, str]
+            列の名前と型名の辞書です。
+        json_columns : Iterable[str], default ()
+            型が`JSON`ではないけれどJSONを入れている列の名前です。"""
+        self.columns[table] = {key: value.split()[0].upper() for key, value in columns.items()}
+        self.json_columns[table] = frozenset(
+            key for key, value in self.columns[table].items() if value == "JSON"
+        ) | frozenset(json_columns)
+
+    async def load(self, cursor, table: str) -> frozenset[str]:
+        "登録されていない場合は`INFORMATION_SCHEMA`から読み込んで、JSONの列の名前を返します。"
+        if table not in self.json_columns:
+            await cursor.execute(
+                """SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                    ORDER BY ORDINAL_POSITION;""", (table,)
+            )
+            self.register(table, {
+                name: type_ for name, type_ in await cursor.fetchall()
+            })
+        return self.json_columns[table]
+
+
+schemas = SchemaRegistry()
+"テーブルの列の情報です。"
+
+
+@lru_cache(maxsize=512)
+def _where(columns: Tuple[str, ...]) -> str:
+    return " WHERE " + " AND ".join(f"{column} = %s" for column in columns) \
+        if columns else ""
+
+
+@lru_cache(maxsize=512)
+def compile_select(
+    table: str, targets: Tuple[str, ...], custom: str = "", columns: str = "*"
+) -> str:
+    "`SELECT`文を作ります。同じ形のものはキャッシュされます。"
+    return f"SELECT {columns} FROM {table}{_where(targets)}{' ' + custom if custom else custom}"
+
+
+@lru_cache(maxsize=512)
+def compile_insert(table: str, columns: Tuple[str, ...]) -> str:
+    "`INSERT`文を作ります。同じ形のものはキャッシュされます。"
+    return f"INSERT INTO {table} ({', '.join(columns)}) " \
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+
+
+@lru_cache(maxsize=512)
+def compile_update(table: str, columns: Tuple[str, ...], targets: Tuple[str, ...]) -> str:
+    "`UPDATE`文を作ります。同じ形のものはキャッシュされます。"
+    return f"UPDATE {table} SET {', '.join(f'{column} = %s' for column in columns)}" \
+        f"{_where(targets)}"
+
+
+@lru_cache(maxsize=512)
+def compile_delete(table: str, targets: Tuple[str, ...]) -> str:
+    "`DELETE`文を作ります。同じ形のものはキャッシュされます。"
+    return f"DELETE FROM {table}{_where(targets)}"
+
+
+@lru_cache(maxsize=256)
+def _row_type(names: Tuple[str, ...]) -> type[NamedTuple]:
+    # 列名ごとの行の型を作る。
+    return namedtuple("Row", names, rename=True)
+
+
+def _decode_legacy(row: tuple) -> list:
+    # 以前の、`{`と`}`で囲まれた文字列を全て辞書にするやり方で行を変換する。
+    return [
+        ((ujson.loads(value) if (value and value[0] == "{" and value[-1] == "}") else value)
+         if isinstance(value, str) else value)
+        for value in row if value is not None
+    ]
+
+
 class Cursor:
     """データベースの操作を簡単に行うためのクラスです。  
     `Cursor.get_data`などの便利なものが使えます。  
@@ -82,7 +379,8 @@ class Cursor:
         await self.close()
 
     async def create_table(self, table: str, columns: Dict[str, str],
-                           if_not_exists: bool = True, commit: bool = True) -> None:
+                           if_not_exists: bool = True, commit: bool = True,
+                           json_columns: Iterable[str] = ()) -> None:
         """テーブルを作成します。
 
         Parameters
@@ -95,12 +393,16 @@ class Cursor:
         if_not_exists : bool, default True
             テーブルが存在しない場合作るようにするかどうかです。
         commit : bool, default True
-            テーブルの作成後に自動で`MySQLManager.commit`をするかどうかです。"""
+            テーブルの作成後に自動で`MySQLManager.commit`をするかどうかです。
+        json_columns : Iterable[str], default ()
+            型が`JSON`ではないけれどJSONを入れる列の名前です。  
+            取得時にこれと`JSON`型の列だけが辞書になります。"""
         if_not_exists = "IF NOT EXISTS " if if_not_exists else ""
         values = ", ".join(f"{key} {columns[key]}" for key in columns)
         await self.cursor.execute(f"CREATE TABLE {if_not_exists}{table} ({values});")
         if commit:
             await self.connection.commit()
+        schemas.register(table, columns, json_columns)
         del if_not_exists, values
 
     async def drop_table(self, table: str, commit: bool = True) -> None:
@@ -118,20 +420,6 @@ class Cursor:
         if commit:
             await self.connection.commit()
 
-    def _get_column_args(
-            self, values: Dict[str, Any], format_text: str = "{} = %s AND ",
-            json_dump: bool = False
-    ) -> Tuple[str, list]:
-        conditions, args = "", []
-        for key in values:
-            conditions += format_text.format(key)
-            args.append(
-                ujson.dumps(values[key])
-                if json_dump and isinstance(values[key], dict)
-                else values[key]
-            )
-        return conditions, args
-
     async def insert_data(
         self, table: str, values: Dict[str, Any],
         commit: bool = True, json: bool = False
@@ -154,13 +442,8 @@ class Cursor:
         async with db.get_cursor() as cursor:
             values = {"name": "Takkun", "data": {"detail": "愉快"}}
             await cursor.post_data("tasuren_friends", values)"""
-        conditions, args = self._get_column_args(
-            values, "{}, ", json_dump=True
-        )
-        query = ("%s, " * len(args))[:-2]
         await self.cursor.execute(
-            f"INSERT INTO {table} ({conditions[:-2]}) VALUES ({query})",
-            args
+            compile_insert(table, tuple(values)), [_value(value) for value in values.values()]
         )
         if commit:
             await self.connection.commit()
@@ -182,19 +465,96 @@ class Cursor:
             更新するデータの条件です。
         commit : bool, default True
             更新後に自動で`MySQLManager.commit`を実行するかどうかです。"""
-        values, values_args = self._get_column_args(
-            values, "{} = %s, ", True
-        )
-        conditions, conditions_args = self._get_column_args(
-            targets, json_dump=True
-        )
         await self.cursor.execute(
-            f"UPDATE {table} SET {values[:-2]} WHERE {conditions[:-4]}",
-            values_args + conditions_args
+            compile_update(table, tuple(values), tuple(targets)),
+            [_value(value) for value in values.values()]
+            + [_value(value) for value in targets.values()]
         )
         if commit:
             await self.connection.commit()
 
+    async def insert_many(
+        self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+        ignore: bool = False, chunk_size: int = 1000, max_packet: int = MAX_PACKET
+    ) -> int:
+        """特定のテーブルに複数のデータを一括で追加します。  
+        複数行の`INSERT`文を作り、`chunk_size`行ずつ、または`max_packet`を超えない大きさに分けて実行します。  
+        分けたものはそれぞれ一つのトランザクションで実行され、自動でcommitされます。
+
+        Parameters
+        ----------
+        table : str
+            対象のテーブルです。
+        columns : Sequence[str]
+            列名です。
+        rows : Iterable[Sequence[Any]]
+            `columns`の順番に並んだ値の行です。辞書は自動でjsonになります。
+        ignore : bool, default False
+            `INSERT IGNORE`にするかどうかです。
+        chunk_size : int, default 1000
+            一つのクエリに入れる最大の行数です。
+        max_packet : int, default MAX_PACKET
+            一つのクエリのだいたいの最大の大きさです。MySQLの`max_allowed_packet`以下にしてください。
+
+        Returns
+        -------
+        int
+            追加された行の数です。
+
+        Examples
+        --------
+        async with db.get_cursor() as cursor:
+            await cursor.insert_many(
+                "tasuren_friends", ("name", "data"),
+                (("Takkun", {"detail": "愉快"}), ("yaakiyu", {"detail": "管理者"}))
+            )"""
+        return await bulk_insert(
+            self.cursor, table, columns, rows, ignore, chunk_size, max_packet
+        )
+
+    async def upsert_many(
+        self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+        update_columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000, max_packet: int = MAX_PACKET
+    ) -> int:
+        """特定のテーブルに複数のデータを一括で追加し、主キーなどが重複する場合は更新します。  
+        `INSERT ... ON DUPLICATE KEY UPDATE`を使うため、テーブルに主キーかユニークキーが必要です。  
+        引数は`Cursor.insert_many`と同じです。
+
+        Parameters
+        ----------
+        update_columns : Sequence[str], optional
+            重複した際に更新する列名です。指定しない場合は`columns`の全てを更新します。
+
+        Returns
+        -------
+        int
+            MySQLが返す影響を受けた行の数です。更新された行は2として数えられます。"""
+        return await bulk_upsert(
+            self.cursor, table, columns, rows, update_columns, chunk_size, max_packet
+        )
+
+    async def delete_many(
+        self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+        chunk_size: int = 1000, max_packet: int = MAX_PACKET
+    ) -> int:
+        """特定のテーブルから、列の値の組み合わせが一致するデータを一括で削除します。  
+        `DELETE ... WHERE (列, ...) IN ((値, ...), ...)`を作って実行します。  
+        引数は`Cursor.insert_many`と同じです。
+
+        Returns
+        -------
+        int
+            削除された行の数です。
+
+        Examples
+        --------
+        async with db.get_cursor() as cursor:
+            await cursor.delete_many("tasuren_friends", ("name",), (("Takkun",), ("yaakiyu",)))"""
+        return await bulk_delete(
+            self.cursor, table, columns, rows, chunk_size, max_packet
+        )
+
     async def exists(self, table: str, targets: Dict[str, Any], json: bool = False) -> bool:
         """特定のテーブルに特定のデータが存在しているかどうかを確認します。
 
@@ -209,7 +569,11 @@ class Cursor:
         -------
         exists : bool
             存在しているならTrue、存在しないならFalseです。"""
-        return bool(await self.get_data(table, targets, json=json))
+        await self.cursor.execute(
+            compile_select(table, tuple(targets), "LIMIT 1", "1"),
+            [_value(value) for value in targets.values()]
+        )
+        return await self.cursor.fetchone() is not None
 
     async def delete(
         self, table: str, targets: Dict[str, Any], commit: bool = True,
@@ -225,19 +589,41 @@ class Cursor:
             削除するデータの条件です。
         commit : bool, default True
             削除後に自動で`MySQLManager.commit`を実行するかどうかです。"""
-        conditions, args = self._get_column_args(targets, json_dump=True)
         await self.cursor.execute(
-            f"DELETE FROM {table} WHERE {conditions[:-4]}",
-            args
+            compile_delete(table, tuple(targets)),
+            [_value(value) for value in targets.values()]
         )
         if commit:
             await self.connection.commit()
 
+    def _select(
+        self, table: str, targets: Dict[str, Any], custom: str = ""
+    ) -> Tuple[str, list]:
+        # SELECT文を作る。
+        return compile_select(table, tuple(targets), custom), \
+            [_value(value) for value in targets.values()]
+
+    @staticmethod
+    def _decode_row(
+        row: Optional[tuple], description, json_columns: frozenset[str],
+        legacy: bool = False
+    ) -> tuple:
+        # JSONの列を辞書にして、列名で値を取り出せるタプルにする。
+        if row is None:
+            return []
+        if legacy:
+            return _decode_legacy(row)
+        names = tuple(column[0] for column in description)
+        return _row_type(names)._make(
+            ujson.loads(value) if name in json_columns and isinstance(value, (str, bytes))
+            else value for name, value in zip(names, row)
+        )
+
     async def get_datas(
         self, table: str, targets: Dict[str, Any],
         _fetchall: bool = True, custom: str = "",
-        json: bool = False
-    ) -> list:
+        json: bool = False, batch_size: int = BATCH_SIZE
+    ) -> AsyncIterator[tuple]:
         """特定のテーブルにある特定の条件のデータを取得します。  
         見つからない場合は空である`[]`が返されます。  
         ジェネレーターです。
@@ -248,50 +634,50 @@ class Cursor:
             対象のテーブルです。
         targets : Dict[str, Any]
             取得するデータの条件です。
+        _fetchall : bool, default True
+            Falseにした場合はSSCursor(サーバーサイドカーソル)を使い、`batch_size`行ずつ取得しながら返します。  
+            全ての行を一度にメモリに読み込まないので、大きなテーブルの場合はこちらを使いましょう。  
+            ただし取得中はこのCursorの接続で他のクエリを実行することはできません。
+        json : bool, default False
+            Trueにした場合は以前のように、`{`と`}`で囲まれた文字列の列を全て辞書にします。  
+            この場合はリストで返され、`NULL`の列は除かれます。
+        batch_size : int, default BATCH_SIZE
+            `_fetchall`がFalseの場合に一度に取得する行の数です。
 
         Yields
         ------
-        list
-            取得したデータのリストです。  
-            yieldで返され`[なにか, なにか, なにか, なにか]`のようになっています。  
-            もしjsonがあった場合は辞書になります。  
+        tuple
+            取得したデータの行です。  
+            yieldで返され`(なにか, なにか, なにか, なにか)`のようになっていて、`row.列名`でも値を取り出せます。  
+            `JSON`型の列と、`Cursor.create_table`の`json_columns`で指定した列は辞書になります。  
             見つからない場合は空である`[]`となります。
 
         Notes
         -----
-        もし条件関係なく全てを取得したい場合は引数の`targets`を空である`{}`にしましょう。"""
-        if targets:
-            conditions, args = self._get_column_args(
-                targets, json_dump=True
-            )
-            conditions = " WHERE " + conditions[:-4]
-        else:
-            conditions, args = "", ()
-        await self.cursor.execute(
-            f"SELECT * FROM {table}{conditions}{' ' + custom if custom else custom}",
-            args
-        )
+        もし条件関係なく全てを取得したい場合は引数の`targets`を空である`{}`にしましょう。  
+        SQL文はテーブルと列の組み合わせごとにキャッシュされます。"""
+        json_columns = await schemas.load(self.cursor, table)
+        query, args = self._select(table, targets, custom)
         if _fetchall:
-            list_rows = await self.cursor.fetchall()
-        else:
-            list_rows = [await self.cursor.fetchone()]
-        if list_rows:
-            for rows in list_rows:
-                if rows is None:
-                    yield []
-                else:
-                    rows = [
-                        ((ujson.loads(row) if (row and row[0] == "{" and row[-1] == "}")else row)
-                         if isinstance(row, str) else row)
-                        for row in rows if row is not None
-                    ]
-                    yield rows
-                    if not _fetchall:
-                        break
+            await self.cursor.execute(query, args)
+            if list_rows := await self.cursor.fetchall():
+                description = self.cursor.description
+                for rows in list_rows:
+                    yield self._decode_row(rows, description, json_columns, json)
+            else:
+                yield []
         else:
-            yield []
-
-    async def get_data(self, table: str, targets: Dict[str, Any], json: bool = False) -> list:
+            found = False
+            async with self.connection.cursor(InstrumentedSSCursor) as cursor:
+                await cursor.execute(query, args)
+                while list_rows := await cursor.fetchmany(batch_size):
+                    found = True
+                    for rows in list_rows:
+                        yield self._decode_row(rows, cursor.description, json_columns, json)
+            if not found:
+                yield []
+
+    async def get_data(self, table: str, targets: Dict[str, Any], json: bool = False) -> tuple:
         """一つだけデータを取得します。  
         引数は`Cursor.get_datas`と同じです。
 
@@ -305,7 +691,11 @@ class Cursor:
                 # -> "Takkun"
                 print(row[-1])
                 # -> {"detail": "愉快"} (辞書データ)"""
-        return [row async for row in self.get_datas(table, targets, _fetchall=False, json=json)][0]
+        json_columns = await schemas.load(self.cursor, table)
+        await self.cursor.execute(*self._select(table, targets))
+        return self._decode_row(
+            await self.cursor.fetchone(), self.cursor.description, json_columns, json
+        )
 
 
 class MySQLManager:
@@ -328,6 +718,10 @@ class MySQLManager:
     ----------
     pool : bool, default False
         プールを使用します。
+    slow_query_threshold : float, default 1.0
+        プールを使用する場合に、これ以上の秒数がかかったクエリを遅いクエリとして記録します。
+    acquire_timeout : float, default 10.0
+        プールを使用する場合に、接続の枠が空くのを待つ最大の秒数です。
     **kwargs : dict
         `aiomysql.connect`または`aiomysql.create_pool`に渡すキーワード引数です。
 
@@ -341,6 +735,10 @@ class MySQLManager:
         プールじゃない場合は使えません。
     loop : asyncio.AbstractEventLoop
         使用しているイベントループです。
+    stats : QueryStats
+        プールを使用する場合の、クエリの統計です。
+    governor : PoolGovernor
+        プールを使用する場合の、同時接続数を`maxsize`までに制限するためのものです。
 
     Examples
     --------
@@ -356,19 +754,31 @@ class MySQLManager:
     async with db.get_cursor() as cursor:
         ..."""
 
-    def __init__(self, pool: bool = False, _pool_c=False, **kwargs):
+    def __init__(
+        self, pool: bool = False, _pool_c=False,
+        slow_query_threshold: float = 1.0, acquire_timeout: float = 10.0, **kwargs
+    ):
         self.connection, self.pool = None, None
         self._real_pool = None
+        self.stats = QueryStats(slow_query_threshold)
+        self.governor = PoolGovernor(kwargs.get("maxsize", 10), acquire_timeout)
         self.loop = kwargs.get("loop", get_event_loop())
-        self.loop.create_task(self._setup(pool, _pool_c, kwargs))
+        self._setup_task = self.loop.create_task(self._setup(pool, _pool_c, kwargs))
 
     async def _setup(self, pool, _pool_c, kwargs) -> None:
         # データベースの準備をする。
         if pool and not _pool_c:
-            self.pool = await create_pool(**kwargs)
+            kwargs.setdefault("cursorclass", InstrumentedCursor)
+            self.pool = InstrumentedPool(
+                await create_pool(**kwargs), self.stats, self.governor
+            )
         elif not _pool_c:
             self.connection = await connect(**kwargs)
 
+    async def wait_until_ready(self) -> None:
+        "データベースへの接続が終わるまで待ちます。"
+        await shield(self._setup_task)
+
     async def get_database(self):
         """このクラスの定義済みのものをプールを使って取得します。  
         これはこのクラスの定義時`pool=True`と言う引数を作っている場合のみ使用できます。  
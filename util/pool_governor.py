@@ -0,0 +1,112 @@
+# Free RT Util - Pool Governor
+
+"""データベースのプールの前に置いて、同時に使われる接続の数を制限するためのものです。
+上限に達した場合は優先度ごとの待ち行列に並び、空いた順に優先度の高いものから接続が渡されます。
+`MySQLManager`でプールを作る際に自動で使われ、`bot.mysql.governor`からアクセスできます。"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from collections import deque
+from asyncio import Future, TimeoutError, CancelledError, get_running_loop, wait_for
+from time import perf_counter
+
+from .query_stats import Histogram
+
+
+PRIORITIES = (
+    ("cogs.serversafety", 0),
+    ("cogs.serveruseful.level", 2),
+    ("cogs.serveruseful.channel_status", 2),
+    ("cogs.admin.rtlife", 2)
+)
+"モジュール名の始まりと優先度です。0が一番優先され、これにないものは1になります。"
+LANES = ("high", "normal", "low")
+
+
+class PoolGovernor:
+    """プールの同時接続数を制限し、優先度ごとの待ち行列で順番に接続の枠を渡すためのクラスです。
+
+    Parameters
+    ----------
+    limit : int
+        同時に使える接続の数です。
+    timeout : float, default 10.0
+        枠が空くのを待つ最大の秒数です。超えた場合は`asyncio.TimeoutError`が発生します。
+    starvation : float, default 2.0
+        優先度の低い待ち行列の先頭がこれ以上の秒数待っている場合は、優先度に関係なくそれに枠を渡します。"""
+
+    def __init__(self, limit: int, timeout: float = 10.0, starvation: float = 2.0):
+        self.limit, self.timeout, self.starvation = limit, timeout, starvation
+        self.using = 0
+        self.lanes: tuple[deque[tuple[float, Future]], ...] = tuple(deque() for _ in LANES)
+        self.wait = Histogram()
+        self.timeouts = self.max_depth = 0
+
+    @staticmethod
+    def priority(cog: str) -> int:
+        "モジュール名から優先度を調べます。"
+        for prefix, priority in PRIORITIES:
+            if cog.startswith(prefix):
+                return priority
+        return 1
+
+    @property
+    def depth(self) -> int:
+        "待っている数です。"
+        return sum(map(len, self.lanes))
+
+    async def acquire(self, cog: str) -> None:
+        "枠が空くまで待ちます。"
+        if self.using < self.limit and not self.depth:
+            self.using += 1
+            self.wait.add(0.0)
+            return
+
+        started = perf_counter()
+        lane = self.lanes[self.priority(cog)]
+        entry = (started, get_running_loop().create_future())
+        lane.append(entry)
+        self.max_depth = max(self.max_depth, self.depth)
+        try:
+            await wait_for(entry[1], self.timeout)
+        except (TimeoutError, CancelledError) as e:
+            if entry[1].done() and not entry[1].cancelled():
+                # 待つのをやめる前に枠を渡されていたのなら返す。
+                self.release()
+            elif entry in lane:
+                lane.remove(entry)
+            if isinstance(e, TimeoutError):
+                self.timeouts += 1
+            raise
+        finally:
+            self.wait.add(perf_counter() - started)
+
+    def _next(self) -> Optional[tuple[float, Future]]:
+        # 次に枠を渡すものを取り出す。
+        now = perf_counter()
+        for lane in reversed(self.lanes[1:]):
+            if lane and now - lane[0][0] >= self.starvation:
+                return lane.popleft()
+        for lane in self.lanes:
+            if lane:
+                return lane.popleft()
+        return None
+
+    def release(self) -> None:
+        "枠を返します。待っているものがいればそれに渡します。"
+        while (entry := self._next()) is not None:
+            if not entry[1].done():
+                entry[1].set_result(None)
+                return
+        self.using -= 1
+
+    def metrics(self) -> dict[str, Any]:
+        "待ち行列の状況を返します。"
+        return {
+            "limit": self.limit, "using": self.using,
+            "waiting": {name: len(lane) for name, lane in zip(LANES, self.lanes)},
+            "maxDepth": self.max_depth, "timeouts": self.timeouts,
+            "wait": self.wait.to_dict()
+        }
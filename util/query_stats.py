@@ -0,0 +1,241 @@
+# Free RT Util - Query Stats
+
+"""aiomysqlのプールの上で動く、クエリの計測を行うためのものです。
+正規化したSQL文と呼び出し元のコグごとに、実行回数やレイテンシ、行数と`pool.acquire()`の待ち時間を記録します。
+`MySQLManager`でプールを作る際に自動で使われ、`bot.mysql.stats`からアクセスできます。"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Optional
+
+from collections import deque
+from asyncio import get_running_loop
+from functools import lru_cache
+from time import perf_counter, time
+from bisect import bisect_left
+from sys import _getframe
+import re
+
+from aiomysql import Cursor, SSCursor
+from aiofiles import open as async_open
+
+if TYPE_CHECKING:
+    from .pool_governor import PoolGovernor
+
+
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+"レイテンシのヒストグラムの区切り(秒)です。最後にこれを超えたもの用の区間があります。"
+
+
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b|%s")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize(query: str) -> str:
+    "SQL文の値の部分を`?`にして空白をまとめます。"
+    query = _LITERALS.sub("?", query)
+    query = _LISTS.sub("(?+)", query)
+    query = _ROWS.sub("(?+), ...", query)
+    return _SPACES.sub(" ", query).strip()
+
+
+def caller_cog(depth: int = 2) -> str:
+    "呼び出し元のコグのモジュール名を調べます。見つからない場合は一番近いutil以外のモジュール名です。"
+    frame, fallback = _getframe(depth), None
+    while frame is not None:
+        name = frame.f_globals.get("__name__", "")
+        if name.startswith("cogs."):
+            return name
+        if fallback is None and not name.startswith(("util.", "aiomysql", "asyncio")):
+            fallback = name
+        frame = frame.f_back
+    return fallback or "unknown"
+
+
+class Histogram:
+    "レイテンシの統計です。"
+
+    __slots__ = ("count", "total", "max", "rows", "buckets")
+
+    def __init__(self):
+        self.count, self.total, self.max, self.rows = 0, 0.0, 0.0, 0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def add(self, elapsed: float, rows: int = 0) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.rows += rows
+        if elapsed > self.max:
+            self.max = elapsed
+        self.buckets[bisect_left(BUCKETS, elapsed)] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count, "total": round(self.total, 4),
+            "average": round(self.total / self.count, 4) if self.count else 0.0,
+            "max": round(self.max, 4), "rows": self.rows, "buckets": self.buckets
+        }
+
+
+class QueryStats:
+    """クエリの統計を記録するためのクラスです。
+
+    Parameters
+    ----------
+    slow_threshold : float, default 1.0
+        これ以上の秒数がかかったクエリを遅いクエリとして記録します。
+    slow_log_path : str, optional
+        遅いクエリを書き込むファイルのパスです。`None`の場合はファイルには書き込みません。"""
+
+    def __init__(
+        self, slow_threshold: float = 1.0,
+        slow_log_path: Optional[str] = "log/slow_query.log"
+    ):
+        self.slow_threshold, self.slow_log_path = slow_threshold, slow_log_path
+        self.queries: dict[tuple[str, str], Histogram] = {}
+        self.acquires: dict[str, Histogram] = {}
+        self.slow: deque[dict[str, Any]] = deque(maxlen=50)
+        self.started = time()
+
+    def record_query(self, query: str, cog: str, elapsed: float, rows: int) -> None:
+        "クエリの実行を記録します。"
+        query = normalize(query)
+        if (key := (query, cog)) not in self.queries:
+            self.queries[key] = Histogram()
+        self.queries[key].add(elapsed, rows)
+        if elapsed >= self.slow_threshold:
+            entry = {"time": time(), "cog": cog, "elapsed": round(elapsed, 4), "query": query}
+            self.slow.append(entry)
+            if self.slow_log_path is not None:
+                try:
+                    get_running_loop().create_task(self._write_slow(entry))
+                except RuntimeError:
+                    ...
+
+    def record_acquire(self, cog: str, elapsed: float) -> None:
+        "`pool.acquire()`の待ち時間を記録します。"
+        if cog not in self.acquires:
+            self.acquires[cog] = Histogram()
+        self.acquires[cog].add(elapsed)
+
+    async def _write_slow(self, entry: dict[str, Any]) -> None:
+        async with async_open(self.slow_log_path, "a") as f:
+            await f.write(
+                f"{entry['time']:.3f}\t{entry['elapsed']:.4f}s\t{entry['cog']}\t{entry['query']}\n"
+            )
+
+    def summary(self, limit: int = 10) -> dict[str, Any]:
+        "合計時間が長い順にクエリと待ち時間の統計をまとめたものを返します。"
+        return {
+            "since": self.started,
+            "queries": [
+                {"query": query, "cog": cog, **histogram.to_dict()}
+                for (query, cog), histogram in sorted(
+                    self.queries.items(), key=lambda item: item[1].total, reverse=True
+                )[:limit]
+            ],
+            "acquires": {
+                cog: histogram.to_dict() for cog, histogram in sorted(
+                    self.acquires.items(), key=lambda item: item[1].total, reverse=True
+                )[:limit]
+            },
+            "slow": list(self.slow)[-limit:]
+        }
+
+    def reset(self) -> None:
+        "記録を全て消します。"
+        self.queries.clear()
+        self.acquires.clear()
+        self.slow.clear()
+        self.started = time()
+
+
+class _MeasuredCursorMixin:
+    # 実行したクエリを記録するためのCursorのミックスインです。
+
+    _rt_measuring = False
+
+    async def _measure(self, method, query: str, args):
+        stats: Optional[QueryStats] = getattr(self._connection, "_rt_stats", None)
+        if stats is None or self._rt_measuring:
+            return await method(query, args)
+        cog, started = caller_cog(3), perf_counter()
+        self._rt_measuring = True
+        try:
+            return await method(query, args)
+        finally:
+            self._rt_measuring = False
+            stats.record_query(
+                query, cog, perf_counter() - started, max(self.rowcount or 0, 0)
+            )
+
+    async def execute(self, query, args=None):
+        return await self._measure(super().execute, query, args)
+
+    async def executemany(self, query, args):
+        return await self._measure(super().executemany, query, args)
+
+
+class InstrumentedCursor(_MeasuredCursorMixin, Cursor):
+    "実行したクエリを記録するCursorです。`pool.acquire()`で取得したコネクションでのみ記録します。"
+
+
+class InstrumentedSSCursor(_MeasuredCursorMixin, SSCursor):
+    "実行したクエリを記録するSSCursor(サーバーサイドカーソル)です。"
+
+
+class _AcquireContextManager:
+    def __init__(self, pool: InstrumentedPool):
+        self._pool, self._conn = pool, None
+
+    async def _acquire(self, cog: str):
+        started = perf_counter()
+        if self._pool.governor is not None:
+            await self._pool.governor.acquire(cog)
+        try:
+            conn = await self._pool.pool.acquire()
+        except BaseException:
+            if self._pool.governor is not None:
+                self._pool.governor.release()
+            raise
+        self._pool.stats.record_acquire(cog, perf_counter() - started)
+        conn._rt_stats, conn._rt_governed = self._pool.stats, True
+        return conn
+
+    def __await__(self):
+        return self._acquire(caller_cog()).__await__()
+
+    async def __aenter__(self):
+        self._conn = await self._acquire(caller_cog())
+        return self._conn
+
+    async def __aexit__(self, *_):
+        try:
+            await self._pool.release(self._conn)
+        finally:
+            self._conn = None
+
+
+class InstrumentedPool:
+    """aiomysqlのプールを包んで、`acquire`の待ち時間を記録するようにしたものです。
+    `governor`が渡された場合は、それで同時に使われる接続の数を制限します。
+    それ以外の属性は元のプールのものがそのまま使われます。"""
+
+    def __init__(self, pool, stats: QueryStats, governor: Optional[PoolGovernor] = None):
+        self.pool, self.stats, self.governor = pool, stats, governor
+
+    def acquire(self) -> _AcquireContextManager:
+        return _AcquireContextManager(self)
+
+    def release(self, conn):
+        if getattr(conn, "_rt_governed", False):
+            conn._rt_governed = False
+            if self.governor is not None:
+                self.governor.release()
+        return self.pool.release(conn)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool, name)
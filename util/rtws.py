@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Literal, Union, Optional
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Literal, Union, Optional
 
 from discord.ext import commands
 import discord
 
 from .rt_module.src import rtws, rtws_feature_types as rft
+from .rtws_frames import Call, RemoteError, Result, run_calls, unwrap
 
 if TYPE_CHECKING:
     from .types import RT
@@ -19,6 +20,12 @@ class RTWSGeneralFeatures(commands.Cog):
         for name, value in map(lambda name: (name, getattr(self, name)), dir(self)):
             if name.startswith("get"):
                 self.bot.rtws.set_event(value)
+        self.bot.rtws.set_event(self.batch)
+
+    async def batch(self, calls: list[Call]) -> list[Result]:
+        """複数のリクエストを一度に受け取って同時に実行します。
+        ダッシュボードで`get_guild`などを何十回も一つずつリクエストしなくて済むようにするためのものです。"""
+        return await run_calls(self.bot.rtws.handlers, calls)
 
     async def get_user(self, user_id: int) -> Optional[rft.User]:
         if user := self.bot.get_user(user_id):
@@ -109,6 +116,46 @@ class ExtendedRTWebSocket(rtws.RTWebSocket):
 
     bot: RT
 
+    def __init__(self, *args, **kwargs):
+        self.handlers: dict[str, Callable] = {}
+        "`set_event`で設定されたイベントハンドラです。`batch`で使います。"
+        super().__init__(*args, **kwargs)
+
+    def set_event(self, function: Callable, *args, **kwargs):
+        self.handlers[args[0] if args else function.__name__] = function
+        return super().set_event(function, *args, **kwargs)
+
+    async def request_many(
+        self, calls: Iterable[tuple[str, Any]], return_exceptions: bool = False
+    ) -> list[Any]:
+        """複数のリクエストを`batch`イベントで一度に送って、返事をリクエストと同じ順番で返します。
+        バックエンドが`batch`イベントに対応している必要があります。
+
+        Parameters
+        ----------
+        calls : Iterable[tuple[str, Any]]
+            イベント名とデータのタプルです。
+        return_exceptions : bool, default False
+            `True`の場合はエラーを発生させずに、エラーをリストに入れて返します。"""
+        calls = [
+            Call(id=id_, event=event, data=data)
+            for id_, (event, data) in enumerate(calls)
+        ]
+        results = {
+            result["id"]: result for result in await self.request("batch", calls)
+        }
+        data = []
+        for call in calls:
+            try:
+                data.append(unwrap(call["event"], results.get(
+                    call["id"], Result(id=call["id"], status="error", data="No response")
+                )))
+            except RemoteError as e:
+                if not return_exceptions:
+                    raise
+                data.append(e)
+        return data
+
     def log(self, mode: str, *args, **kwargs):
         return self.bot.print("[RTWebSocket]", f"[{mode}]", *args, **kwargs)
 
@@ -0,0 +1,400 @@
+# Free RT Util - RTWS Frames
+
+"""バックエンドとの通信で、一つのフレームに複数のリクエストとレスポンスをまとめるためのものです。
+リクエストにはIDが付けられるので、同時にいくつものリクエストの返事を待つことができます。
+フレームはJSONのテキストか、msgpackがインストールされている場合はmsgpackのバイナリで送ることができます。
+受け取ったフレームは、テキストかバイナリかでどちらの形式かを判断します。
+
+フレームは次のような辞書です。`calls`と`results`はどちらかだけでも構いません。
+```python
+{
+    "type": "batch",
+    "calls": [{"id": 1, "event": "get_user", "data": 634763612535390209}],
+    "results": [{"id": 5, "status": "ok", "data": {...}}]
+}
+```
+接続した時に`{"type": "hello", "formats": ["msgpack", "json"]}`を送り合うと、両方が使える形式に切り替わります。
+
+# Examples
+```python
+mux = Multiplexer(ws.send, {"get_user": get_user})
+async for message in ws:
+    await mux.feed(message)
+
+user, guilds = await mux.request_many((("get_user", 1), ("get_guilds", 1)))
+```"""
+
+from __future__ import annotations
+
+from typing import (
+    Any, Awaitable, Callable, Iterable, Literal, Mapping, Optional, TypedDict, Union
+)
+
+from asyncio import (
+    AbstractEventLoop, Future, Handle, Task, gather, get_running_loop, wait_for
+)
+from importlib.util import find_spec
+from inspect import isawaitable
+from time import perf_counter
+
+from ujson import dumps, loads
+
+from .lazy import lazy_import
+
+
+msgpack = lazy_import("msgpack")
+HAS_MSGPACK = find_spec("msgpack") is not None
+"msgpackが使えるかどうかです。"
+FORMATS: tuple[str, ...] = ("msgpack", "json") if HAS_MSGPACK else ("json",)
+"使える形式です。優先する順に並んでいます。"
+
+Handler = Callable[[Any], Union[Awaitable[Any], Any]]
+RawFrame = Union[str, bytes]
+
+
+class Call(TypedDict):
+    "リクエストです。"
+
+    id: int
+    event: str
+    data: Any
+
+
+class Result(TypedDict):
+    "レスポンスです。"
+
+    id: int
+    status: Literal["ok", "error", "not_found"]
+    data: Any
+
+
+class RemoteError(Exception):
+    "相手のイベントハンドラでエラーが発生したか、イベントが見つからなかった際に発生するエラーです。"
+
+    def __init__(self, event: str, status: str, message: Any):
+        self.event, self.status = event, status
+        super().__init__(f"{event}: {status}: {message}")
+
+
+def encode(frame: dict, format_: str = "json") -> RawFrame:
+    "フレームを送れる形にします。JSONの場合は文字列、msgpackの場合はバイト列になります。"
+    if format_ == "msgpack":
+        return msgpack.packb(frame, use_bin_type=True)
+    return dumps(frame, ensure_ascii=False)
+
+
+def decode(raw: RawFrame) -> dict:
+    "受け取ったフレームを辞書にします。バイト列の場合はmsgpackとして読み込みます。"
+    if isinstance(raw, (bytes, bytearray, memoryview)):
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+    return loads(raw)
+
+
+def unwrap(event: str, result: Result) -> Any:
+    "レスポンスのデータを返します。相手でエラーが発生していた場合は`RemoteError`を発生させます。"
+    if result["status"] != "ok":
+        raise RemoteError(event, result["status"], result.get("data"))
+    return result.get("data")
+
+
+async def run_call(handlers: Mapping[str, Handler], call: Call) -> Result:
+    "リクエストのイベントハンドラを実行してレスポンスを作ります。"
+    if (handler := handlers.get(call["event"])) is None:
+        return Result(id=call["id"], status="not_found", data=call["event"])
+    try:
+        data = handler(call.get("data"))
+        if isawaitable(data):
+            data = await data
+    except Exception as e:
+        return Result(id=call["id"], status="error", data=f"{e.__class__.__name__}: {e}")
+    return Result(id=call["id"], status="ok", data=data)
+
+
+async def run_calls(handlers: Mapping[str, Handler], calls: Iterable[Call]) -> list[Result]:
+    "複数のリクエストを同時に実行して、レスポンスをリクエストと同じ順番で返します。"
+    return list(await gather(*(run_call(handlers, call) for call in calls)))
+
+
+class Multiplexer:
+    """一つの接続でIDの付いたリクエストとレスポンスをやり取りするためのクラスです。
+    短い間に送ろうとしたリクエストとレスポンスは、一つのフレームにまとめて送られます。
+
+    Parameters
+    ----------
+    send : Callable[[str | bytes], Awaitable[None]]
+        フレームを送る関数です。`websockets`の`send`などです。
+    handlers : Mapping[str, Callable[[Any], Any]], optional
+        相手からのリクエストを処理するイベントハンドラです。
+    format_ : str, default "json"
+        送る形式です。`"json"`か`"msgpack"`です。`hello`で相手と決めることもできます。
+    max_batch : int, default 64
+        一つのフレームにまとめる最大の数です。これに達した場合はすぐに送ります。`1`の場合はまとめません。
+    delay : float, default 0.0
+        まとめるために待つ秒数です。`0`の場合は、イベントループの同じ周回で送ろうとしたものだけをまとめます。
+    timeout : float, default 30.0
+        リクエストの返事を待つ秒数です。"""
+
+    def __init__(
+        self, send: Callable[[RawFrame], Awaitable[None]],
+        handlers: Optional[Mapping[str, Handler]] = None, format_: str = "json",
+        max_batch: int = 64, delay: float = 0.0, timeout: float = 30.0
+    ):
+        self.send, self.handlers = send, handlers or {}
+        self.format, self.max_batch = format_, max_batch
+        self.delay, self.timeout = delay, timeout
+        self.pending: dict[int, tuple[str, Future]] = {}
+        "返事を待っているリクエストのIDとイベント名と`Future`です。"
+        self.frames = self.calls = self.bytes = 0
+        "送ったフレームとリクエストの数と、送ったバイト数です。"
+        self._id = 0
+        self._calls: list[Call] = []
+        self._results: list[Result] = []
+        self._timer: Optional[Handle] = None
+        # 実行中のタスクが消されないように持っておく。
+        self._tasks: set[Task] = set()
+        self._loop: Optional[AbstractEventLoop] = None
+
+    @property
+    def loop(self) -> AbstractEventLoop:
+        if self._loop is None:
+            self._loop = get_running_loop()
+        return self._loop
+
+    def _spawn(self, coro, name: str) -> None:
+        task = self.loop.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def hello(self) -> RawFrame:
+        "接続した時に送る、使える形式を伝えるフレームを作ります。"
+        return encode({"type": "hello", "formats": FORMATS})
+
+    def _queue(self) -> None:
+        if len(self._calls) + len(self._results) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = self.loop.call_later(self.delay, self.flush) \
+                if self.delay > 0 else self.loop.call_soon(self.flush)
+
+    def flush(self) -> None:
+        "まとめているリクエストとレスポンスを今すぐ送ります。"
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._calls and not self._results:
+            return
+        frame: dict[str, Any] = {"type": "batch"}
+        if self._calls:
+            frame["calls"], self._calls = self._calls, []
+            self.calls += len(frame["calls"])
+        if self._results:
+            frame["results"], self._results = self._results, []
+        raw = encode(frame, self.format)
+        self.frames += 1
+        self.bytes += len(raw)
+        self._spawn(self._send(raw), "Multiplexer: send")
+
+    async def _send(self, raw: RawFrame) -> None:
+        try:
+            await self.send(raw)
+        except Exception as e:
+            # 送れなかった場合は返事が来ないので、待っているものを全て終わらせる。
+            self.close(e)
+
+    async def request(self, event: str, data: Any = None, timeout: Optional[float] = None) -> Any:
+        """リクエストを送って返事を待ちます。
+
+        Raises
+        ------
+        RemoteError
+            相手のイベントハンドラでエラーが発生したか、イベントが見つからなかった場合です。
+        asyncio.TimeoutError
+            `timeout`秒以内に返事が来なかった場合です。"""
+        self._id += 1
+        future = self.loop.create_future()
+        self.pending[id_ := self._id] = (event, future)
+        self._calls.append(Call(id=id_, event=event, data=data))
+        self._queue()
+        try:
+            return await wait_for(future, timeout or self.timeout)
+        finally:
+            self.pending.pop(id_, None)
+
+    async def request_many(
+        self, calls: Iterable[tuple[str, Any]], return_exceptions: bool = False
+    ) -> list[Any]:
+        """複数のリクエストをまとめて送って、返事をリクエストと同じ順番で返します。
+
+        Parameters
+        ----------
+        calls : Iterable[tuple[str, Any]]
+            イベント名とデータのタプルです。
+        return_exceptions : bool, default False
+            `True`の場合はエラーを発生させずに、エラーをリストに入れて返します。"""
+        return list(await gather(
+            *(self.request(event, data) for event, data in calls),
+            return_exceptions=return_exceptions
+        ))
+
+    async def feed(self, raw: RawFrame) -> None:
+        "受け取ったフレームを処理します。受け取る度に呼んでください。"
+        frame = decode(raw)
+        if frame.get("type") == "hello":
+            self.format = next(
+                (format_ for format_ in FORMATS if format_ in frame.get("formats", ())),
+                "json"
+            )
+            return
+        for result in frame.get("results", ()):
+            if (pending := self.pending.get(result["id"])) is None \
+                    or pending[1].done():
+                # タイムアウトした後に来た返事は捨てる。
+                continue
+            try:
+                pending[1].set_result(unwrap(pending[0], result))
+            except RemoteError as e:
+                pending[1].set_exception(e)
+        for call in frame.get("calls", ()):
+            # 返事はそれぞれが終わった時に、その時にまとめているものと一緒に送る。
+            self._spawn(self._respond(call), f"Multiplexer: {call['event']}")
+
+    async def _respond(self, call: Call) -> None:
+        result = await run_call(self.handlers, call)
+        # `flush`でリストが入れ替わるので、`await`の後に取得する。
+        self._results.append(result)
+        self._queue()
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        "接続が切れた際に呼んでください。返事を待っているリクエストを全てエラーで終わらせます。"
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._calls.clear()
+        self._results.clear()
+        for _, future in self.pending.values():
+            if not future.done():
+                future.set_exception(error or ConnectionError("接続が切れました。"))
+        self.pending.clear()
+
+
+def _echo(data: Any) -> Any:
+    return data
+
+
+async def serve_echo(host: str = "localhost", port: int = 0, **kwargs):
+    """ベンチマーク用の、受け取ったデータをそのまま返すWebSocketのサーバーを起動します。
+    `port`が`0`の場合は空いているポートが使われます。返り値は`websockets`のサーバーです。"""
+    import websockets
+
+    async def handler(ws, *_):
+        mux = Multiplexer(ws.send, {"echo": _echo}, **kwargs)
+        await ws.send(mux.hello())
+        try:
+            async for message in ws:
+                await mux.feed(message)
+        finally:
+            mux.close()
+
+    return await websockets.serve(handler, host, port, max_size=None)
+
+
+def sample_guild(members: int = 100) -> dict:
+    "ベンチマークで使う、ダッシュボードで使うサーバーの情報に似たデータを作ります。"
+    return {
+        "id": 733707710784340100, "name": "Free RT Support Server",
+        "avatar_url": "https://cdn.discordapp.com/icons/733707710784340100/a.png",
+        "members": [
+            {
+                "id": 634763612535390209 + index, "name": f"member{index}",
+                "avatar_url": f"https://cdn.discordapp.com/avatars/{index}/a.png",
+                "full_name": f"member{index}#{index % 10000:04}", "guild": None
+            } for index in range(members)
+        ],
+        "roles": [{"id": 733707710784340101 + index, "name": f"role{index}"} for index in range(20)]
+    }
+
+
+async def benchmark(
+    uri: str, calls: int = 100, rounds: int = 5, data: Any = None
+) -> dict[str, dict[str, float]]:
+    """`serve_echo`で起動したサーバーに、一つずつ送る場合とまとめて送る場合でリクエストを送って時間を計ります。
+    ダッシュボードのページを読み込む時のように、`calls`個のリクエストを同時に必要とする場合を想定しています。
+
+    Parameters
+    ----------
+    uri : str
+        接続先のURIです。
+    calls : int, default 100
+        一回に送るリクエストの数です。
+    rounds : int, default 5
+        繰り返す回数です。結果はその平均です。
+    data : Any, optional
+        リクエストで送るデータです。デフォルトは`sample_guild()`です。
+
+    Returns
+    -------
+    dict[str, dict[str, float]]
+        方法ごとの一回あたりのミリ秒(`page_ms`)、一秒あたりのリクエスト数(`calls_per_sec`)、
+        一回あたりのフレーム数(`frames`)とバイト数(`bytes`)です。"""
+    import websockets
+
+    data = sample_guild() if data is None else data
+    # 方法ごとの形式と、一つのフレームにまとめる数と、同時に送るかどうかです。
+    modes = {
+        "sequential": ("json", 1, False), "concurrent": ("json", 1, True),
+        "batched_json": ("json", calls, True)
+    }
+    if HAS_MSGPACK:
+        modes["batched_msgpack"] = ("msgpack", calls, True)
+    results = {}
+    for name, (format_, max_batch, concurrent) in modes.items():
+        async with websockets.connect(uri, max_size=None) as ws:
+            mux = Multiplexer(ws.send, format_=format_, max_batch=max_batch)
+            reader = get_running_loop().create_task(_read(ws, mux))
+            # サーバーにもこの形式で返事をさせる。
+            await ws.send(encode({"type": "hello", "formats": [format_]}))
+            await mux.request("echo", None)
+            # `hello`で変わった形式を戻して、計測の前の分は数えない。
+            mux.format, mux.frames, mux.bytes = format_, 0, 0
+            elapsed = 0.0
+            for _ in range(rounds):
+                start = perf_counter()
+                if concurrent:
+                    await mux.request_many(("echo", data) for _ in range(calls))
+                else:
+                    for _ in range(calls):
+                        await mux.request("echo", data)
+                elapsed += perf_counter() - start
+            reader.cancel()
+        results[name] = {
+            "page_ms": round(elapsed / rounds * 1000, 2),
+            "calls_per_sec": round(calls * rounds / elapsed, 1),
+            "frames": mux.frames / rounds, "bytes": mux.bytes / rounds
+        }
+    return results
+
+
+async def _read(ws, mux: Multiplexer) -> None:
+    try:
+        async for message in ws:
+            await mux.feed(message)
+    finally:
+        mux.close()
+
+
+async def run_benchmark(calls: int = 100, rounds: int = 5) -> dict[str, dict[str, float]]:
+    "ローカルでエコーサーバーを起動して`benchmark`を実行します。"
+    server = await serve_echo()
+    try:
+        port = server.sockets[0].getsockname()[1]
+        return await benchmark(f"ws://localhost:{port}", calls, rounds)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    from asyncio import run
+
+    for name, row in run(run_benchmark()).items():
+        print(name, row)
@@ -0,0 +1,257 @@
+# Free RT Util - Time Series
+
+"""固定長のリングバッファで時系列のデータを保存するためのものです。
+1分/1時間/1日の段階ごとに平均を取ったものを`array`で持ち、古いものから上書きされるので大きさが変わりません。
+段階ごとに追記するだけのバイナリファイルに保存し、大きくなったら今のリングバッファの内容で書き直します。
+まとめている途中の区間は保存されないので、読み込む際に一番細かい段階の記録から作り直します。
+`window`で指定した期間だけを取り出すことができます。
+
+# Examples
+```python
+series = TimeSeries("data/rtlife", ("cpu", "memory"))
+series.load()
+series.add(time(), {"cpu": 12.5, "memory": 40.0})
+series.write()
+series.window("1h", since=time() - 86400)
+```"""
+
+from __future__ import annotations
+
+from typing import Iterable, Mapping, NamedTuple, Optional, Sequence
+
+from array import array
+from math import isnan, nan
+from os import replace
+from os.path import exists, getsize
+import struct
+
+from ujson import dumps, loads
+
+
+MAGIC = b"RTTS1"
+"ファイルの最初にある印です。"
+_HEADER = struct.Struct("<H")
+
+
+class Tier(NamedTuple):
+    "平均を取る段階です。"
+
+    name: str
+    interval: int
+    "一つの値にまとめる秒数です。"
+    size: int
+    "保存しておく値の数です。"
+
+
+TIERS = (Tier("1m", 60, 1440), Tier("1h", 3600, 720), Tier("1d", 86400, 730))
+"段階のデフォルトです。1分ごとを1日分、1時間ごとを30日分、1日ごとを2年分保存します。"
+
+
+def _value(value: float) -> Optional[float]:
+    # JSONにできないので`nan`は`None`にする。
+    return None if isnan(value) else round(value, 2)
+
+
+class Ring:
+    "一つの段階の、全ての値のリングバッファです。"
+
+    __slots__ = (
+        "tier", "names", "times", "values", "head", "length",
+        "_slot", "_sums", "_counts"
+    )
+
+    def __init__(self, tier: Tier, names: Sequence[str]):
+        self.tier, self.names = tier, tuple(names)
+        self.times = array("q", bytes(8 * tier.size))
+        self.values = {name: array("f", bytes(4 * tier.size)) for name in self.names}
+        self.head = self.length = 0
+        # まとめている途中の値です。
+        self._slot: Optional[int] = None
+        self._sums = [0.0] * len(self.names)
+        self._counts = [0] * len(self.names)
+
+    def push(self, slot: int, values: Sequence[float]) -> None:
+        "まとめた値を追加します。"
+        self.times[self.head] = slot
+        for name, value in zip(self.names, values):
+            self.values[name][self.head] = value
+        self.head = (self.head + 1) % self.tier.size
+        self.length = min(self.length + 1, self.tier.size)
+
+    def _pending(self) -> list[float]:
+        return [
+            total / count if count else nan
+            for total, count in zip(self._sums, self._counts)
+        ]
+
+    def add(self, timestamp: float, values: Sequence[float]) -> Optional[tuple[int, list[float]]]:
+        """値を追加します。
+        前の区間が終わった場合は、その区間の平均を確定させて`(区間の開始時間, 平均)`を返します。"""
+        slot, flushed = int(timestamp // self.tier.interval) * self.tier.interval, None
+        if self._slot is not None and slot != self._slot:
+            flushed = (self._slot, self._pending())
+            self.push(*flushed)
+            self._sums = [0.0] * len(self.names)
+            self._counts = [0] * len(self.names)
+        self._slot = slot
+        for index, value in enumerate(values):
+            if not isnan(value):
+                self._sums[index] += value
+                self._counts[index] += 1
+        return flushed
+
+    def _index(self, position: int) -> int:
+        # 古い順での位置をバッファの添字にする。
+        return (self.head - self.length + position) % self.tier.size
+
+    def _bisect(self, timestamp: float) -> int:
+        low, high = 0, self.length
+        while low < high:
+            middle = (low + high) // 2
+            if self.times[self._index(middle)] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def window(
+        self, since: Optional[float] = None, until: Optional[float] = None,
+        names: Optional[Iterable[str]] = None
+    ) -> dict[str, list]:
+        """期間の値を返します。まとめている途中の区間も最後に含まれます。
+        返り値は`time`に区間の開始時間、それ以外のキーに値のリストが入った辞書です。
+        値がない区間は`None`になります。"""
+        names = self.names if names is None else tuple(
+            name for name in names if name in self.values
+        )
+        start = 0 if since is None else self._bisect(since)
+        stop = self.length if until is None else self._bisect(until)
+        indexes = [self._index(position) for position in range(start, stop)]
+        result = {"time": [self.times[index] for index in indexes]}
+        for name in names:
+            result[name] = [_value(self.values[name][index]) for index in indexes]
+        if self._slot is not None and (since is None or self._slot >= since) \
+                and (until is None or self._slot < until):
+            pending = dict(zip(self.names, self._pending()))
+            result["time"].append(self._slot)
+            for name in names:
+                result[name].append(_value(pending[name]))
+        return result
+
+
+class TimeSeries:
+    """段階ごとのリングバッファと、そのファイルへの保存をまとめたものです。
+
+    Parameters
+    ----------
+    path : str
+        保存するファイルのパスの最初の部分です。`<path>.<段階の名前>.bin`に保存されます。
+    names : Sequence[str]
+        値の名前です。後から増やした場合、前のファイルにないものは`nan`になります。
+    tiers : Sequence[Tier], default TIERS
+        平均を取る段階です。"""
+
+    def __init__(self, path: str, names: Sequence[str], tiers: Sequence[Tier] = TIERS):
+        self.path, self.names = path, tuple(names)
+        self.rings = {tier.name: Ring(tier, self.names) for tier in tiers}
+        self.record = struct.Struct(f"<q{len(self.names)}f")
+        self.latest: dict[str, float] = {}
+        "最後に追加された値です。"
+        self._unwritten: dict[str, list[bytes]] = {tier.name: [] for tier in tiers}
+        self._records = dict.fromkeys(self.rings, 0)
+
+    def _file(self, tier: str) -> str:
+        return f"{self.path}.{tier}.bin"
+
+    def _header(self) -> bytes:
+        names = dumps(self.names).encode()
+        return MAGIC + _HEADER.pack(len(names)) + names
+
+    def load(self) -> None:
+        "ファイルから読み込みます。ブロッキングするので、Botでは`run_in_executor`などで実行してください。"
+        for name, ring in self.rings.items():
+            if not exists(path := self._file(name)):
+                continue
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    # 追記すると読めないファイルのままになるので書き直す。
+                    self._compact(name)
+                    continue
+                names = loads(f.read(_HEADER.unpack(f.read(_HEADER.size))[0]))
+                record = struct.Struct(f"<q{len(names)}f")
+                start = f.tell()
+                count, rest = divmod(getsize(path) - start, record.size)
+                # 最後の`size`個だけを読み込む。
+                f.seek(start + max(count - ring.tier.size, 0) * record.size)
+                data = f.read(min(count, ring.tier.size) * record.size)
+            for slot, *values in record.iter_unpack(data):
+                row = dict(zip(names, values))
+                ring.push(slot, [row.get(name, nan) for name in self.names])
+            self._records[name] = count
+            # 途中で切れた記録が残っていると、その後ろに追記した記録が全てずれるので書き直す。
+            if names != list(self.names) or rest or count > ring.tier.size * 2:
+                self._compact(name)
+        self._restore_pending()
+
+    def _restore_pending(self) -> None:
+        # 再起動で1時間や1日の途中の区間が最初からにならないように、
+        # 一番細かい段階の記録からまとめている途中の区間を作り直す。
+        finest = min(self.rings.values(), key=lambda ring: ring.tier.interval)
+        if not finest.length:
+            return
+        last = finest.times[finest._index(finest.length - 1)]
+        for ring in self.rings.values():
+            slot = last // ring.tier.interval * ring.tier.interval
+            if ring is finest or ring._slot is not None or (
+                ring.length and ring.times[ring._index(ring.length - 1)] >= slot
+            ):
+                continue
+            for position in range(finest._bisect(slot), finest.length):
+                index = finest._index(position)
+                ring.add(finest.times[index], [
+                    finest.values[name][index] for name in self.names
+                ])
+
+    def add(self, timestamp: float, values: Mapping[str, float]) -> None:
+        "値を追加します。ない値は`nan`になります。"
+        self.latest.update(values)
+        row = [float(values.get(name, nan)) for name in self.names]
+        for name, ring in self.rings.items():
+            if (flushed := ring.add(timestamp, row)) is not None:
+                self._unwritten[name].append(self.record.pack(flushed[0], *flushed[1]))
+
+    def _compact(self, tier: str) -> None:
+        # 書き直している途中で落ちても今までの記録が消えないように、別のファイルに書いてから置き換える。
+        ring, path = self.rings[tier], self._file(tier)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(self._header())
+            for position in range(ring.length):
+                index = ring._index(position)
+                f.write(self.record.pack(
+                    ring.times[index], *(ring.values[name][index] for name in self.names)
+                ))
+        replace(f"{path}.tmp", path)
+        self._records[tier] = ring.length
+        self._unwritten[tier].clear()
+
+    def write(self) -> None:
+        """確定した値をファイルに追記します。ブロッキングするので、Botでは`run_in_executor`などで実行してください。
+        ファイルがリングバッファの大きさの二倍を超えた場合は書き直します。"""
+        for name, records in self._unwritten.items():
+            if not records:
+                continue
+            if not exists(path := self._file(name)) \
+                    or self._records[name] + len(records) > self.rings[name].tier.size * 2:
+                self._compact(name)
+                continue
+            with open(path, "ab") as f:
+                f.write(b"".join(records))
+            self._records[name] += len(records)
+            records.clear()
+
+    def window(
+        self, tier: str = "1h", since: Optional[float] = None,
+        until: Optional[float] = None, names: Optional[Iterable[str]] = None
+    ) -> dict[str, list]:
+        "段階を指定して`Ring.window`を実行します。"
+        return self.rings[tier].window(since, until, names)
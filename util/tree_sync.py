@@ -0,0 +1,131 @@
+# Free RT Util - Tree Sync
+
+"""スラッシュコマンドのツリーを、変更があった時だけ同期するためのものです。
+ツリーをシリアライズしたもののハッシュを`CommandTreeHash`テーブルに保存しておき、
+グローバルとサーバーごとのツリーのうちハッシュが変わったものだけを同期します。
+起動のたびに全てのコマンドを送り直して、レート制限にかかったり起動が遅くなったりするのを防ぐためのものです。
+Discord側のコマンドを手動で変えてしまった場合などは`force=True`で全て同期し直してください。"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from hashlib import sha256
+from time import perf_counter, time
+import traceback
+
+import discord
+
+from ujson import dumps
+
+if TYPE_CHECKING:
+    from .bot import RT
+
+
+TABLE = "CommandTreeHash"
+"同期したツリーのハッシュを記録するテーブルの名前です。"
+GLOBAL = 0
+"グローバルのツリーを表す`Scope`の値です。"
+
+
+def _to_dict(tree: discord.app_commands.CommandTree, command: Any) -> dict:
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        # discord.py 2.4より前は引数がない。
+        return command.to_dict()
+
+
+def _hash(payload: list[dict]) -> str:
+    return sha256(dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def tree_hashes(tree: discord.app_commands.CommandTree) -> dict[int, str]:
+    """グローバルとサーバーごとのツリーのハッシュを返します。
+    キーはサーバーのIDで、グローバルは`GLOBAL`です。"""
+    scopes = {GLOBAL, *tree._guild_commands}
+    scopes.update(
+        guild_id for _, guild_id, _ in tree._context_menus if guild_id is not None
+    )
+    return {
+        scope: _hash(sorted(
+            (
+                _to_dict(tree, command) for command in tree._get_all_commands(
+                    guild=None if scope == GLOBAL else discord.Object(scope)
+                )
+            ), key=lambda data: (data.get("type", 1), data["name"])
+        )) for scope in scopes
+    }
+
+
+async def _load(cursor, application_id: int) -> dict[int, str]:
+    await cursor.execute(
+        f"""CREATE TABLE IF NOT EXISTS {TABLE} (
+            ApplicationID BIGINT NOT NULL, Scope BIGINT NOT NULL, Hash CHAR(64),
+            SyncedAt DOUBLE, PRIMARY KEY (ApplicationID, Scope)
+        );"""
+    )
+    await cursor.execute(
+        f"SELECT Scope, Hash FROM {TABLE} WHERE ApplicationID = %s;", (application_id,)
+    )
+    return {row[0]: row[1] for row in await cursor.fetchall()}
+
+
+async def sync_tree(bot: RT, force: bool = False) -> list[int]:
+    """ハッシュが変わったツリーだけを同期します。
+    以前はコマンドがあったが今はないサーバーのツリーも、コマンドを消すために同期します。
+
+    Parameters
+    ----------
+    bot : RT
+        Botです。
+    force : bool, default False
+        ハッシュを見ずに全てのツリーを同期します。
+
+    Returns
+    -------
+    list[int]
+        同期したツリーのサーバーのIDです。グローバルは`GLOBAL`です。"""
+    started = perf_counter()
+    hashes = tree_hashes(bot.tree)
+    async with bot.mysql.pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            stored = await _load(cursor, bot.application_id)
+    # 今はないサーバーのツリーは空にする。
+    empty = _hash([])
+    for scope in stored.keys() - hashes.keys():
+        if stored[scope] != empty:
+            hashes[scope] = empty
+
+    # 同期はDiscordとの通信で時間がかかるので、その間は接続を持たないようにする。
+    synced = []
+    for scope, hash_ in sorted(hashes.items()):
+        if not force and stored.get(scope) == hash_:
+            continue
+        try:
+            await bot.tree.sync(guild=None if scope == GLOBAL else discord.Object(scope))
+        except Exception:
+            # ハッシュを保存しないので、次の起動時にまた同期される。
+            bot.print("[TreeSync]", f"Failed to sync {scope or 'global'}")
+            traceback.print_exc()
+        else:
+            synced.append(scope)
+
+    if synced:
+        async with bot.mysql.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.executemany(
+                    f"""INSERT INTO {TABLE} VALUES (%s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE Hash = VALUES(Hash), SyncedAt = VALUES(SyncedAt);""",
+                    [(bot.application_id, scope, hashes[scope], time()) for scope in synced]
+                )
+
+    elapsed = perf_counter() - started
+    if synced:
+        bot.print(
+            "[TreeSync]", f"Synced {len(synced)}/{len(hashes)} trees in {elapsed:.2f}s:",
+            ", ".join(str(scope or "global") for scope in synced)
+        )
+    else:
+        bot.print("[TreeSync]", f"Skipped, nothing changed ({elapsed:.2f}s)")
+    return synced
@@ -2,14 +2,128 @@
 
 import discord
 from discord.ext import commands
-from typing import Optional
+from typing import Dict, Iterable, Optional
+
+from asyncio import Future, Lock, gather, get_running_loop, shield
+
+
+FALLBACK_NAMES = ("free-RT-Tool", "free-R2-Tool", "free-R3-Tool")
+"`webhook_send`で使うウェブフックの名前です。別のBotが作ったもので送信できない場合は次の名前のものを使います。"
+
+
+class WebhookCache:
+    """チャンネルごとのウェブフックのキャッシュです。
+    `channel.webhooks()`は初めて必要になった時だけ実行され、`on_webhooks_update`か送信で404が返ってきた時に消されます。"""
+
+    def __init__(self):
+        self.webhooks: Dict[int, Dict[str, discord.Webhook]] = {}
+        # `FALLBACK_NAMES`のうち、チャンネルで送信に使える名前です。
+        self.names: Dict[int, str] = {}
+        self._fetching: Dict[int, Future] = {}
+        # 同じチャンネルにウェブフックを二つ作らないようにするためのロックです。
+        self._locks: Dict[int, Lock] = {}
+        self.requests = self.hits = self.coalesced = 0
+
+    async def fetch(self, channel: discord.TextChannel) -> Dict[str, discord.Webhook]:
+        "チャンネルのウェブフックを名前をキーにした辞書で返します。"
+        if channel.id in self.webhooks:
+            self.hits += 1
+            return self.webhooks[channel.id]
+        if channel.id in self._fetching:
+            self.coalesced += 1
+            # 待っているものがキャンセルされても、一緒に待っている他のものに影響しないようにする。
+            return await shield(self._fetching[channel.id])
+
+        self._fetching[channel.id] = future = get_running_loop().create_future()
+        try:
+            self.requests += 1
+            webhooks = {webhook.name: webhook for webhook in reversed(await channel.webhooks())}
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                # 待っている人がいない場合に例外が取得されなかったという警告が出ないようにする。
+                future.exception()
+            raise
+        else:
+            self.webhooks[channel.id] = webhooks
+            if not future.done():
+                future.set_result(webhooks)
+            return webhooks
+        finally:
+            del self._fetching[channel.id]
+            # 取得自体がキャンセルされた場合は、待っているものが止まったままにならないようにする。
+            if not future.done():
+                future.cancel()
+
+    async def get(
+        self, channel: discord.TextChannel, name: str
+    ) -> Optional[discord.Webhook]:
+        "ウェブフックを取得します。"
+        return (await self.fetch(channel)).get(name)
+
+    async def resolve(
+        self, channel: discord.TextChannel, name: str = FALLBACK_NAMES[0]
+    ) -> discord.Webhook:
+        """送信に使うウェブフックを取得します。ない場合は作成します。
+        `name`が`FALLBACK_NAMES`にあるものの場合は、送信に使えるもの(トークンがあるもの)が見つかるまで次の名前を試します。
+        同時に同じチャンネルで実行された場合でも、ウェブフックは一つしか作られません。"""
+        if (lock := self._locks.get(channel.id)) is None:
+            lock = self._locks[channel.id] = Lock()
+        async with lock:
+            return await self._resolve(channel, name)
+
+    async def _resolve(self, channel: discord.TextChannel, name: str) -> discord.Webhook:
+        if name in FALLBACK_NAMES:
+            name = self.names.get(channel.id, name)
+            names = FALLBACK_NAMES[FALLBACK_NAMES.index(name):]
+        else:
+            names = (name,)
+        webhooks = await self.fetch(channel)
+        for name in names:
+            if (webhook := webhooks.get(name)) is None:
+                webhook = webhooks[name] = await channel.create_webhook(name=name)
+            if webhook.token is not None or name == names[-1]:
+                break
+        if name in FALLBACK_NAMES:
+            self.names[channel.id] = name
+        return webhook
+
+    async def resolve_many(
+        self, channels: Iterable[discord.TextChannel], name: str = FALLBACK_NAMES[0]
+    ) -> Dict[int, discord.Webhook]:
+        """複数のチャンネルの送信に使うウェブフックをまとめて取得します。
+        取得できなかったチャンネルは含まれません。"""
+        channels = list(channels)
+        results = await gather(
+            *(self.resolve(channel, name) for channel in channels), return_exceptions=True
+        )
+        return {
+            channel.id: webhook for channel, webhook in zip(channels, results)
+            if isinstance(webhook, discord.Webhook)
+        }
+
+    def invalidate(self, channel_id: int) -> None:
+        "チャンネルのウェブフックのキャッシュを消します。"
+        self.webhooks.pop(channel_id, None)
+        self.names.pop(channel_id, None)
+
+    def stats(self) -> dict:
+        "ヒット数などの統計を返します。"
+        return {
+            "channels": len(self.webhooks), "requests": self.requests,
+            "hits": self.hits, "coalesced": self.coalesced
+        }
+
+
+cache = WebhookCache()
+"`webhook_send`と`get_webhook`で使うウェブフックのキャッシュです。"
 
 
 async def get_webhook(
     channel: discord.TextChannel, name: str = "RT-Tool"
 ) -> Optional[discord.Webhook]:
     "ウェブフックを取得します。"
-    return discord.utils.get(await channel.webhooks(), name=name)
+    return await cache.get(channel, name)
 
 
 async def webhook_send(
@@ -29,16 +143,10 @@ async def webhook_send(
         discord.pyのWebhook.sendに入れるキーワード引数です。"""
     if isinstance(channel, commands.Context):
         channel = channel.channel
-    wb = (
-        wb if (
-            wb := discord.utils.get(await channel.webhooks(), name=webhook_name)
-        ) else await channel.create_webhook(name=webhook_name))
+    wb = await cache.resolve(channel, webhook_name)
     try:
         return await wb.send(*args, **kwargs)
-    except ValueError as e:
-        if webhook_name == "free-RT-Tool":
-            return await webhook_send(channel, *args, webhook_name="free-R2-Tool", **kwargs)
-        elif webhook_name == "free-R2-Tool":
-            return await webhook_send(channel, *args, webhook_name="free-R3-Tool", **kwargs)
-        else:
-            raise e
+    except discord.NotFound:
+        # ウェブフックが削除されていた場合は取得し直す。
+        cache.invalidate(channel.id)
+        return await (await cache.resolve(channel, webhook_name)).send(*args, **kwargs)